@@ -0,0 +1,112 @@
+import argparse
+import multiprocessing
+import statistics
+import time
+import types
+
+import grpc
+
+import argussight.grpc.argus_service_pb2 as pb2
+import argussight.grpc.argus_service_pb2_grpc as pb2_grpc
+from argussight.core.dispatcher import Dispatcher
+from argussight.core.video_processes.vprocess import Vprocess
+
+
+def serve_commands(command_queue, response_queue, poll_interval: float) -> None:
+    # the command handling of a worker, without reading a stream
+    collector_config = types.SimpleNamespace(
+        redis=types.SimpleNamespace(host="localhost", port=6379, channel="")
+    )
+    worker = Vprocess(collector_config, {})
+    while True:
+        worker.handle_commands(command_queue, response_queue)
+        time.sleep(poll_interval)
+
+
+def report(title: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)]
+    print(
+        f"{title:<24} median {statistics.median(latencies) * 1000:7.2f}ms"
+        f"  p99 {p99 * 1000:7.2f}ms"
+    )
+
+
+def benchmark_local(count: int, poll_interval: float) -> None:
+    command_queue = multiprocessing.Queue()
+    response_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve_commands,
+        args=(command_queue, response_queue, poll_interval),
+        daemon=True,
+    )
+    process.start()
+    dispatcher = Dispatcher(
+        "benchmark", command_queue, response_queue, 5, lambda name: None
+    )
+    try:
+        # the first command also waits for the process to start
+        dispatcher.submit("default_settings", []).result()
+
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            dispatcher.submit("default_settings", []).result()
+            latencies.append(time.perf_counter() - start)
+        report("one by one", latencies)
+
+        start = time.perf_counter()
+        futures = []
+        for _ in range(count):
+            # stay below the waiting list limit of the dispatcher
+            if len(futures) >= 16:
+                futures[-16].result()
+            futures.append(dispatcher.submit("default_settings", []))
+        for future in futures:
+            future.result()
+        duration = time.perf_counter() - start
+        print(f"{'pipelined':<24} {count / duration:8.0f} commands/s")
+    finally:
+        dispatcher.stop()
+        process.terminate()
+
+
+def benchmark_server(target: str, name: str, command: str, count: int) -> None:
+    with grpc.insecure_channel(target) as channel:
+        stub = pb2_grpc.SpawnerServiceStub(channel)
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = stub.ManageProcesses(
+                pb2.ManageProcessesRequest(name=name, command=command)
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.status != "success":
+                print(f"  {response.error_message}")
+                return
+        report(f"server '{command}'", latencies)
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Round trip time of commands")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.001,
+        help="time the local worker sleeps between handling commands",
+    )
+    parser.add_argument(
+        "--target", help="also send commands to the server at this address"
+    )
+    parser.add_argument("--name", default="Saver")
+    parser.add_argument("--command", default="jobs")
+    args = parser.parse_args()
+
+    benchmark_local(args.count, args.poll_interval)
+    if args.target:
+        benchmark_server(args.target, args.name, args.command, args.count)
+
+
+if __name__ == "__main__":
+    run()
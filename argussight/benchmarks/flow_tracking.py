@@ -0,0 +1,120 @@
+import argparse
+import time
+import types
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from argussight.core.video_processes.streamer.flow_detection import FlowDetection
+
+
+def make_frames(width: int, height: int, count: int, step: int = 4) -> list:
+    # blurred noise moving by step pixels per frame, many good features
+    rng = np.random.default_rng(0)
+    texture = (rng.random((height + step * count, width)) * 255).astype(np.uint8)
+    texture = cv2.GaussianBlur(texture, (7, 7), 2)
+    return [
+        cv2.cvtColor(texture[step * i : step * i + height], cv2.COLOR_GRAY2BGR)
+        for i in range(count)
+    ]
+
+
+def make_static_frames(width: int, height: int, count: int, noise: float = 2.0):
+    # the same scene with the noise of a camera sensor
+    rng = np.random.default_rng(1)
+    scene = make_frames(width, height, 1)[0].astype(np.float32)
+    return [
+        np.clip(scene + rng.normal(0, noise, scene.shape), 0, 255).astype(np.uint8)
+        for _ in range(count)
+    ]
+
+
+def create_worker(width: int, height: int, max_corners: int) -> FlowDetection:
+    collector_config = types.SimpleNamespace(
+        redis=types.SimpleNamespace(host="localhost", port=6379, channel="")
+    )
+    worker = FlowDetection(collector_config, None, {})
+    worker._parameters["roi"] = [width // 4, height // 4, width // 2, height // 2]
+    worker._parameters["feature_params"]["maxCorners"] = max_corners
+    worker._parameters["feature_params"]["qualityLevel"] = 0.01
+    worker._min_distance = 10
+    worker._parameters["feature_params"]["minDistance"] = 10
+    return worker
+
+
+# the steps of a frame before only the tracking window was used: a copy of the
+# frame, two conversions of whole frames to gray and their pyramids built by
+# calcOpticalFlowPyrLK
+def copy_and_convert(previous_frame, frame, points, lk_params):
+    previous_gray = cv2.cvtColor(previous_frame, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    cv2.calcOpticalFlowPyrLK(previous_gray, gray, points, None, **lk_params)
+    return frame.copy()
+
+
+def benchmark_baseline(frames: list, rounds: int, worker: FlowDetection) -> float:
+    lk_params = dict(worker._parameters["lk_params"])
+    lk_params["criteria"] = tuple(lk_params["criteria"])
+    gray = cv2.cvtColor(frames[0], cv2.COLOR_BGR2GRAY)
+    x, y, w, h = worker._parameters["roi"]
+    points = cv2.goodFeaturesToTrack(
+        gray[y : y + h, x : x + w], mask=None, **worker._parameters["feature_params"]
+    ) + np.array([x, y], dtype=np.float32)
+
+    previous = frames[0].copy()
+    start = time.perf_counter()
+    for i in range(rounds):
+        previous = copy_and_convert(
+            previous, frames[i % len(frames)], points, lk_params
+        )
+    return (time.perf_counter() - start) / rounds
+
+
+def benchmark_worker(frames: list, rounds: int, worker: FlowDetection) -> float:
+    time_stamp = datetime(1900, 1, 1, 12)
+    inputs = [frame.copy() for frame in frames]
+    durations = []
+    for i in range(rounds):
+        frame = inputs[i % len(inputs)]
+        # the drawings of the last round are removed outside of the measurement
+        np.copyto(frame, frames[i % len(frames)])
+        start = time.perf_counter()
+        worker.detect_and_track_features(frame, time_stamp + timedelta(seconds=i / 30))
+        durations.append(time.perf_counter() - start)
+    # the first frame only detects features
+    return float(np.mean(durations[1:]))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Per frame time of FlowDetection")
+    parser.add_argument("--width", type=int, default=2048)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--max-corners", type=int, default=100)
+    args = parser.parse_args()
+
+    frames = make_frames(args.width, args.height, 10)
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+
+    worker = create_worker(args.width, args.height, args.max_corners)
+    baseline = benchmark_baseline(frames, args.frames, worker)
+    print(f"  whole frames, tracking only  {baseline * 1000:8.2f}ms")
+
+    duration = benchmark_worker(frames, args.frames, worker)
+    print(
+        f"  worker, tracking window      {duration * 1000:8.2f}ms"
+        f"  ({len(worker._tracks)} points)"
+    )
+
+    static_frames = make_static_frames(args.width, args.height, 10)
+    for enabled in (False, True):
+        worker = create_worker(args.width, args.height, args.max_corners)
+        worker._parameters["static_gate"]["enabled"] = enabled
+        duration = benchmark_worker(static_frames, args.frames, worker)
+        gate = "with" if enabled else "without"
+        print(f"  static scene, {gate + ' gate':<15} {duration * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from collections import Counter
+
+import grpc
+
+import argussight.grpc.argus_service_pb2 as pb2
+import argussight.grpc.argus_service_pb2_grpc as pb2_grpc
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+async def send_command(stub, name: str, command: str, results: list) -> None:
+    start = time.perf_counter()
+    try:
+        response = await stub.ManageProcesses(
+            pb2.ManageProcessesRequest(name=name, command=command)
+        )
+        outcome = response.status
+        if response.error_message:
+            outcome += f": {response.error_message}"
+    except grpc.RpcError as e:
+        outcome = f"rpc error: {e.code()}"
+    results.append((time.perf_counter() - start, outcome))
+
+
+async def probe(stub, stop: asyncio.Event, interval: float, latencies: list) -> None:
+    # GetProcesses has to stay responsive while the commands are in flight
+    while not stop.is_set():
+        start = time.perf_counter()
+        await stub.GetProcesses(pb2.GetProcessesRequest())
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    async with grpc.aio.insecure_channel(args.target) as channel:
+        stub = pb2_grpc.SpawnerServiceStub(channel)
+        results = []
+        probe_latencies = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(
+            probe(stub, stop, args.probe_interval, probe_latencies)
+        )
+
+        start = time.perf_counter()
+        names = itertools.cycle(args.names)
+        await asyncio.gather(
+            *[
+                send_command(stub, next(names), args.command, results)
+                for _ in range(args.requests)
+            ]
+        )
+        duration = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    command_latencies = [latency for latency, _ in results]
+    print(f"{args.requests} concurrent '{args.command}' commands in {duration:.2f}s")
+    for outcome, count in Counter(outcome for _, outcome in results).most_common():
+        print(f"  {count:>5} x {outcome}")
+    print(
+        f"command latency   median {statistics.median(command_latencies):.3f}s"
+        f"  max {max(command_latencies):.3f}s"
+    )
+    print(
+        f"GetProcesses ({len(probe_latencies)} calls)"
+        f"  median {percentile(probe_latencies, 0.5) * 1000:.1f}ms"
+        f"  p99 {percentile(probe_latencies, 0.99) * 1000:.1f}ms"
+        f"  max {max(probe_latencies, default=float('nan')) * 1000:.1f}ms"
+    )
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description="Responsiveness of a running server under many in-flight commands"
+    )
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument(
+        "--names",
+        nargs="+",
+        default=["Saver", "Recorder"],
+        help="processes the commands are spread over",
+    )
+    parser.add_argument("--command", default="settings")
+    parser.add_argument("--requests", type=int, default=150)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    asyncio.run(benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,132 @@
+import argparse
+import time
+import types
+from datetime import datetime, timedelta
+
+import cv2
+
+from argussight.benchmarks.flow_tracking import make_frames, make_static_frames
+from argussight.core.video_processes.streamer.flow_engines import FLOW_ENGINES
+from argussight.core.video_processes.streamer.optical_flow_detection import (
+    OpticalFlowDetection,
+)
+
+FPS = 30
+
+
+def create_worker(roi: list, downscale: int, engine: str) -> OpticalFlowDetection:
+    collector_config = types.SimpleNamespace(
+        redis=types.SimpleNamespace(host="localhost", port=6379, channel="")
+    )
+    worker = OpticalFlowDetection(collector_config, None, {})
+    worker._parameters["roi"] = roi
+    worker._parameters["downscale"] = downscale
+    worker._parameters["flow_engine"] = engine
+    return worker
+
+
+# the frames are played forwards and backwards, so that every step between
+# two frames has the same length
+def frame_index(i: int, count: int) -> int:
+    period = 2 * (count - 1)
+    i %= period
+    return i if i < count else period - i
+
+
+# the steps of a frame before the ROI was cut out first: conversion and
+# background model of the whole frame, Farneback flow within the ROI
+def benchmark_baseline(frames: list, rounds: int, worker: OpticalFlowDetection):
+    x, y, w, h = worker._parameters["roi"]
+    back_sub = cv2.createBackgroundSubtractorMOG2(
+        history=50, varThreshold=10, detectShadows=True
+    )
+    previous = cv2.cvtColor(frames[0], cv2.COLOR_BGR2GRAY)
+    start = time.perf_counter()
+    for i in range(1, rounds + 1):
+        frame = frames[frame_index(i, len(frames))]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        back_sub.apply(frame)
+        cv2.calcOpticalFlowFarneback(
+            previous[y : y + h, x : x + w],
+            gray[y : y + h, x : x + w],
+            None,
+            **worker._parameters["flow_params"],
+        )
+        previous = gray
+    return (time.perf_counter() - start) / rounds
+
+
+# time per frame and average measured speed in pixels/s
+def benchmark_worker(frames: list, rounds: int, worker: OpticalFlowDetection):
+    time_stamp = datetime(1900, 1, 1, 12)
+    frame = frames[0].copy()
+    durations = []
+    speeds = []
+    for i in range(rounds + 1):
+        # the drawings of the last round are removed outside of the measurement
+        frame[:] = frames[frame_index(i, len(frames))]
+        start = time.perf_counter()
+        worker.calculate_flow(frame, time_stamp + timedelta(seconds=i / FPS))
+        durations.append(time.perf_counter() - start)
+        # the background model needs a few frames to learn
+        if i > 5 and worker._speeds.get("roi"):
+            speeds.append(worker._speeds["roi"][-1])
+    # the first frame only initializes the worker
+    return sum(durations[1:]) / rounds, sum(speeds) / max(len(speeds), 1)
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description="Per frame time and accuracy of OpticalFlowDetection"
+    )
+    parser.add_argument("--width", type=int, default=2048)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--roi", type=int, nargs=4, default=[550, 450, 200, 500])
+    parser.add_argument("--downscale", type=int, default=1)
+    parser.add_argument(
+        "--engines", nargs="+", choices=FLOW_ENGINES, default=list(FLOW_ENGINES)
+    )
+    parser.add_argument(
+        "--velocities",
+        type=int,
+        nargs="+",
+        default=[1, 4, 8],
+        help=f"vertical velocities in pixels per frame, at {FPS} fps",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.width}x{args.height}, roi {args.roi}, downscale {args.downscale}, "
+        f"{args.frames} frames"
+    )
+    baseline = benchmark_baseline(
+        make_frames(args.width, args.height, 10),
+        args.frames,
+        create_worker(args.roi, 1, "farneback"),
+    )
+    print(f"  whole frame conversion and model, farneback  {baseline * 1000:.2f}ms")
+
+    static_frames = make_static_frames(args.width, args.height, 10)
+    for enabled in (False, True):
+        worker = create_worker(args.roi, args.downscale, "farneback")
+        worker._parameters["static_gate"]["enabled"] = enabled
+        duration, _ = benchmark_worker(static_frames, args.frames, worker)
+        gate = "with" if enabled else "without"
+        print(f"  static scene, farneback {gate + ' gate':<20} {duration * 1000:.2f}ms")
+
+    print(f"  {'engine':<14} {'pixels/s':>9} {'measured':>9} {'error':>7} {'time':>9}")
+    for velocity in args.velocities:
+        frames = make_frames(args.width, args.height, 10, velocity)
+        for engine in args.engines:
+            worker = create_worker(args.roi, args.downscale, engine)
+            duration, speed = benchmark_worker(frames, args.frames, worker)
+            expected = velocity * FPS
+            print(
+                f"  {engine:<14} {expected:>9} {speed:>9.1f}"
+                f" {(speed - expected) / expected:>7.1%} {duration * 1000:>7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,106 @@
+import argparse
+import importlib
+import os
+import time
+
+import grpc
+import yaml
+
+import argussight.grpc.argus_service_pb2 as pb2
+import argussight.grpc.argus_service_pb2_grpc as pb2_grpc
+from argussight.core.video_processes import vprocess
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(vprocess.__file__)),
+    "../configurations/config.yaml",
+)
+
+
+def load_worker_classes() -> dict:
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.safe_load(f)
+    classes = {}
+    for key, worker_class in config["worker_classes"].items():
+        module_name, class_name = worker_class["location"].rsplit(".", 1)
+        module = importlib.import_module(config["modules_path"] + "." + module_name)
+        classes[key] = getattr(module, class_name)
+    return classes
+
+
+def benchmark_configs(repeat: int) -> None:
+    classes = load_worker_classes()
+
+    def load_all() -> float:
+        start = time.perf_counter()
+        for worker_class in classes.values():
+            worker_class.load_class_config()
+        return time.perf_counter() - start
+
+    cold = []
+    for _ in range(repeat):
+        vprocess.get_config_index.cache_clear()
+        vprocess._class_configs.clear()
+        cold.append(load_all())
+    cached = [load_all() for _ in range(repeat)]
+    print(f"configs of {len(classes)} worker classes")
+    print(f"  parsed from files  {min(cold) * 1000:8.2f}ms")
+    print(f"  cached             {min(cached) * 1000:8.2f}ms")
+
+
+def terminate(stub, names: list) -> None:
+    response = stub.TerminateProcesses(pb2.TerminateProcessesRequest(names=names))
+    if response.status != "success":
+        print(f"  terminating failed: {response.error_message}")
+
+
+def benchmark_startup(target: str, worker_type: str, count: int) -> None:
+    with grpc.insecure_channel(target) as channel:
+        stub = pb2_grpc.SpawnerServiceStub(channel)
+
+        names = [f"benchmark-{i}" for i in range(count)]
+        start = time.perf_counter()
+        for name in names:
+            response = stub.StartProcesses(
+                pb2.StartProcessesRequest(name=name, type=worker_type)
+            )
+            if response.status != "success":
+                print(f"  {name}: {response.error_message}")
+        one_by_one = time.perf_counter() - start
+        terminate(stub, names)
+
+        start = time.perf_counter()
+        response = stub.StartProcesses(
+            pb2.StartProcessesRequest(
+                processes=[
+                    pb2.ProcessToStart(name=name, type=worker_type) for name in names
+                ]
+            )
+        )
+        batch = time.perf_counter() - start
+        if response.status != "success":
+            print(f"  batch: {response.error_message}")
+        terminate(stub, names)
+
+    print(f"starting {count} processes of type {worker_type}")
+    print(f"  one by one  {one_by_one:8.3f}s")
+    print(f"  batch       {batch:8.3f}s")
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Startup time of worker processes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--target",
+        help="also start processes on the server running at this address",
+    )
+    parser.add_argument("--type", default="flow_detection")
+    parser.add_argument("--count", type=int, default=10)
+    args = parser.parse_args()
+
+    benchmark_configs(args.repeat)
+    if args.target:
+        benchmark_startup(args.target, args.type, args.count)
+
+
+if __name__ == "__main__":
+    run()
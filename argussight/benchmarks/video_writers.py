@@ -0,0 +1,77 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from argussight.core.video_processes.savers.export import default_video_options
+from argussight.core.video_processes.savers.video_writers import (
+    VideoCodec,
+    get_video_writer,
+)
+
+
+def make_frames(width: int, height: int, count: int) -> list:
+    # a moving gradient with some noise, roughly as hard to encode as a camera image
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frames = []
+    for i in range(count):
+        base = (x + y + 4 * i) % 256
+        noise = rng.normal(0, 4, (height, width)).astype(np.float32)
+        gray = np.clip(base + noise, 0, 255).astype(np.uint8)
+        frames.append(np.dstack([gray, np.roll(gray, i, axis=1), 255 - gray]))
+    return frames
+
+
+def benchmark_codec(codec: str, frames: list, fps: float, folder: str) -> dict:
+    options = default_video_options()
+    options["codec"] = codec
+    writer_class = get_video_writer(codec)
+    writer_class.check_available(options)
+
+    height, width = frames[0].shape[:2]
+    start = time.perf_counter()
+    writer = writer_class(os.path.join(folder, codec), (width, height), fps, options)
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    duration = time.perf_counter() - start
+    return {
+        "fps": len(frames) / duration,
+        "bytes_per_frame": writer.bytes_written() / len(frames),
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description="Encode speed and size of the video writer backends"
+    )
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=1024)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--fps", type=float, default=25)
+    args = parser.parse_args()
+
+    frames = make_frames(args.width, args.height, args.frames)
+    raw_size = frames[0].nbytes
+    print(f"{args.frames} frames of {args.width}x{args.height} ({raw_size} bytes raw)")
+    print(f"{'codec':<6} {'encode fps':>11} {'bytes/frame':>12} {'ratio':>7}")
+    with tempfile.TemporaryDirectory() as folder:
+        for codec in VideoCodec:
+            try:
+                result = benchmark_codec(codec.value, frames, args.fps, folder)
+            except RuntimeError as e:
+                print(f"{codec.value:<6} skipped: {e}")
+                continue
+            print(
+                f"{codec.value:<6} {result['fps']:>11.1f} "
+                f"{result['bytes_per_frame']:>12.0f} "
+                f"{raw_size / result['bytes_per_frame']:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,237 @@
+import copy
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import Queue
+from typing import Any, Callable, Dict, Union
+
+from argussight.core.video_processes.vprocess import ProcessError
+
+# Commands taking a single dict of changes. If such a command is still waiting,
+# a new one setting at least the same keys replaces it, so that bursts (e.g. of
+# settings while dragging an ROI) reach the process as one command with the
+# newest values.
+COALESCED_COMMANDS = ("settings",)
+
+
+class Dispatcher:
+    """Sends the commands of one process and matches the responses to them.
+
+    Lives as long as its process. Up to max_in_flight commands are sent
+    (pipelined) without waiting for the responses, which carry the id of
+    their request. Further commands wait, settings changes are coalesced
+    there. Every caller has its own deadline and gets a ProcessError once it
+    has passed. If the process does not answer its oldest command within
+    wait_time, or before the later deadline the caller gave that command, it
+    is considered dead and on_failure is called.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command_queue: Queue,
+        response_queue: Queue,
+        wait_time: float,
+        on_failure: Callable[[str], None],
+        max_waiting: int = 20,
+        max_in_flight: int = 4,
+    ) -> None:
+        self._name = name
+        self._command_queue = command_queue
+        self._response_queue = response_queue
+        self._wait_time = wait_time
+        self._on_failure = on_failure
+        self._max_waiting = max_waiting
+        self._max_in_flight = max_in_flight
+
+        self._request_ids = itertools.count(1)
+        self._waiting = deque()
+        self._in_flight: Dict[int, Dict[str, Any]] = {}
+        # last time the process answered, or got a command when it had none
+        self._last_activity = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._failed = False
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    # returns a future resolving to the result of the command or a ProcessError
+    def submit(self, command: str, args, timeout: Union[float, None] = None) -> Future:
+        future = Future()
+        deadline = time.monotonic() + (timeout or 2 * self._wait_time)
+        # a command with an explicit timeout may keep the process busy until then
+        allowed_until = deadline if timeout else 0.0
+        with self._lock:
+            if self._stopped:
+                raise ProcessError(
+                    f"An error occured in process {self._name}. Process is no longer alive."
+                )
+            if command in COALESCED_COMMANDS and self._coalesce(
+                command, args, future, deadline, allowed_until
+            ):
+                return future
+            if len(self._waiting) >= self._max_waiting:
+                raise ProcessError(
+                    f"Cannot execute command {command}: too many commands in waiting list"
+                )
+            self._waiting.append(
+                {
+                    "command": command,
+                    # a copy, coalesced commands are merged into it
+                    "args": copy.deepcopy(args),
+                    "futures": [future],
+                    "deadlines": {future: deadline},
+                    "allowed_until": allowed_until,
+                }
+            )
+            self._send_waiting()
+        return future
+
+    # Replaces the same command waiting last in the list if the new one sets
+    # at least its keys. The callers of both get the result of the new one,
+    # changes of other keys are sent on their own, so that no caller fails
+    # because of the values of another.
+    def _coalesce(
+        self, command: str, args, future: Future, deadline: float, allowed_until: float
+    ) -> bool:
+        if not self._waiting or self._waiting[-1]["command"] != command:
+            return False
+        last = self._waiting[-1]
+        if not set(last["args"][0]).issubset(args[0]):
+            return False
+        last["args"] = copy.deepcopy(args)
+        last["futures"].append(future)
+        last["deadlines"][future] = deadline
+        last["allowed_until"] = max(last["allowed_until"], allowed_until)
+        return True
+
+    def _send_waiting(self) -> None:
+        while self._waiting and len(self._in_flight) < self._max_in_flight:
+            entry = self._waiting.popleft()
+            # the callers may have given up on the command in the meantime
+            entry["futures"] = [
+                future
+                for future in entry["futures"]
+                if future.set_running_or_notify_cancel()
+            ]
+            if not entry["futures"]:
+                continue
+            if not self._in_flight:
+                self._last_activity = time.monotonic()
+            request_id = next(self._request_ids)
+            self._in_flight[request_id] = entry
+            self._command_queue.put((request_id, entry["command"], entry["args"]))
+
+    @staticmethod
+    def _resolve(entry: Dict[str, Any], result: Any) -> None:
+        for future in entry["futures"]:
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _expire(self, now: float) -> None:
+        for entry in list(self._waiting):
+            for future in list(entry["futures"]):
+                if entry["deadlines"][future] > now:
+                    continue
+                entry["futures"].remove(future)
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(
+                        ProcessError(
+                            f"Process {self._name} is busy and could not start command in time. Try again later."
+                        )
+                    )
+            if not entry["futures"]:
+                self._waiting.remove(entry)
+        # the process still answers these later, the results are dropped then
+        for entry in self._in_flight.values():
+            for future in entry["futures"]:
+                if entry["deadlines"][future] <= now and not future.done():
+                    future.set_exception(
+                        ProcessError(
+                            f"Command {entry['command']} could not be executed in time by process {self._name}."
+                        )
+                    )
+
+    def _next_wake_up(self, now: float) -> float:
+        deadlines = [
+            entry["deadlines"][future]
+            for entry in itertools.chain(self._waiting, self._in_flight.values())
+            for future in entry["futures"]
+            if not future.done()
+        ]
+        if self._in_flight:
+            deadlines.append(self._stall_limit())
+        # commands submitted meanwhile may have earlier deadlines
+        return min([now + 0.1] + deadlines) - now
+
+    # The process is stalled if it does not answer within wait_time, unless
+    # its oldest command was given a later deadline
+    def _stall_limit(self) -> float:
+        oldest = self._in_flight[min(self._in_flight)]
+        return max(self._last_activity + self._wait_time, oldest["allowed_until"])
+
+    def _receive(self) -> None:
+        timeout = 1.0
+        while True:
+            try:
+                request_id, result = self._response_queue.get(
+                    timeout=max(timeout, 0.001)
+                )
+            except queue.Empty:
+                request_id = None
+            except (EOFError, OSError):
+                # the queue was closed together with the process
+                return
+
+            with self._lock:
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                # deadlines first, a late response does not count as in time
+                self._expire(now)
+                if request_id is not None:
+                    self._last_activity = now
+                    entry = self._in_flight.pop(request_id, None)
+                    if entry is not None:
+                        self._resolve(entry, result)
+                elif self._in_flight and now > self._stall_limit():
+                    break
+                self._send_waiting()
+                timeout = self._next_wake_up(now)
+
+        print(f"Process {self._name} did not respond in time {self._wait_time}")
+        self._failed = True
+        self.stop(
+            ProcessError(
+                f"Command could not be executed in time {self._wait_time}. Hence process {self._name} is getting terminated"
+            )
+        )
+        self._on_failure(self._name)
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    # fails all open commands, the dispatcher can not be used afterwards
+    def stop(self, error: Union[Exception, None] = None) -> None:
+        error = error or ProcessError(
+            f"An error occured in process {self._name}. Process is no longer alive."
+        )
+        with self._lock:
+            self._stopped = True
+            entries = list(self._waiting) + list(self._in_flight.values())
+            self._waiting.clear()
+            self._in_flight.clear()
+        for entry in entries:
+            for future in entry["futures"]:
+                if not future.done() and (
+                    future.running() or future.set_running_or_notify_cancel()
+                ):
+                    future.set_exception(error)
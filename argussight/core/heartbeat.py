@@ -0,0 +1,112 @@
+import struct
+import time
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+from typing import Any, Dict, Union
+
+FRAME_TIME_FORMAT = "%H:%M:%S.%f"
+
+
+class Heartbeat:
+    """Liveness and frame rate of a process, published in shared memory.
+
+    The process beats in every iteration of its loop and reports every frame
+    it handled. Every window seconds it measures the rate it handles frames at
+    and the frame rate of the camera, from the numbers and time stamps of the
+    frames. A process working off a backlog thus shows a camera frame rate
+    above its own. The spawner reads the values without involving the process.
+    """
+
+    # last beat, last handled frame, fps, camera fps, handled and missed frames
+    _LAYOUT = struct.Struct("<ddddQQ")
+
+    def __init__(self, window: float = 1.0) -> None:
+        self._shm = shared_memory.SharedMemory(create=True, size=self._LAYOUT.size)
+        self._window = window
+
+        # state of the measurement, only used by the process writing
+        self._window_start = None
+        self._window_frames = 0
+        self._first_frame = None
+        self._last_number = None
+        self._last_frame = 0.0
+        self._fps = 0.0
+        self._camera_fps = 0.0
+        self._frames = 0
+        self._missed_frames = 0
+        # a new process is alive from its creation on
+        self.beat()
+
+    def beat(self, now: Union[float, None] = None) -> None:
+        self._LAYOUT.pack_into(
+            self._shm.buf,
+            0,
+            now or time.monotonic(),
+            self._last_frame,
+            self._fps,
+            self._camera_fps,
+            self._frames,
+            self._missed_frames,
+        )
+
+    def frame_handled(self, frame: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        number = frame["frame_number"]
+        if self._last_number is not None and number > self._last_number + 1:
+            self._missed_frames += number - self._last_number - 1
+        self._last_number = number
+        self._frames += 1
+        self._last_frame = now
+
+        if self._window_start is None:
+            self._start_window(now, frame)
+        else:
+            self._window_frames += 1
+            elapsed = now - self._window_start
+            if elapsed >= self._window:
+                self._fps = self._window_frames / elapsed
+                self._camera_fps = self._measure_camera_fps(frame, elapsed)
+                self._start_window(now, frame)
+        self.beat(now)
+
+    def _start_window(self, now: float, frame: Dict[str, Any]) -> None:
+        self._window_start = now
+        self._window_frames = 0
+        self._first_frame = {
+            "frame_number": frame["frame_number"],
+            "time": frame.get("time"),
+        }
+
+    def _measure_camera_fps(self, frame: Dict[str, Any], elapsed: float) -> float:
+        numbers = frame["frame_number"] - self._first_frame["frame_number"]
+        if frame.get("time") is None or self._first_frame["time"] is None:
+            return numbers / elapsed
+        # time stamps of the camera, the stream only contains the time of day
+        span = datetime.strptime(frame["time"], FRAME_TIME_FORMAT) - datetime.strptime(
+            self._first_frame["time"], FRAME_TIME_FORMAT
+        )
+        if span < timedelta(0):
+            span += timedelta(days=1)
+        seconds = span.total_seconds()
+        return numbers / seconds if seconds > 0 else 0.0
+
+    def read(self) -> Dict[str, float]:
+        """Latest published values, the ages are in seconds"""
+        beat, last_frame, fps, camera_fps, frames, missed = self._LAYOUT.unpack_from(
+            self._shm.buf, 0
+        )
+        now = time.monotonic()
+        return {
+            "heartbeat_age": now - beat,
+            "last_frame_age": now - last_frame if last_frame else -1.0,
+            "fps": fps,
+            "camera_fps": camera_fps,
+            "frames": frames,
+            "missed_frames": missed,
+        }
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.unlink()
@@ -0,0 +1,61 @@
+import socket
+import threading
+from collections import deque
+from typing import Union
+
+from argussight.core.video_processes.vprocess import ProcessError
+
+
+def can_bind(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # like the stream servers, so that ports in TIME_WAIT count as free
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(("", port))
+        except OSError:
+            return False
+        return True
+
+
+class PortAllocator:
+    """Hands out the ports of the streams, starting at start_port.
+
+    A port is only handed out if it can be bound and never twice until it is
+    released. Released ports are kept in a free list and handed out again
+    before new ones, so allocating does not probe the ports of all running
+    streams again.
+    """
+
+    def __init__(self, start_port: int, end_port: int = 65535) -> None:
+        self._next_port = start_port
+        self._end_port = end_port
+        self._free = deque()
+        self._allocated = set()
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            # released ports may have been taken by others in the meantime
+            while self._free:
+                port = self._free.popleft()
+                if can_bind(port):
+                    self._allocated.add(port)
+                    return port
+            while self._next_port <= self._end_port:
+                port = self._next_port
+                self._next_port += 1
+                if can_bind(port):
+                    self._allocated.add(port)
+                    return port
+        raise ProcessError("There is no free port left for streams")
+
+    def release(self, port: Union[int, None]) -> None:
+        with self._lock:
+            if port in self._allocated:
+                self._allocated.remove(port)
+                self._free.append(port)
+
+    @property
+    def allocated(self) -> set:
+        with self._lock:
+            return set(self._allocated)
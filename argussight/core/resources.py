@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Union
+
+import cv2
+import psutil
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # the BLAS thread pools are then left as they are
+    threadpool_limits = None
+
+
+def parse_cpus(value: Union[str, List[int]]) -> List[int]:
+    """CPU set given as list of cores or as string like "0-3,6" """
+    if isinstance(value, list):
+        cpus = value
+    else:
+        cpus = []
+        for part in str(value).split(","):
+            first, _, last = part.strip().partition("-")
+            cpus += range(int(first), int(last or first) + 1)
+    available = set(psutil.Process().cpu_affinity())
+    if not cpus or not set(cpus).issubset(available):
+        raise ValueError(f"CPU set {value} is not a subset of the cores {available}")
+    return sorted(set(cpus))
+
+
+def load_resources(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resources of a worker type from its entry in config.yaml.
+
+    Keys that are not given are None: the cores are not restricted, the nice
+    level is inherited and the thread count is shared out by the spawner.
+    """
+    resources = {"cpus": None, "nice": None, "threads": None}
+    if config.get("cpus") is not None:
+        resources["cpus"] = parse_cpus(config["cpus"])
+    if config.get("nice") is not None:
+        resources["nice"] = int(config["nice"])
+    if config.get("threads") is not None:
+        resources["threads"] = int(config["threads"])
+        if resources["threads"] < 1:
+            raise ValueError("A worker needs at least one thread")
+    return resources
+
+
+def apply_process_resources(resources: Dict[str, Any]) -> None:
+    """Applies the resources to the calling process, before it starts threads.
+
+    CPU set and nice level are set per thread, only threads and child
+    processes started afterwards inherit them from the calling thread.
+    """
+    process = psutil.Process()
+    try:
+        if resources["cpus"] is not None:
+            process.cpu_affinity(resources["cpus"])
+        if resources["nice"] is not None:
+            try:
+                process.nice(resources["nice"])
+            except psutil.AccessDenied:
+                # lowering the nice level needs privileges
+                print(f"Not allowed to set nice level {resources['nice']}")
+    except psutil.Error as e:
+        print(f"Could not apply resources {resources}: {e}")
+    if resources["threads"] is not None:
+        set_thread_count(resources["threads"])
+
+
+# threads of every worker without a configured count, if the cores are shared
+# out among all running workers
+def default_thread_count(workers: int) -> int:
+    cores = len(psutil.Process().cpu_affinity())
+    return max(1, cores // max(workers, 1))
+
+
+def set_thread_count(threads: int) -> None:
+    """Limits the thread pools of OpenCV and BLAS of the calling process"""
+    cv2.setNumThreads(threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
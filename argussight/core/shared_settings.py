@@ -0,0 +1,113 @@
+import json
+import struct
+import time
+from collections.abc import MutableMapping
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator
+
+from argussight.core.video_processes.vprocess import ProcessError
+
+DEFAULT_SETTINGS_SIZE = 64 * 1024
+# a writer that died while publishing leaves the sequence odd for good
+READ_ATTEMPTS = 50
+READ_RETRY_DELAY = 0.002
+
+
+class SharedSettings(MutableMapping):
+    """Settings of a process, published as versioned JSON in shared memory.
+
+    The process owning the settings writes them, every change publishes a new
+    snapshot with a higher version. Other processes (the spawner) read the
+    snapshot directly from shared memory, it is only parsed again if the
+    version changed. A sequence number that is odd while a snapshot is written
+    lets readers retry instead of reading half written snapshots. If no
+    complete snapshot can be read after a few retries, the last one read is
+    returned.
+    """
+
+    # sequence, version, length of the JSON snapshot
+    _HEADER = struct.Struct("<QQI")
+
+    def __init__(self, size: int = DEFAULT_SETTINGS_SIZE) -> None:
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self._HEADER.size + size
+        )
+        self._capacity = size
+        self._cache: Dict[str, Any] = {}
+        self._cache_version = 0
+        self._publish({})
+
+    @property
+    def version(self) -> int:
+        return self._read_header()[1]
+
+    def _read_header(self) -> tuple:
+        return self._HEADER.unpack_from(self._shm.buf, 0)
+
+    def _publish(self, settings: Dict[str, Any]) -> None:
+        data = json.dumps(settings).encode()
+        if len(data) > self._capacity:
+            raise ProcessError(
+                f"Settings need {len(data)} bytes, only {self._capacity} are available"
+            )
+        # the version continues from the published one, which may have been
+        # written by the process that created the settings before forking
+        sequence, version, _ = self._read_header()
+        buf = self._shm.buf
+        struct.pack_into("<Q", buf, 0, sequence + 1)
+        buf[self._HEADER.size : self._HEADER.size + len(data)] = data
+        self._HEADER.pack_into(buf, 0, sequence + 2, version + 1, len(data))
+        # cache what readers get, e.g. tuples become lists
+        self._cache = json.loads(data)
+        self._cache_version = version + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest published settings, without any call to the owning process"""
+        return dict(self._current())
+
+    # the returned dict is shared by all readers and must not be modified
+    def _current(self) -> Dict[str, Any]:
+        for attempt in range(READ_ATTEMPTS):
+            if attempt:
+                time.sleep(READ_RETRY_DELAY)
+            sequence, version, length = self._read_header()
+            if sequence % 2:
+                continue
+            if version == self._cache_version:
+                return self._cache
+            data = bytes(self._shm.buf[self._HEADER.size : self._HEADER.size + length])
+            if self._read_header()[0] != sequence:
+                continue
+            self._cache = json.loads(data)
+            self._cache_version = version
+            return self._cache
+        return self._cache
+
+    def __getitem__(self, key: str) -> Any:
+        return self._current()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.update({key: value})
+
+    def __delitem__(self, key: str) -> None:
+        settings = self.snapshot()
+        del settings[key]
+        self._publish(settings)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._current())
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    # publish all changes as one snapshot
+    def update(self, other=(), **kwargs) -> None:
+        settings = self.snapshot()
+        settings.update(other, **kwargs)
+        self._publish(settings)
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.unlink()
@@ -1,31 +1,66 @@
+import concurrent.futures
+import contextlib
+import fnmatch
+import functools
 import importlib
 import inspect
 import multiprocessing
+import multiprocessing.connection
 import os
-import queue
 import threading
-from typing import Any, Dict, List, Tuple
+import time
+from typing import Any, Dict, List, Tuple, Union
 
 import psutil
 import requests
 import yaml
 
 import argussight.streamsproxy as StreamsProxy
-from argussight.core.helper_functions import find_close_key, find_free_port
-from argussight.core.manager import Manager
-from argussight.core.video_processes.streamer.streamer import Streamer
+from argussight.core.dispatcher import Dispatcher
+from argussight.core.heartbeat import Heartbeat
+from argussight.core.helper_functions import find_close_key
+from argussight.core.port_allocator import PortAllocator
+from argussight.core.resources import default_thread_count, load_resources
+from argussight.core.shared_settings import DEFAULT_SETTINGS_SIZE, SharedSettings
+from argussight.core.video_processes.streamer.streamer import (
+    RESULTS_CHANNEL_PREFIX,
+    Streamer,
+)
 from argussight.core.video_processes.vprocess import ProcessError, Vprocess
+from argussight.core.watchdog import Watchdog
+from argussight.core.worker_pool import WorkerPool, create_worker_instance, run_worker
+
+# minimal time (s) between two measurements of the resource usage of a process
+USAGE_INTERVAL = 0.5
 
 
 class Spawner:
     def __init__(self, collector_config) -> None:
         self._processes = {}
+        # processes are added and removed by the server, the watchdog and the
+        # dispatchers concurrently
+        self._processes_lock = threading.Lock()
         self._worker_classes = {}
-        self._managers_dict = {}
+        # cores, nice level and thread count of the worker types
+        self._resources = {}
+        self._threads_lock = threading.Lock()
+        # thread counts are balanced once after a batch of starts and stops
+        self._balance_deferred = 0
+        self._balance_pending = False
+        self._usage_lock = threading.Lock()
+        # names of processes that are being started
+        self._start_lock = threading.Lock()
+        self._starting = set()
+        self._ports = None
         self._restricted_classes = []
         self._streamer_types = []
+        # streamer types that publish results instead of a stream
+        self._results_only_types = []
+        self._worker_pool = None
+        self._watchdog = None
+        # problems of processes reported by the watchdog, by name
+        self._alerts = {}
         self.collector_config = collector_config
-        self._settings_manager = multiprocessing.Manager()
         self._streams = set([])
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -41,9 +76,44 @@ class Spawner:
         with open(path_config_file, "r") as f:
             self.config = yaml.safe_load(f)
         self.load_worker_classes()
-
-        for process in self.config["processes"]:
-            self.start_process(process["name"], process["type"])
+        self._ports = PortAllocator(self.config["streams_starting_port"])
+
+        # the configured processes are started concurrently
+        for name, error in self.start_processes(
+            [(process["name"], process["type"]) for process in self.config["processes"]]
+        ):
+            if error is not None:
+                raise error
+
+        # idle workers are started in the background, later processes use them
+        if self.config.get("worker_pool_size", 0) > 0:
+            self._worker_pool = WorkerPool(
+                self.config["worker_pool_size"],
+                self.collector_config,
+                self.create_settings,
+                self.reserve_port,
+                self.release_port,
+            )
+            self._worker_pool.refill()
+
+        if self.config.get("watchdog", {}).get("enabled", False):
+            self._watchdog = Watchdog(
+                self.config["watchdog"],
+                self.get_watched_processes,
+                self.restart_process,
+                self.set_alert,
+            )
+            self._watchdog.start()
+
+    # Stops the watchdog and ends the idle workers of the pool. Running
+    # processes are left to the caller.
+    def close(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+            self._worker_pool = None
 
     def load_worker_classes(self):
         worker_classes_config = self.config["worker_classes"]
@@ -53,19 +123,47 @@ class Spawner:
             module_name, class_name = class_path.rsplit(".", 1)
             module = importlib.import_module(modules_path + "." + module_name)
             self._worker_classes[key] = getattr(module, class_name)
+            # parse the configs of the class once, all its workers use them
+            self._worker_classes[key].load_class_config()
+            self._resources[key] = load_resources(worker_class.get("resources", {}))
             if not worker_class["accessible"]:
                 self._restricted_classes.append(key)
             if issubclass(self._worker_classes[key], Streamer):
-                self._streamer_types.append(key)
+                if worker_class.get("results_only", False):
+                    self._results_only_types.append(key)
+                else:
+                    self._streamer_types.append(key)
 
     def create_worker(
-        self, worker_type: str, free_port, settings: Dict[str, Any]
+        self,
+        worker_type: str,
+        free_port,
+        settings: Dict[str, Any],
+        results_channel: Union[str, None] = None,
     ) -> Vprocess:
-        if worker_type in self._streamer_types:
-            return self._worker_classes.get(worker_type)(
-                self.collector_config, free_port, settings
+        return create_worker_instance(
+            self._worker_classes[worker_type],
+            self.collector_config,
+            free_port,
+            settings,
+            results_channel,
+        )
+
+    # channel results-only processes of worker_type publish on, or None
+    def results_channel(self, name: str, worker_type: str) -> Union[str, None]:
+        if worker_type not in self._results_only_types:
+            return None
+        return RESULTS_CHANNEL_PREFIX + name
+
+    def get_results_channel(self, name: str) -> str:
+        self.check_for_running_process(name)
+        channel = self._processes[name]["results_channel"]
+        if channel is None:
+            raise ProcessError(
+                f"{name} does not publish results, only processes of the types "
+                f"{self._results_only_types} do"
             )
-        return self._worker_classes.get(worker_type)(self.collector_config, settings)
+        return channel
 
     def add_process(
         self,
@@ -75,14 +173,89 @@ class Spawner:
         command_queue: multiprocessing.Queue,
         response_queue: multiprocessing.Queue,
         settings: Dict[str, Any],
+        heartbeat: Heartbeat,
+        port: Union[int, None] = None,
     ) -> None:
-        self._processes[name] = {
+        entry = {
             "process_instance": process,
             "command_queue": command_queue,
             "response_queue": response_queue,
             "type": worker_type,
             "settings": settings,
+            "heartbeat": heartbeat,
+            "port": port,
+            "results_channel": self.results_channel(name, worker_type),
+            "dispatcher": Dispatcher(
+                name,
+                command_queue,
+                response_queue,
+                self.config["wait_time"],
+                self.dispatcher_failed,
+            ),
+            "usage": {
+                "time": 0.0,
+                "cpu_time": 0.0,
+                "cpu_percent": 0.0,
+                "memory_rss": 0,
+                "threads": 0,
+            },
+            # a configured thread count is set by the process itself
+            "threads": self._resources[worker_type]["threads"],
         }
+        try:
+            # kept, so that the usage is measured from the last call on
+            entry["psutil"] = psutil.Process(process.pid)
+        except psutil.Error:
+            entry["psutil"] = None
+        with self._processes_lock:
+            self._processes[name] = entry
+        self.balance_threads()
+
+    # Workers without a configured thread count share the cores, so their
+    # counts change with the number of running workers
+    def balance_threads(self) -> None:
+        with self._threads_lock:
+            if self._balance_deferred:
+                self._balance_pending = True
+                return
+            processes = list(self._processes.items())
+            default = default_thread_count(len(processes))
+            for name, process in processes:
+                threads = self._resources[process["type"]]["threads"] or default
+                if process.get("threads") == threads:
+                    continue
+                if not self._worker_classes[process["type"]].handles_hidden_commands():
+                    continue
+                try:
+                    future = self.submit_command(name, "threads", [threads])
+                except ProcessError as e:
+                    print(f"Could not set thread count of {name}: {e}")
+                    continue
+                process["threads"] = threads
+                future.add_done_callback(
+                    functools.partial(self.report_thread_count, name)
+                )
+
+    # balance_threads calls within the block are done once at its end
+    @contextlib.contextmanager
+    def balancing_deferred(self):
+        with self._threads_lock:
+            self._balance_deferred += 1
+        try:
+            yield
+        finally:
+            with self._threads_lock:
+                self._balance_deferred -= 1
+                balance = not self._balance_deferred and self._balance_pending
+                if balance:
+                    self._balance_pending = False
+            if balance:
+                self.balance_threads()
+
+    @staticmethod
+    def report_thread_count(name: str, future: concurrent.futures.Future) -> None:
+        if future.exception() is not None:
+            print(f"Could not set thread count of {name}: {future.exception()}")
 
     # This function checks if worker_type can be accessed
     def check_restricted_access(self, worker_type: str) -> bool:
@@ -121,30 +294,166 @@ class Spawner:
         )
         self._streams.add(name)
 
+    # reserves name for a process of worker_type that is about to start
+    def reserve_process(self, name: str, worker_type: str) -> None:
+        with self._start_lock:
+            if name in self._processes or name in self._starting:
+                raise ProcessError(
+                    f"Process names must be unique. '{name}' already exists. Either terminate '{name}' or choose a different unique name"
+                )
+            if worker_type not in self._worker_classes:
+                raise ProcessError(f"Type {worker_type} does not exist")
+            self._starting.add(name)
+
+    def release_process(self, name: str) -> None:
+        with self._start_lock:
+            self._starting.discard(name)
+
+    def reserve_port(self) -> int:
+        return self._ports.allocate()
+
+    def release_port(self, port: Union[int, None]) -> None:
+        self._ports.release(port)
+
     def start_process(self, name, type) -> None:
-        if name in self._processes:
-            raise ProcessError(
-                f"Process names must be unique. '{name}' already exists. Either terminate '{name}' or choose a different unique name"
+        self.reserve_process(name, type)
+        try:
+            # check if somebody tries to start a restricted worker type from outside this class
+            if not self.check_restricted_access(type):
+                raise ProcessError(
+                    f"Worker of type {type} can only be started by server."
+                )
+            self.launch_process(name, type)
+        finally:
+            self.release_process(name)
+
+    # starts the processes concurrently, returns the error (or None) of every process
+    def start_processes(
+        self, processes: List[Tuple[str, str]]
+    ) -> List[Tuple[str, Union[Exception, None]]]:
+        results = []
+        to_start = []
+        for name, worker_type in processes:
+            try:
+                self.reserve_process(name, worker_type)
+            except ProcessError as e:
+                results.append((name, e))
+                continue
+            # check if somebody tries to start a restricted worker type from outside this class
+            if not self.check_restricted_access(worker_type):
+                self.release_process(name)
+                results.append(
+                    (
+                        name,
+                        ProcessError(
+                            f"Worker of type {worker_type} can only be started by server."
+                        ),
+                    )
+                )
+                continue
+            results.append((name, None))
+            to_start.append((name, worker_type))
+
+        if to_start:
+            with self.balancing_deferred(), concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(to_start), self.config.get("startup_workers", 8))
+            ) as executor:
+                started = {
+                    name: executor.submit(self.launch_process, name, worker_type)
+                    for name, worker_type in to_start
+                }
+            for name in started:
+                self.release_process(name)
+            results = [
+                (name, error if error is not None else started[name].exception())
+                for name, error in results
+            ]
+        return results
+
+    def launch_process(self, name: str, type: str) -> None:
+        worker = None
+        if self._worker_pool is not None:
+            worker = self._worker_pool.take()
+        if worker is None:
+            self.fork_process(name, type)
+            return
+
+        try:
+            stream_id = self._worker_pool.assign(
+                worker,
+                self._worker_classes[type],
+                self.config["wait_time"],
+                self._resources[type],
+                self.results_channel(name, type),
             )
-        if type not in self._worker_classes:
-            raise ProcessError(f"Type {type} does not exist")
-        # check if somebody tries to start a restricted worker type from outside this class
-        if not self.check_restricted_access(type):
-            raise ProcessError(f"Worker of type {type} can only be started by server.")
-
-        free_port = find_free_port(self.config["streams_starting_port"])
-        settings = self._settings_manager.dict()
-        worker_instance = self.create_worker(type, free_port, settings)
-        command_queue = multiprocessing.Queue()
-        response_queue = multiprocessing.Queue()
-        p = multiprocessing.Process(
-            target=worker_instance.run, args=(command_queue, response_queue)
+        except Exception as e:
+            print(f"Idle worker could not become {name}, starting a new process: {e}")
+            self.fork_process(name, type)
+            return
+
+        print(f"started {name} of type {type} from an idle worker")
+        try:
+            if type in self._streamer_types:
+                self.add_stream(name, worker["port"], stream_id)
+        except Exception:
+            self._worker_pool.discard(worker)
+            raise
+        self.add_process(
+            name,
+            type,
+            worker["process_instance"],
+            worker["command_queue"],
+            worker["response_queue"],
+            worker["settings"],
+            worker["heartbeat"],
+            worker["port"],
+        )
+
+    def create_settings(self) -> SharedSettings:
+        return SharedSettings(
+            self.config.get("settings_memory_size", DEFAULT_SETTINGS_SIZE)
+        )
+
+    def fork_process(self, name: str, type: str) -> None:
+        # only streamers need a port
+        free_port = self.reserve_port() if type in self._streamer_types else None
+        settings = self.create_settings()
+        heartbeat = Heartbeat()
+        p = None
+        try:
+            worker_instance = self.create_worker(
+                type, free_port, settings, self.results_channel(name, type)
+            )
+            worker_instance.attach_heartbeat(heartbeat)
+            command_queue = multiprocessing.Queue()
+            response_queue = multiprocessing.Queue()
+            p = multiprocessing.Process(
+                target=run_worker,
+                args=(
+                    worker_instance,
+                    self._resources[type],
+                    command_queue,
+                    response_queue,
+                ),
+            )
+            print(f"started {name} of type {type}")
+            p.start()
+            if type in self._streamer_types:
+                self.add_stream(name, free_port, worker_instance.get_stream_id())
+        except Exception:
+            # do not leave a process behind that nobody knows about
+            if p is not None and p.is_alive():
+                p.terminate()
+                p.join()
+            settings.close()
+            settings.unlink()
+            heartbeat.close()
+            heartbeat.unlink()
+            self.release_port(free_port)
+            raise
+        self.add_process(
+            name, type, p, command_queue, response_queue, settings, heartbeat, free_port
         )
-        print(f"started {name} of type {type}")
-        p.start()
-        if isinstance(worker_instance, Streamer):
-            self.add_stream(name, free_port, worker_instance.get_stream_id())
-        self.add_process(name, type, p, command_queue, response_queue, settings)
 
     # check if process is running otherwise throw ProcessError
     def check_for_running_process(self, name: str) -> None:
@@ -156,160 +465,254 @@ class Spawner:
 
             raise ProcessError(errorMessage)
 
+    # names of the running processes matching all given selectors, the pattern
+    # is matched like a file name (e.g. "flow_*")
+    def select_processes(
+        self, names: List[str], worker_type: str = "", pattern: str = ""
+    ) -> List[str]:
+        if not (names or worker_type or pattern):
+            raise ProcessError("Select processes by their names, type or a pattern")
+        for name in names:
+            self.check_for_running_process(name)
+        if worker_type and worker_type not in self._worker_classes:
+            raise ProcessError(f"Type {worker_type} is not a known process type.")
+
+        selected = [
+            name
+            for name in (names or list(self._processes))
+            if (not worker_type or self._processes[name]["type"] == worker_type)
+            and (not pattern or fnmatch.fnmatchcase(name, pattern))
+        ]
+        if not selected:
+            raise ProcessError("No running process matches the selection")
+        return selected
+
     def find_process_in_config_by_name(self, name: str) -> Dict:
         for process in self.config["processes"]:
             if process["name"] == name:
                 return process
         return None
 
-    def terminate_processes(self, names: List[str]) -> None:
+    # Returns the names of the processes that were terminated by this call.
+    # With missing_ok, names that are not running (any more) are skipped.
+    def terminate_processes(
+        self, names: List[str], missing_ok: bool = False
+    ) -> List[str]:
+        names = list(dict.fromkeys(names))
         for name in names:
+            process = self._processes.get(name)
+            if process is None and missing_ok:
+                continue
             self.check_for_running_process(name)
-            worker_type = self._processes[name]["type"]
+            worker_type = process["type"]
             # check if somebody tries to kill a restricted worker type from outside this class
             if not self.check_restricted_access(worker_type):
                 raise ProcessError(
                     f"Worker of type {worker_type} can only be terminated by server."
                 )
 
-        for name in names:
-            p = self._processes[name]["process_instance"]
-            worker_type = self._processes[name]["type"]
-            # first kill all possible children
-            parent = psutil.Process(p.pid)
-            children = parent.children(recursive=True)
-            for child in children:
-                print(f"Terminating child process: {child.pid}")
-                child.terminate()
-            # now kill the process itself and clean up
-            p.terminate()
-            p.join()
-            del self._processes[name]["settings"]
-            del self._processes[name]
+        # another thread may have terminated some of them meanwhile
+        with self._processes_lock:
+            processes = {
+                name: self._processes.pop(name)
+                for name in names
+                if name in self._processes
+            }
+        if not processes:
+            return []
+        for process in processes.values():
+            process["dispatcher"].stop()
+        self.stop_processes(
+            [process["process_instance"] for process in processes.values()],
+            self.config.get("terminate_time", 3),
+        )
 
-            if worker_type in self._streamer_types:
-                requests.post(
-                    f"http://localhost:{str(self.config['streams_layer_port'])}/remove-stream",
-                    params={"path": name},
-                )
+        # release the resources of all processes at once
+        removed_streams = []
+        for name, process in processes.items():
+            process["settings"].close()
+            process["settings"].unlink()
+            process["heartbeat"].close()
+            process["heartbeat"].unlink()
+            self._alerts.pop(name, None)
+            self.release_port(process["port"])
+            if process["type"] in self._streamer_types:
+                removed_streams.append(name)
                 self._streams.discard(name)
-
-            print(f"terminated {name} of type {worker_type}")
-            if (
-                worker_type in self._restricted_classes
-                and self.check_restricted_access(worker_type)
-            ):
-                process = self.find_process_in_config_by_name(name)
-                self.start_process(process["name"], process["type"])
-
-    def wait_for_manager(
-        self,
-        finished_event: threading.Event,
-        failed_event: threading.Event,
-        name: str,
-        manager: threading.Thread,
+            print(f"terminated {name} of type {process['type']}")
+        if removed_streams:
+            self.remove_streams(removed_streams)
+
+        # restricted processes are restarted if the spawner itself terminated them
+        restart = []
+        for name, process in processes.items():
+            if process["type"] in self._restricted_classes:
+                if self.check_restricted_access(process["type"]):
+                    restart.append((name, process["type"]))
+        with self.balancing_deferred():
+            if restart:
+                for name, error in self.start_processes(restart):
+                    if error is not None:
+                        print(f"Could not restart {name}: {error}")
+            self.balance_threads()
+        return list(processes)
+
+    # Terminates the processes and their children at the same time. The ones
+    # that did not end within timeout seconds are killed.
+    @staticmethod
+    def stop_processes(
+        processes: List[multiprocessing.Process], timeout: float
     ) -> None:
-        while manager.is_alive():
-            finished_event.wait(timeout=1000)
-            if finished_event.is_set():
-                del self._managers_dict[name]
-                if failed_event.is_set():
-                    self.terminate_processes([name])
-                return
-
-        if name in self._managers_dict:
-            del self._managers_dict[name]
-            print("manager is not alive anymore but hasn't finished")
-
-    def send_command_to_manager(
-        self, name: str, command: str, args
-    ) -> Tuple[threading.Event, queue.Queue]:
-        processed_event = threading.Event()
-        response_queue = queue.Queue()
-
-        self._managers_dict[name]["manager"].receive_command(
-            command, self.config["wait_time"], processed_event, response_queue, args
+        deadline = time.monotonic() + timeout
+        children = []
+        for p in processes:
+            try:
+                children += psutil.Process(p.pid).children(recursive=True)
+            except psutil.NoSuchProcess:
+                # the process has already ended
+                pass
+        for child in children:
+            print(f"Terminating child process: {child.pid}")
+            try:
+                child.terminate()
+            except psutil.NoSuchProcess:
+                pass
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+
+        # the processes are children of the spawner and reaped by join, their
+        # own children are waited for with psutil
+        running = [p for p in processes if p.is_alive()]
+        while running and time.monotonic() < deadline:
+            multiprocessing.connection.wait(
+                [p.sentinel for p in running], deadline - time.monotonic()
+            )
+            running = [p for p in running if p.is_alive()]
+        _, alive_children = psutil.wait_procs(
+            children, max(deadline - time.monotonic(), 0)
         )
 
-        return processed_event, response_queue
-
-    # this function should only be called by the spawner service and used as Thread
-    def manage_process(self, name: str, command: str, args) -> None:
-        self.check_for_running_process(name)
+        for p in running:
+            print(f"Process {p.pid} did not end in time {timeout}, killing it")
+            p.kill()
+        for child in alive_children:
+            try:
+                child.kill()
+            except psutil.NoSuchProcess:
+                pass
+        for p in processes:
+            p.join()
 
-        # Check if manager already exists
-        if name not in self._managers_dict:
-            finished_event = threading.Event()
-            failed_event = threading.Event()
-            self._managers_dict[name] = {
-                "manager": Manager(
-                    self._processes[name]["command_queue"],
-                    self._processes[name]["response_queue"],
-                    finished_event,
-                    failed_event,
-                ),
-                "failed_event": failed_event,
-            }
-            processed_event, result_queue = self.send_command_to_manager(
-                name, command, args
+    def remove_streams(self, names: List[str]) -> None:
+        try:
+            requests.post(
+                f"http://localhost:{str(self.config['streams_layer_port'])}/remove-streams",
+                params={"paths": names},
+                timeout=self.config["wait_time"],
             )
+        except requests.RequestException as e:
+            print(f"Could not remove streams {names} from the proxy: {e}")
+
+    # processes checked by the watchdog, worker classes can opt out
+    def get_watched_processes(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: process
+            for name, process in list(self._processes.items())
+            if self.config["worker_classes"][process["type"]].get("watchdog", True)
+        }
 
-            manager_thread = threading.Thread(
-                target=self._managers_dict[name]["manager"].handle_commands
-            )
-            waiter_thread = threading.Thread(
-                target=self.wait_for_manager,
-                args=(finished_event, failed_event, name, manager_thread),
-            )
-            manager_thread.start()
-            waiter_thread.start()
+    # restarts the process with the same name and type
+    def restart_process(self, name: str) -> None:
+        process = self._processes.get(name)
+        if process is None:
+            self.check_for_running_process(name)
+        worker_type = process["type"]
+        # restricted processes are restarted by terminate_processes itself, a
+        # process somebody else terminated meanwhile is not started again
+        with self.balancing_deferred():
+            terminated = self.terminate_processes([name], missing_ok=True)
+            if terminated and worker_type not in self._restricted_classes:
+                self.start_process(name, worker_type)
+
+    def set_alert(self, name: str, message: Union[str, None]) -> None:
+        if message is None:
+            self._alerts.pop(name, None)
         else:
+            self._alerts[name] = message
+
+    # called by the dispatcher of a process that stopped responding
+    def dispatcher_failed(self, name: str) -> None:
+        self.terminate_processes([name], missing_ok=True)
+
+    # queues the command and returns without waiting for the process, the future
+    # resolves to the result of the command or to a ProcessError (at the latest
+    # after timeout, which defaults to twice wait_time)
+    def submit_command(
+        self, name: str, command: str, args, timeout: Union[float, None] = None
+    ) -> concurrent.futures.Future:
+        self.check_for_running_process(name)
+        try:
+            return self._processes[name]["dispatcher"].submit(command, args, timeout)
+        except ProcessError as e:
+            raise ProcessError(e.message + f" for {name}. Try again later")
+
+    # blocking version of submit_command
+    def manage_process(
+        self, name: str, command: str, args, timeout: Union[float, None] = None
+    ) -> Any:
+        return self.submit_command(name, command, args, timeout).result()
+
+    # CPU usage is measured between two calls at least USAGE_INTERVAL apart,
+    # callers in between (e.g. several clients watching) get the cached values
+    def get_usage(self, process: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._usage_lock:
+            usage = process["usage"]
+            if process["psutil"] is None or now - usage["time"] < USAGE_INTERVAL:
+                return usage
             try:
-                processed_event, result_queue = self.send_command_to_manager(
-                    name, command, args
+                with process["psutil"].oneshot():
+                    cpu_times = process["psutil"].cpu_times()
+                    memory_rss = process["psutil"].memory_info().rss
+                    threads = process["psutil"].num_threads()
+            except psutil.Error:
+                return usage
+            cpu_time = cpu_times.user + cpu_times.system
+            cpu_percent = 0.0
+            if usage["time"]:
+                cpu_percent = (
+                    100 * (cpu_time - usage["cpu_time"]) / (now - usage["time"])
                 )
-                failed_event = self._managers_dict[name]["failed_event"]
-            except ProcessError as e:
-                e.message += f" for {name}. Try again later"
-
-        is_processing = processed_event.wait(timeout=self.config["wait_time"])
-        if is_processing:
-            try:
-                result = result_queue.get(timeout=self.config["wait_time"])
-                if isinstance(result, Exception):
-                    raise result
-
-                return
-            except queue.Empty:
-                wait_time = self.config["wait_time"]
-                raise ProcessError(
-                    f"Command {command} could not be executed in time {wait_time}. Hence process {name} is getting terminated"
-                )
-
-        elif failed_event.is_set():
-            raise ProcessError(
-                f"An error occured in process {name}. Process is no longer alive."
-            )
-        else:
-            raise ProcessError(
-                f"Process {name} is busy and could not start command in time. Try again later."
-            )
+            process["usage"] = {
+                "time": now,
+                "cpu_time": cpu_time,
+                "cpu_percent": cpu_percent,
+                "memory_rss": memory_rss,
+                "threads": threads,
+            }
+            return process["usage"]
 
     def get_processes(self):
         running_processes = {}
-        for uname, process in self._processes.items():
+        for uname, process in list(self._processes.items()):
             type = process["type"]
             current_class = self._worker_classes[type]
+            hidden_commands = current_class.create_hidden_commands_list()
             commands = [
                 command
                 for command in current_class.create_commands_dict().keys()
-                if command != "settings" and command != "default_settings"
+                if command not in hidden_commands
             ]
-            settings = dict(process["settings"])
+            # read from shared memory, the process itself is not involved
+            settings = process["settings"].snapshot()
             running_processes[uname] = {
                 "type": type,
                 "commands": commands,
                 "settings": settings,
+                "alert": self._alerts.get(uname, ""),
+                "usage": self.get_usage(process),
+                "heartbeat": process["heartbeat"].read(),
             }
 
         available_types = [
@@ -0,0 +1,635 @@
+import concurrent.futures
+import os
+import shutil
+import struct
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from enum import Enum
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+import cv2
+import numpy as np
+
+from argussight.core.video_processes.savers.frame_buffers import (
+    FrameEncoding,
+    MmapFrameReader,
+    decode_frame,
+    time_stamp_to_seconds,
+)
+from argussight.core.video_processes.savers.video_writers import (
+    VideoCodec,
+    get_video_writer,
+)
+from argussight.core.video_processes.vprocess import ProcessError
+
+# same quality as the PIL default used for frames saved by the savers themselves
+JPEG_QUALITY = 75
+# used when the frame rate cannot be derived from the frame time stamps
+DEFAULT_VIDEO_FPS = 30
+
+
+class SaveFormat(Enum):
+    VIDEO = "video"
+    FRAMES = "frames"
+    BOTH = "both"
+
+
+class FrameSource(Enum):
+    RAW = "raw"  # raw RGB data, copied to shared memory
+    ENCODED = "encoded"  # compressed data (see FrameEncoding), copied to shared memory
+    FILE = "file"  # JPEG file on disk
+    MAPPED = "mapped"  # slot of a MmapFrameBuffer
+
+
+def default_video_options() -> Dict[str, Any]:
+    return {
+        "codec": VideoCodec.MJPG.value,
+        # 0 derives the frame rate from the frame time stamps
+        "fps": 0,
+        "jpeg_quality": JPEG_QUALITY,
+        "date_format": "%H:%M:%S.%f",
+    }
+
+
+class JobState(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATES = (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class JobControl:
+    """Progress and cancellation flag of an export, kept in shared memory.
+
+    The block is created by the saver and attached to by the export worker.
+    The worker is the only one writing the progress, the saver the only one
+    setting the cancellation flag.
+    """
+
+    # running flag, cancel flag, frames written, bytes written, start time,
+    # frames skipped
+    _LAYOUT = struct.Struct("<BBQQdQ")
+
+    def __init__(self, name: Union[str, None] = None) -> None:
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=self._LAYOUT.size)
+            self._shm.buf[:] = bytes(self._LAYOUT.size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def read(self) -> Dict[str, Any]:
+        running, cancel, frames, nbytes, start, skipped = self._LAYOUT.unpack_from(
+            self._shm.buf
+        )
+        return {
+            "running": bool(running),
+            "cancel_requested": bool(cancel),
+            "frames_written": frames,
+            "bytes_written": nbytes,
+            "start_time": start,
+            "frames_skipped": skipped,
+        }
+
+    def start(self) -> None:
+        struct.pack_into("<B", self._shm.buf, 0, 1)
+        struct.pack_into("<d", self._shm.buf, 18, time.time())
+
+    def request_cancel(self) -> None:
+        struct.pack_into("<B", self._shm.buf, 1, 1)
+
+    # skipped frames are done without being written, e.g. unreadable ones
+    def add_progress(self, frames: int, nbytes: int, skipped: int = 0) -> None:
+        _, cancel, written, total_bytes, _, total_skipped = self._LAYOUT.unpack_from(
+            self._shm.buf
+        )
+        struct.pack_into(
+            "<QQ", self._shm.buf, 2, written + frames, total_bytes + nbytes
+        )
+        struct.pack_into("<Q", self._shm.buf, 26, total_skipped + skipped)
+        if cancel:
+            raise ExportCancelled("Export was cancelled")
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+class ExportJob:
+    """Frames to export, collected by a saver and exported by an export worker.
+
+    Frame data held in memory by the saver is copied into a single shared
+    memory block by pack(), so that the export worker can read it without
+    pickling the frames. Frames on disk are only referenced. The saver keeps
+    track of the job through its JobControl block and its future.
+    """
+
+    def __init__(
+        self,
+        save_folder: str,
+        save_format: str,
+        max_bandwidth: float = 0,
+        delete_folder: Union[str, None] = None,
+        video_options: Union[Dict[str, Any], None] = None,
+    ) -> None:
+        self.job_id = uuid.uuid4().hex[:12]
+        self.save_folder = save_folder
+        self.save_format = save_format
+        self.max_bandwidth = max_bandwidth
+        self.delete_folder = delete_folder
+        self.video_options = video_options or default_video_options()
+        self.state = JobState.QUEUED
+        self.error = ""
+        self.future: Union[concurrent.futures.Future, None] = None
+        self._frames: List[Dict[str, Any]] = []
+        self._data: List[bytes] = []
+        self._shm = None
+        self._control: Union[JobControl, None] = None
+        self._progress: Dict[str, Any] = {}
+        self._cancel_requested = False
+        self._lock = threading.Lock()
+
+    @property
+    def total_frames(self) -> int:
+        # frames are written once per requested output (frames and/or video)
+        outputs = 2 if self.save_format == SaveFormat.BOTH.value else 1
+        return len(self._frames) * outputs
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def _add_in_memory(self, frame: Dict[str, Any], data: bytes) -> None:
+        frame["length"] = len(data)
+        self._frames.append(frame)
+        self._data.append(data)
+
+    def add_raw(self, size: Tuple[int, int], data: bytes, time_stamp: str) -> None:
+        self._add_in_memory(
+            {"source": FrameSource.RAW.value, "size": size, "time_stamp": time_stamp},
+            data,
+        )
+
+    def add_encoded(
+        self, size: Tuple[int, int], data: bytes, encoding: str, time_stamp: str
+    ) -> None:
+        self._add_in_memory(
+            {
+                "source": FrameSource.ENCODED.value,
+                "size": size,
+                "encoding": encoding,
+                "time_stamp": time_stamp,
+            },
+            data,
+        )
+
+    def add_file(self, path: str, time_stamp: str) -> None:
+        self._frames.append(
+            {"source": FrameSource.FILE.value, "path": path, "time_stamp": time_stamp}
+        )
+
+    def add_mapped(self, folder: str, record: tuple) -> None:
+        time_stamp = record[-1].rstrip(b"\x00").decode("ascii")
+        self._frames.append(
+            {
+                "source": FrameSource.MAPPED.value,
+                "folder": folder,
+                "record": record,
+                "time_stamp": time_stamp,
+            }
+        )
+
+    def pack(self) -> Dict[str, Any]:
+        """Copy the in-memory frames to shared memory and describe the job"""
+        self._control = JobControl()
+        total = sum(len(data) for data in self._data)
+        shm_name = None
+        if total > 0:
+            self._shm = shared_memory.SharedMemory(create=True, size=total)
+            offset = 0
+            data_iter = iter(self._data)
+            for frame in self._frames:
+                if "length" not in frame:
+                    continue
+                frame["offset"] = offset
+                self._shm.buf[offset : offset + frame["length"]] = next(data_iter)
+                offset += frame["length"]
+            shm_name = self._shm.name
+        # the saver does not need to keep the frames alive any longer
+        self._data = []
+
+        return {
+            "save_folder": self.save_folder,
+            "save_format": self.save_format,
+            "max_bandwidth": self.max_bandwidth,
+            "delete_folder": self.delete_folder,
+            "video_options": self.video_options,
+            "shm_name": shm_name,
+            "control_name": self._control.name,
+            "frames": self._frames,
+        }
+
+    def submit(self, pool: concurrent.futures.Executor) -> None:
+        with self._lock:
+            if self._cancel_requested:
+                self.state = JobState.CANCELLED
+                self.remove_delete_folder()
+                return
+            self.future = pool.submit(run_export, self.pack())
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.finished:
+                raise ProcessError(f"Job {self.job_id} has already finished")
+            self._cancel_requested = True
+            if self._control is not None:
+                self._control.request_cancel()
+            future = self.future
+        if future is not None:
+            # only succeeds if the job did not start yet, the done callbacks
+            # (e.g. finish) are then run by this thread
+            future.cancel()
+
+    # the export worker removes delete_folder after its run, jobs that never
+    # ran have to do so themselves
+    def remove_delete_folder(self) -> None:
+        if self.delete_folder:
+            shutil.rmtree(self.delete_folder, ignore_errors=True)
+
+    def progress(self) -> Dict[str, Any]:
+        if self._control is not None:
+            self._progress = self._control.read()
+        return self._progress
+
+    def finish(self, future: concurrent.futures.Future) -> None:
+        """Store the final state of the job and free its shared memory"""
+        with self._lock:
+            self._progress = dict(self.progress(), end_time=time.time())
+            if future.cancelled():
+                self.state = JobState.CANCELLED
+                self.remove_delete_folder()
+            elif isinstance(future.exception(), ExportCancelled):
+                self.state = JobState.CANCELLED
+            elif future.exception() is not None:
+                self.state = JobState.FAILED
+                self.error = str(future.exception())
+            else:
+                self.state = JobState.DONE
+            self.release()
+
+    def fail(self, error: Exception) -> None:
+        with self._lock:
+            self.state = JobState.FAILED
+            self.error = str(error)
+            self.release()
+            self.remove_delete_folder()
+
+    def release(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        if self._control is not None:
+            self._control.unlink()
+            self._control = None
+
+    def info(self) -> Dict[str, Any]:
+        progress = self.progress()
+        state = self.state
+        if state == JobState.QUEUED and progress.get("running"):
+            state = JobState.RUNNING
+        duration = 0.0
+        if progress.get("start_time"):
+            end = progress.get("end_time", time.time())
+            duration = max(end - progress["start_time"], 0.0)
+        bytes_written = progress.get("bytes_written", 0)
+        return {
+            "id": self.job_id,
+            "state": state.value,
+            "save_folder": self.save_folder,
+            "total_frames": self.total_frames,
+            "frames_written": progress.get("frames_written", 0),
+            "frames_skipped": progress.get("frames_skipped", 0),
+            "bytes_written": bytes_written,
+            "bytes_per_second": bytes_written / duration if duration > 0 else 0.0,
+            "duration": duration,
+            "error": self.error,
+        }
+
+
+class ExportJobRegistry:
+    """Export jobs of a saver, finished jobs are kept until max_finished is exceeded"""
+
+    def __init__(self, max_finished: int = 50) -> None:
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._max_finished = max_finished
+        self._lock = threading.Lock()
+
+    def add(self, job: ExportJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            finished = [j for j in self._jobs.values() if j.finished]
+            for old_job in finished[: max(0, len(finished) - self._max_finished)]:
+                del self._jobs[old_job.job_id]
+
+    def get(self, job_id: str) -> ExportJob:
+        with self._lock:
+            if job_id not in self._jobs:
+                raise ProcessError(f"Job {job_id} does not exist")
+            return self._jobs[job_id]
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.info() for job in jobs]
+
+
+class ExportProgress:
+    """Reports the progress of an export to its JobControl block.
+
+    It also limits the average write rate of the export to max_bandwidth (MB/s)
+    and aborts the export, once it got cancelled.
+    """
+
+    def __init__(self, control: JobControl, max_bandwidth: float) -> None:
+        self._control = control
+        self._bytes_per_second = max_bandwidth * 1e6
+        self._start = time.monotonic()
+        self._written = 0
+
+    def add(self, frames: int, nbytes: int, skipped: int = 0) -> None:
+        self._control.add_progress(frames, nbytes, skipped)
+        self._written += nbytes
+        if self._bytes_per_second <= 0:
+            return
+        ahead = self._written / self._bytes_per_second - (
+            time.monotonic() - self._start
+        )
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+class FrameLoader:
+    """Gives access to the frames of a packed ExportJob inside an export worker"""
+
+    def __init__(self, job: Dict[str, Any]) -> None:
+        self._shm = None
+        if job["shm_name"]:
+            # the block is owned (and unlinked) by the saver
+            self._shm = shared_memory.SharedMemory(name=job["shm_name"])
+        self._readers: Dict[str, MmapFrameReader] = {}
+        self._skipped = set()
+
+    @property
+    def skipped_frames(self) -> int:
+        return len(self._skipped)
+
+    def _memory(self, frame: Dict[str, Any]) -> bytes:
+        return bytes(self._shm.buf[frame["offset"] : frame["offset"] + frame["length"]])
+
+    def _mapped(self, frame: Dict[str, Any]) -> Union[Dict, None]:
+        if frame["folder"] not in self._readers:
+            self._readers[frame["folder"]] = MmapFrameReader(frame["folder"])
+        return self._readers[frame["folder"]].read(frame["record"])
+
+    def _is_jpeg(self, frame: Dict[str, Any]) -> bool:
+        return (
+            frame["source"] == FrameSource.ENCODED.value
+            and frame["encoding"] == FrameEncoding.JPEG.value
+        )
+
+    def jpeg(self, frame: Dict[str, Any]) -> Union[bytes, None]:
+        """Return the frame as JPEG data if it is already encoded as such"""
+        if frame["source"] == FrameSource.FILE.value:
+            with open(frame["path"], "rb") as f:
+                return f.read()
+        if self._is_jpeg(frame):
+            return self._memory(frame)
+        return None
+
+    def bgr(self, frame: Dict[str, Any]) -> Union[np.ndarray, None]:
+        """Return the frame as cv2 (BGR) image, None if it is not available anymore"""
+        if frame["source"] == FrameSource.FILE.value:
+            return cv2.imread(frame["path"])
+        if self._is_jpeg(frame):
+            data = np.frombuffer(self._memory(frame), dtype=np.uint8)
+            return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+        match frame["source"]:
+            case FrameSource.ENCODED.value:
+                size = frame["size"]
+                data = decode_frame(self._memory(frame), frame["encoding"])
+            case FrameSource.RAW.value:
+                size = frame["size"]
+                data = self._memory(frame)
+            case FrameSource.MAPPED.value:
+                mapped = self._mapped(frame)
+                if mapped is None:
+                    # overwritten by the ring buffer since the job was created
+                    self._skipped.add(frame["record"][0])
+                    return None
+                size, data = mapped["size"], mapped["frame"]
+            case _:
+                raise TypeError(f"FrameSource has no type: {frame['source']}")
+
+        rgb = np.frombuffer(data, dtype=np.uint8).reshape(size[1], size[0], 3)
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    def close(self) -> None:
+        for reader in self._readers.values():
+            reader.close()
+        if self._shm is not None:
+            self._shm.close()
+
+
+def frame_file_name(time_stamp: str) -> str:
+    return "img" + time_stamp + ".jpg"
+
+
+def iterate_images(
+    loader: FrameLoader, frames: List[Dict[str, Any]]
+) -> Iterator[Tuple[Dict[str, Any], np.ndarray]]:
+    for frame in frames:
+        image = loader.bgr(frame)
+        if image is not None:
+            yield frame, image
+
+
+def save_frames(
+    loader: FrameLoader,
+    frames: List[Dict[str, Any]],
+    folder: str,
+    progress: ExportProgress,
+) -> int:
+    os.makedirs(folder, exist_ok=True)
+    written = 0
+    for frame in frames:
+        path = os.path.join(folder, frame_file_name(frame["time_stamp"]))
+        jpeg = loader.jpeg(frame)
+        if jpeg is not None:
+            # already encoded frames are written as they are
+            with open(path, "wb") as f:
+                f.write(jpeg)
+            progress.add(1, len(jpeg))
+        else:
+            image = loader.bgr(frame)
+            if image is None:
+                progress.add(0, 0, 1)
+                continue
+            cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+            progress.add(1, os.path.getsize(path))
+        written += 1
+    return written
+
+
+def frame_times(frames: List[Dict[str, Any]], date_format: str) -> np.ndarray:
+    """Seconds of every frame since the first one"""
+    seconds = np.array(
+        [time_stamp_to_seconds(frame["time_stamp"], date_format) for frame in frames]
+    )
+    # time stamps only hold the time of day, recordings may pass midnight
+    steps = np.diff(seconds, prepend=seconds[:1])
+    steps[steps < 0] += 24 * 3600
+    return np.cumsum(steps)
+
+
+def measured_fps(times: np.ndarray) -> float:
+    if len(times) < 2 or times[-1] <= 0:
+        return DEFAULT_VIDEO_FPS
+    return (len(times) - 1) / times[-1]
+
+
+def frame_repeats(times: np.ndarray, fps: float) -> np.ndarray:
+    """Number of times every frame is written to get a constant frame rate.
+
+    Every tick of the output gets the frame closest in time, frames that are
+    closest to no tick are dropped (0) and frames closest to several ticks
+    are duplicated.
+    """
+    if len(times) < 2:
+        return np.ones(len(times), dtype=np.int64)
+    ticks = np.arange(int(round(times[-1] * fps)) + 1) / fps
+    after = np.clip(np.searchsorted(times, ticks), 1, len(times) - 1)
+    closest = after - ((ticks - times[after - 1]) <= (times[after] - ticks))
+    return np.bincount(closest, minlength=len(times))
+
+
+def save_video(
+    loader: FrameLoader,
+    frames: List[Dict[str, Any]],
+    folder: str,
+    progress: ExportProgress,
+    options: Dict[str, Any],
+) -> int:
+    os.makedirs(folder, exist_ok=True)
+    time_first, time_last = frames[0]["time_stamp"], frames[-1]["time_stamp"]
+    output_file = os.path.join(folder, f"video_{time_first}-{time_last}")
+    writer_class = get_video_writer(options["codec"])
+
+    times = frame_times(frames, options["date_format"])
+    if options["fps"] > 0:
+        fps = options["fps"]
+        repeats = frame_repeats(times, fps)
+    else:
+        fps = measured_fps(times)
+        repeats = np.ones(len(frames), dtype=np.int64)
+
+    out = None
+    written = 0
+    file_size = 0
+    last_image = None
+    try:
+        for frame, repeat in zip(frames, repeats):
+            # dropped frames are not even decoded
+            image = loader.bgr(frame) if repeat > 0 else None
+            read = image is not None
+            if read:
+                last_image = image
+                written += 1
+            elif repeat > 0 and last_image is not None:
+                # keep the timing if a frame could not be read
+                image = last_image
+            if image is None:
+                progress.add(0, 0, 1)
+                continue
+
+            if out is None:
+                height, width = image.shape[:2]
+                out = writer_class(output_file, (width, height), fps, options)
+            for _ in range(repeat):
+                out.write(image)
+            new_size = out.bytes_written()
+            progress.add(int(read), new_size - file_size, int(not read))
+            file_size = new_size
+    finally:
+        if out is not None:
+            out.close()
+    return written
+
+
+def init_export_worker(nice: int) -> None:
+    # exports should never steal cpu time from the processes reading the stream
+    os.nice(nice)
+    cv2.setNumThreads(1)
+
+
+def run_export(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point of the export workers, exports a packed ExportJob"""
+    start = time.monotonic()
+    frames = job["frames"]
+    save_folder = job["save_folder"]
+    save_format = job["save_format"]
+    control = JobControl(job["control_name"])
+    control.start()
+    progress = ExportProgress(control, job["max_bandwidth"])
+    loader = FrameLoader(job)
+    result = {"frames_written": 0, "videos_written": 0}
+    try:
+        if frames and save_format in (SaveFormat.FRAMES.value, SaveFormat.BOTH.value):
+            time_first, time_last = frames[0]["time_stamp"], frames[-1]["time_stamp"]
+            frames_folder = os.path.join(
+                save_folder, f"frames_{time_first}-{time_last}"
+            )
+            result["frames_written"] = save_frames(
+                loader, frames, frames_folder, progress
+            )
+
+        if frames and save_format in (SaveFormat.VIDEO.value, SaveFormat.BOTH.value):
+            if save_video(
+                loader,
+                frames,
+                os.path.join(save_folder, "videos"),
+                progress,
+                job["video_options"],
+            ):
+                result["videos_written"] = 1
+    finally:
+        loader.close()
+        control.close()
+
+    if job["delete_folder"]:
+        shutil.rmtree(job["delete_folder"], ignore_errors=True)
+
+    result["skipped_frames"] = loader.skipped_frames
+    result["duration"] = time.monotonic() - start
+    return result
@@ -0,0 +1,465 @@
+import concurrent.futures
+import io
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterator, List, Union
+
+from PIL import Image
+
+# Index file layout: one header followed by one record per frame slot.
+# A record's sequence is 0 while its slot is empty or being rewritten,
+# otherwise it is the (1-based) running number of the frame stored in the slot.
+_INDEX_MAGIC = b"ARGBUF01"
+# header: magic, capacity, slot_size, next sequence
+_INDEX_HEADER = struct.Struct("<8sIQQ")
+# bytes available for the time stamp of a frame
+_TIME_STAMP_SIZE = 16
+# record: sequence, frame_number, seconds, width, height, data length, time_stamp
+# seconds count from midnight before the first frame and keep growing past
+# midnight, so that they increase with every frame
+_INDEX_RECORD = struct.Struct(f"<QqdIII{_TIME_STAMP_SIZE}s")
+# a time of day with the longest month and weekday names
+_LONGEST_TIME = datetime(2000, 9, 27, 23, 59, 59, 999999)
+
+
+class FrameEncoding(Enum):
+    JPEG = "jpeg"
+    ZLIB = "zlib"  # lossless
+
+
+def encode_frame(
+    data: bytes, size: tuple, encoding: str, jpeg_quality: int = 90
+) -> bytes:
+    match encoding:
+        case FrameEncoding.JPEG.value:
+            output = io.BytesIO()
+            img = Image.frombytes("RGB", size, data, "raw")
+            img.save(output, format="JPEG", quality=jpeg_quality)
+            return output.getvalue()
+        case FrameEncoding.ZLIB.value:
+            return zlib.compress(data, 1)
+        case _:
+            raise ValueError(f"FrameEncoding has no type: {encoding}")
+
+
+def decode_frame(encoded: bytes, encoding: str) -> bytes:
+    match encoding:
+        case FrameEncoding.JPEG.value:
+            return Image.open(io.BytesIO(encoded)).convert("RGB").tobytes()
+        case FrameEncoding.ZLIB.value:
+            return zlib.decompress(encoded)
+        case _:
+            raise ValueError(f"FrameEncoding has no type: {encoding}")
+
+
+def read_mapped_frame(
+    frames: mmap.mmap, index: mmap.mmap, record: tuple, capacity: int, slot_size: int
+) -> Union[Dict, None]:
+    sequence, frame_number, _, width, height, length, time_stamp = record
+    slot = (sequence - 1) % capacity
+    data_offset = slot * slot_size
+    data = frames[data_offset : data_offset + length]
+    record_offset = _INDEX_HEADER.size + slot * _INDEX_RECORD.size
+    if struct.unpack_from("<Q", index, record_offset)[0] != sequence:
+        return None
+    return {
+        "size": (width, height),
+        "frame": data,
+        "time_stamp": time_stamp.rstrip(b"\x00").decode("ascii"),
+        "frame_number": frame_number,
+    }
+
+
+def time_stamp_to_seconds(time_stamp: str, date_format: str) -> float:
+    """Convert a frame time stamp into seconds since midnight"""
+    t = datetime.strptime(time_stamp, date_format)
+    return t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+
+
+class MmapFrameBuffer:
+    """Ring buffer of raw frames stored in a preallocated memory-mapped file.
+
+    The buffer exposes the part of the ``deque`` interface used by
+    ``StreamBuffer`` (``append`` and ``copy``), so it can be used as a drop-in
+    replacement. Frames are written sequentially into fixed-size slots of
+    ``frames.dat``, while ``index.dat`` keeps the meta data of every slot.
+    Both files are only created on the first appended frame, hence inside
+    the worker process, and writeback is left to the page cache.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        capacity: int,
+        slot_size: int = 0,
+        date_format: str = "%H:%M:%S.%f",
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity of the buffer must be positive")
+        if len(_LONGEST_TIME.strftime(date_format).encode()) > _TIME_STAMP_SIZE:
+            raise ValueError(
+                f"Time stamps of the format {date_format} do not fit into "
+                f"{_TIME_STAMP_SIZE} bytes"
+            )
+        self._folder = folder
+        self._capacity = capacity
+        self._slot_size = slot_size
+        self._date_format = date_format
+        # sequences keep growing when the files are re-created, so that
+        # records taken before never match a slot of the new files
+        self._next_sequence = 1
+        self._first_sequence = 1
+        self._frames = None
+        self._index = None
+        # time of day of the last frame and the days passed since the first
+        self._last_time_of_day = None
+        self._days = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    def __len__(self) -> int:
+        return self._next_sequence - self._oldest_sequence()
+
+    def _open(self, slot_size: int) -> None:
+        self.close()
+        os.makedirs(self._folder, exist_ok=True)
+        self._slot_size = slot_size
+        self._first_sequence = self._next_sequence
+        self._last_time_of_day = None
+        self._days = 0
+        self._frames = self._map_file(
+            os.path.join(self._folder, "frames.dat"), self._capacity * slot_size
+        )
+        self._frames.madvise(mmap.MADV_SEQUENTIAL)
+        self._index = self._map_file(
+            os.path.join(self._folder, "index.dat"),
+            _INDEX_HEADER.size + self._capacity * _INDEX_RECORD.size,
+        )
+        self._index[:] = bytes(len(self._index))
+        self._write_header()
+
+    @staticmethod
+    def _map_file(path: str, size: int) -> mmap.mmap:
+        # never truncate existing files in place, exports of other processes
+        # might still be reading from their mappings
+        if os.path.exists(path):
+            os.remove(path)
+        with open(path, "w+b") as f:
+            # reserve the disk space up front, so that a full disk is
+            # detected at start and not in the middle of a recording
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(f.fileno(), 0, size)
+            else:
+                f.truncate(size)
+            return mmap.mmap(f.fileno(), size)
+
+    def _write_header(self) -> None:
+        _INDEX_HEADER.pack_into(
+            self._index,
+            0,
+            _INDEX_MAGIC,
+            self._capacity,
+            self._slot_size,
+            self._next_sequence,
+        )
+
+    def _record_offset(self, slot: int) -> int:
+        return _INDEX_HEADER.size + slot * _INDEX_RECORD.size
+
+    def _read_record(self, slot: int) -> tuple:
+        return _INDEX_RECORD.unpack_from(self._index, self._record_offset(slot))
+
+    # time stamps only hold the time of day, like frame_times of the exports
+    # a step back in time is taken as passing midnight
+    def _unwrapped_seconds(self, time_stamp: str) -> float:
+        time_of_day = time_stamp_to_seconds(time_stamp, self._date_format)
+        if self._last_time_of_day is not None and time_of_day < self._last_time_of_day:
+            self._days += 1
+        self._last_time_of_day = time_of_day
+        return time_of_day + self._days * 24 * 3600
+
+    def append(self, frame: Dict) -> None:
+        data = frame["frame"]
+        if self._frames is None or len(data) > self._slot_size:
+            if self._frames is not None:
+                print(
+                    f"Frame of {len(data)} bytes does not fit into slots of "
+                    f"{self._slot_size} bytes, resetting buffer"
+                )
+            self._open(max(self._slot_size, len(data)))
+
+        time_stamp = frame["time_stamp"].encode("ascii")
+        if len(time_stamp) > _TIME_STAMP_SIZE:
+            raise ValueError(
+                f"Time stamp {frame['time_stamp']} is longer than "
+                f"{_TIME_STAMP_SIZE} bytes"
+            )
+        seconds = self._unwrapped_seconds(frame["time_stamp"])
+
+        sequence = self._next_sequence
+        slot = (sequence - 1) % self._capacity
+        record_offset = self._record_offset(slot)
+
+        # invalidate the slot first, so that concurrent readers notice the overwrite
+        struct.pack_into("<Q", self._index, record_offset, 0)
+        data_offset = slot * self._slot_size
+        self._frames[data_offset : data_offset + len(data)] = data
+        width, height = frame["size"]
+        _INDEX_RECORD.pack_into(
+            self._index,
+            record_offset,
+            sequence,
+            frame.get("frame_number", -1),
+            seconds,
+            width,
+            height,
+            len(data),
+            time_stamp,
+        )
+
+        self._next_sequence += 1
+        self._write_header()
+
+    def _oldest_sequence(self) -> int:
+        return max(self._first_sequence, self._next_sequence - self._capacity)
+
+    def read(self, record: tuple) -> Union[Dict, None]:
+        """Read the frame described by an index record.
+
+        Returns None if the slot was overwritten since the record was taken.
+        """
+        return read_mapped_frame(
+            self._frames, self._index, record, self._capacity, self._slot_size
+        )
+
+    def find_by_time(self, time_stamp: str) -> Union[Dict, None]:
+        """Return the latest frame recorded at or before time_stamp.
+
+        time_stamp is a time of day, it refers to its latest occurrence up to
+        the newest frame. The slot is estimated from the time span covered by
+        the buffer, which makes the lookup O(1) for a steady frame rate. The
+        estimate is then corrected by walking over neighbouring slots.
+        """
+        if len(self) == 0:
+            return None
+        first = self._oldest_sequence()
+        last = self._next_sequence - 1
+
+        def record_of(sequence: int) -> tuple:
+            return self._read_record((sequence - 1) % self._capacity)
+
+        first_time = record_of(first)[2]
+        last_time = record_of(last)[2]
+        time_of_day = time_stamp_to_seconds(time_stamp, self._date_format)
+        target = last_time - (last_time - time_of_day) % (24 * 3600)
+        if target < first_time:
+            return None
+        if target >= last_time or last == first:
+            return self.read(record_of(last))
+
+        estimate = first + int(
+            (target - first_time) / (last_time - first_time) * (last - first)
+        )
+        sequence = min(max(estimate, first), last)
+        while sequence < last and record_of(sequence + 1)[2] <= target:
+            sequence += 1
+        while sequence > first and record_of(sequence)[2] > target:
+            sequence -= 1
+        return self.read(record_of(sequence))
+
+    def copy(self) -> "MmapSnapshot":
+        """Take a snapshot of the index, frame data stays in the mapping"""
+        if self._frames is None:
+            return MmapSnapshot(self, [])
+        records = [
+            self._read_record((sequence - 1) % self._capacity)
+            for sequence in range(self._oldest_sequence(), self._next_sequence)
+        ]
+        return MmapSnapshot(self, records)
+
+    def close(self) -> None:
+        for mapping in (self._frames, self._index):
+            if mapping is not None:
+                mapping.close()
+        self._frames = None
+        self._index = None
+
+
+class MmapFrameReader:
+    """Read-only access to the files of a MmapFrameBuffer from another process"""
+
+    def __init__(self, folder: str) -> None:
+        self._frames = self._map_file(os.path.join(folder, "frames.dat"))
+        self._index = self._map_file(os.path.join(folder, "index.dat"))
+        _, self._capacity, self._slot_size, _ = _INDEX_HEADER.unpack_from(
+            self._index, 0
+        )
+
+    @staticmethod
+    def _map_file(path: str) -> mmap.mmap:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, record: tuple) -> Union[Dict, None]:
+        return read_mapped_frame(
+            self._frames, self._index, record, self._capacity, self._slot_size
+        )
+
+    def close(self) -> None:
+        self._frames.close()
+        self._index.close()
+
+
+class MmapSnapshot:
+    """Sequence of the frames contained in a MmapFrameBuffer at a given time.
+
+    Frames are read lazily from the mapping. Frames that were overwritten by
+    the ring buffer in the meantime are skipped when iterating.
+    """
+
+    def __init__(self, buffer: MmapFrameBuffer, records: List[tuple]) -> None:
+        self._buffer = buffer
+        self._records = records
+        self.skipped_frames = 0
+
+    @property
+    def folder(self) -> str:
+        return self._buffer.folder
+
+    @property
+    def records(self) -> List[tuple]:
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index: int) -> Dict:
+        record = self._records[index]
+        frame = self._buffer.read(record)
+        if frame is None:
+            # meta data is still available from the snapshot of the index,
+            # even if the frame data itself was already overwritten
+            _, frame_number, _, width, height, _, time_stamp = record
+            frame = {
+                "size": (width, height),
+                "frame": None,
+                "time_stamp": time_stamp.rstrip(b"\x00").decode("ascii"),
+                "frame_number": frame_number,
+            }
+        return frame
+
+    def __iter__(self) -> Iterator[Dict]:
+        for record in self._records:
+            frame = self._buffer.read(record)
+            if frame is None:
+                self.skipped_frames += 1
+                continue
+            yield frame
+
+
+class CompressedFrameBuffer:
+    """Ring buffer of frames that are kept compressed in memory.
+
+    Like MmapFrameBuffer, it can be used in place of the ``deque`` of
+    ``StreamBuffer``. Frames are compressed on a thread pool, so that the
+    ingest loop only pays for submitting them. If compression falls behind by
+    more than ``max_pending`` frames, appending waits for the oldest pending
+    frame, which bounds the number of raw frames held in memory.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        encoding: str = FrameEncoding.JPEG.value,
+        jpeg_quality: int = 90,
+        workers: int = 2,
+        max_pending: int = 0,
+    ) -> None:
+        if encoding not in [e.value for e in FrameEncoding]:
+            raise ValueError(f"FrameEncoding has no type: {encoding}")
+        self._frames = deque(maxlen=capacity)
+        self._pending = deque()
+        self._encoding = encoding
+        self._jpeg_quality = jpeg_quality
+        self._workers = workers
+        self._max_pending = max_pending or 4 * workers
+        self._executor = None
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def append(self, frame: Dict) -> None:
+        # the pool is only created when needed, i.e. inside the running process
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._workers
+            )
+
+        while self._pending and self._pending[0].done():
+            self._pending.popleft()
+        if len(self._pending) >= self._max_pending:
+            self._pending.popleft().result()
+
+        encoded = self._executor.submit(
+            encode_frame,
+            frame["frame"],
+            frame["size"],
+            self._encoding,
+            self._jpeg_quality,
+        )
+        self._pending.append(encoded)
+        self._frames.append(
+            {
+                "size": frame["size"],
+                "time_stamp": frame["time_stamp"],
+                "frame_number": frame.get("frame_number", -1),
+                "encoding": self._encoding,
+                "encoded": encoded,
+            }
+        )
+
+    def copy(self) -> "CompressedSnapshot":
+        return CompressedSnapshot(list(self._frames))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class CompressedSnapshot:
+    """Sequence of the frames contained in a CompressedFrameBuffer at a given time.
+
+    Elements carry their compressed data under "encoded". Decoding is left to
+    the saver, so that JPEG frames can be exported without re-encoding them.
+    """
+
+    def __init__(self, entries: List[Dict]) -> None:
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _resolve(self, entry: Dict) -> Dict:
+        # waits for frames which are still being compressed
+        element = entry.copy()
+        element["encoded"] = entry["encoded"].result()
+        return element
+
+    def __getitem__(self, index: int) -> Dict:
+        return self._resolve(self._entries[index])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for entry in self._entries:
+            yield self._resolve(entry)
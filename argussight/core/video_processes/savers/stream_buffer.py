@@ -1,26 +1,93 @@
+import os
 from collections import deque
-from typing import Any, Dict
+from enum import Enum
+from typing import Any, Dict, Iterable
 
+from argussight.core.video_processes.savers.export import ExportJob
+from argussight.core.video_processes.savers.frame_buffers import (
+    CompressedFrameBuffer,
+    MmapFrameBuffer,
+    MmapSnapshot,
+)
 from argussight.core.video_processes.savers.video_saver import VideoSaver
+from argussight.core.video_processes.vprocess import ProcessError
+
+
+class BufferMode(Enum):
+    MEMORY = "memory"
+    MMAP = "mmap"
+    COMPRESSED = "compressed"
 
 
 class StreamBuffer(VideoSaver):
     def __init__(self, collector_config, exposed_parameters: Dict[str, Any]) -> None:
         super().__init__(collector_config, exposed_parameters)
-        self._queue = deque(maxlen=self._parameters["max_queue_len"])
+        self._queue = self.create_buffer()
+
+    def create_buffer(self):
+        buffer_mode = self._parameters["buffer_mode"]
+        match buffer_mode:
+            case BufferMode.MEMORY.value:
+                return deque(maxlen=self._parameters["max_queue_len"])
+            case BufferMode.MMAP.value:
+                # the mapping itself is only created on the first frame,
+                # i.e. inside the running process
+                return MmapFrameBuffer(
+                    self._parameters["buffer_folder"],
+                    self._parameters["max_queue_len"],
+                    self._parameters["frame_slot_size"],
+                    self._date_format,
+                )
+            case BufferMode.COMPRESSED.value:
+                return CompressedFrameBuffer(
+                    self._parameters["max_queue_len"],
+                    self._parameters["compression"],
+                    self._parameters["jpeg_quality"],
+                    self._parameters["compression_workers"],
+                )
+            case _:
+                raise ProcessError(f"Buffer mode {buffer_mode} does not exist")
 
     @classmethod
     def create_commands_dict(cls) -> Dict[str, Any]:
         result = super().create_commands_dict()
-        result.update({"save": cls.save_queue})
+        result.update({"save": cls.save_queue, "save_frame_at": cls.save_frame_at})
         return result
 
-    def save_queue(self) -> None:
+    def save_queue(self) -> str:
         queue = self._queue.copy()
-        self.executor.submit(
-            self.save_iterable,
-            queue,
+        return self.save_iterable(queue)
+
+    # saves the latest buffered frame at or before time_stamp as image,
+    # returns its path
+    def save_frame_at(self, time_stamp: str) -> str:
+        if not isinstance(self._queue, MmapFrameBuffer):
+            raise ProcessError(
+                f"Frames can only be looked up by time in buffer mode "
+                f"{BufferMode.MMAP.value}"
+            )
+        save_folder = os.path.join(
+            self._parameters["main_save_folder"], self._parameters["personnal_folder"]
         )
+        if not self.is_within_main(save_folder):
+            raise ProcessError("Your path should not leave the main folder")
+        try:
+            frame = self._queue.find_by_time(time_stamp)
+        except ValueError as e:
+            raise ProcessError(f"Invalid time stamp {time_stamp}: {e}")
+        if frame is None:
+            raise ProcessError(f"No buffered frame at or before {time_stamp}")
+        os.makedirs(save_folder, exist_ok=True)
+        self.save_frame(frame, save_folder)
+        return os.path.join(save_folder, "img" + frame["time_stamp"] + ".jpg")
+
+    def add_iterable_to_job(self, job: ExportJob, iterable: Iterable) -> None:
+        if isinstance(iterable, MmapSnapshot):
+            # the export worker reads the frames directly from the mapped files
+            for record in iterable.records:
+                job.add_mapped(iterable.folder, record)
+            return
+        super().add_iterable_to_job(job, iterable)
 
     def add_to_iterable(self, frame: Dict) -> None:
         self._queue.append(frame)
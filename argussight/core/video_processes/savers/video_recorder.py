@@ -1,10 +1,9 @@
 import glob
 import os
 import shutil
-from typing import Any, Dict, Tuple
-
-from PIL import Image
+from typing import Any, Dict
 
+from argussight.core.video_processes.savers.export import ExportJob
 from argussight.core.video_processes.savers.video_saver import VideoSaver
 from argussight.core.video_processes.vprocess import ProcessError
 
@@ -58,13 +57,9 @@ class Recorder(VideoSaver):
             os.makedirs(self._parameters["temp_folder"], exist_ok=True)
         self.save_frame(frame, self._parameters["temp_folder"])
 
-    def get_frame_from_element(
-        self, element: Any
-    ) -> Tuple[Tuple[int, int], bytes, str]:
-        frame = Image.open(element, "r")
-        raw_data = frame.convert("RGB").tobytes()
-
-        return frame.size, raw_data, remove_start_end(element, "img", ".jpg")
+    def add_element_to_job(self, job: ExportJob, element: Any) -> None:
+        # recorded frames are already stored as JPEG files in the temp folder
+        job.add_file(element, remove_start_end(element, "img", ".jpg"))
 
     def start_record(self) -> None:
         if self._parameters["recording"]:
@@ -72,7 +67,7 @@ class Recorder(VideoSaver):
         self._parameters.update({"recording": True})
         self.exposed_parameters.update({"recording": True})
 
-    def stop_record(self) -> None:
+    def stop_record(self) -> str:
         if not self._parameters["recording"]:
             raise ProcessError("There is no recording to stop")
 
@@ -80,16 +75,15 @@ class Recorder(VideoSaver):
 
         image_names = [
             os.path.join(self._parameters["temp_folder"], os.path.basename(image))
-            for image in glob.glob(
-                os.path.join(self._parameters["temp_folder"], "*jpg")
+            # time stamps in the names keep the recording order
+            for image in sorted(
+                glob.glob(os.path.join(self._parameters["temp_folder"], "*jpg"))
             )
         ]
 
-        # create a thread to make a video from the recorded frames
-        self.executor.submit(
-            self._stop_record,
-            image_names,
-            self._parameters["temp_folder"],
+        # export the recorded frames, the export worker deletes them afterwards
+        job_id = self.save_iterable(
+            image_names, delete_folder=self._parameters["temp_folder"]
         )
 
         # go to next recording folder
@@ -101,10 +95,7 @@ class Recorder(VideoSaver):
 
         self._parameters.update({"recording": False})
         self.exposed_parameters.update({"recording": False})
-
-    def _stop_record(self, images_names, temp_folder):
-        self.save_iterable(images_names)
-        delete_all_files(temp_folder)
+        return job_id
 
     def _get_all_parameters(self) -> Dict[str, Any]:
         # The "recording" parameter state, should be kept in exposed_parameters and _parameters,
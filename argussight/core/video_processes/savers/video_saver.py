@@ -1,34 +1,60 @@
 import base64
 import concurrent.futures
+import multiprocessing
 import os
 from datetime import datetime
-from enum import Enum
 from multiprocessing import Queue
-from typing import Any, Dict, Iterable, Tuple
+from typing import Any, Dict, Iterable, List, Union
 
-import cv2
-import numpy as np
+import redis
 from PIL import Image
 
+from argussight.core.video_processes.savers.export import (
+    ExportJob,
+    ExportJobRegistry,
+    SaveFormat,
+    default_video_options,
+    init_export_worker,
+)
+from argussight.core.video_processes.savers.video_writers import get_video_writer
 from argussight.core.video_processes.vprocess import ProcessError, Vprocess
 
 
-class SaveFormat(Enum):
-    VIDEO = "video"
-    FRAMES = "frames"
-    BOTH = "both"
-
-
 class VideoSaver(Vprocess):
     def __init__(self, collector_config, exposed_parameters: Dict[str, Any]) -> None:
         super().__init__(collector_config, exposed_parameters)
         self._command_timeout = 0.04
         self._recording_start_time = None
 
-        # saving videos and frames might take some time, the ThreadPool can be used
-        # to excute these processes in a seperate thread
+        # Exports (encoding and writing of frames and videos) run in a pool of
+        # separate worker processes, so that they do not compete for the GIL with
+        # the reading of the stream. The frames are handed over to the workers
+        # through shared memory, which is filled by the thread of the ThreadPool.
         # Normal threading doesn't work due to redis pubsub listener blocking
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._export_pool = None
+        self._jobs = ExportJobRegistry()
+
+    @classmethod
+    def create_commands_dict(cls) -> Dict[str, Any]:
+        result = super().create_commands_dict()
+        result.update(
+            {
+                "jobs": cls.list_jobs,
+                "cancel_job": cls.cancel_job,
+            }
+        )
+        return result
+
+    @classmethod
+    def create_hidden_commands_list(cls) -> List[str]:
+        return super().create_hidden_commands_list() + ["jobs", "cancel_job"]
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return self._jobs.list()
+
+    def cancel_job(self, job_id: str) -> None:
+        self._jobs.get(job_id).cancel()
 
     def save_frame(self, frame: dict, folder_path: str):
         img = Image.frombytes("RGB", frame["size"], frame["frame"], "raw")
@@ -46,62 +72,96 @@ class VideoSaver(Vprocess):
 
         return common_prefix == target_prefix
 
-    def get_frame_from_element(
-        self, element: Any
-    ) -> Tuple[Tuple[int, int], bytes, str]:
-        return element["size"], element["frame"], element["time_stamp"]
-
-    def save_iterable_as_video(self, iterable: Iterable, save_folder: str) -> None:
-        video_folder = os.path.join(save_folder, "videos")
-        if not os.path.exists(video_folder):
-            os.makedirs(video_folder, exist_ok=True)
-        size_first, _, time_first = self.get_frame_from_element(iterable[0])
-        _, _, time_last = self.get_frame_from_element(iterable[-1])
-        output_file = os.path.join(video_folder, f"video_{time_first}-{time_last}.avi")
-
-        out = cv2.VideoWriter(
-            output_file, cv2.VideoWriter_fourcc(*"MJPG"), 30, size_first
-        )
+    def get_export_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        # the pool is only created when needed, i.e. inside the running process
+        if self._export_pool is None:
+            self._export_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._parameters["export_workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_export_worker,
+                initargs=(self._parameters["export_nice"],),
+            )
+        return self._export_pool
+
+    def add_element_to_job(self, job: ExportJob, element: Any) -> None:
+        if "encoded" in element:
+            job.add_encoded(
+                element["size"],
+                element["encoded"],
+                element["encoding"],
+                element["time_stamp"],
+            )
+        else:
+            job.add_raw(element["size"], element["frame"], element["time_stamp"])
 
+    def add_iterable_to_job(self, job: ExportJob, iterable: Iterable) -> None:
         for element in iterable:
-            size, data, _ = self.get_frame_from_element(element)
-            img = Image.frombytes("RGB", size, data, "raw")
-            open_cv_image = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-            out.write(open_cv_image)
-
-        out.release()
-        cv2.destroyAllWindows()
-
-    def save_iterable(self, iterable: Iterable) -> None:
+            self.add_element_to_job(job, element)
+
+    def get_video_options(self) -> Dict[str, Any]:
+        options = default_video_options()
+        options.update(
+            {
+                "codec": self._parameters["video_codec"],
+                "fps": self._parameters["video_fps"],
+                "crf": self._parameters["video_crf"],
+                "preset": self._parameters["video_preset"],
+                "ffmpeg_path": self._parameters["ffmpeg_path"],
+                "date_format": self._date_format,
+            }
+        )
+        if self._parameters["save_format"] != SaveFormat.FRAMES.value:
+            try:
+                get_video_writer(options["codec"]).check_available(options)
+            except (ValueError, RuntimeError) as e:
+                raise ProcessError(str(e))
+        if options["fps"] < 0:
+            raise ProcessError("Video fps should not be negative")
+        return options
+
+    # returns the id of the created export job
+    def save_iterable(
+        self, iterable: Iterable, delete_folder: Union[str, None] = None
+    ) -> str:
         save_folder = os.path.join(
             self._parameters["main_save_folder"], self._parameters["personnal_folder"]
         )
-        save_format = self._parameters["save_format"]
-
         if not self.is_within_main(save_folder):
             raise ProcessError("Your path should not leave the main folder")
-        if (
-            save_format == SaveFormat.FRAMES.value
-            or save_format == SaveFormat.BOTH.value
-        ):
-            _, _, time_first = self.get_frame_from_element(iterable[0])
-            _, _, time_last = self.get_frame_from_element(iterable[-1])
-            frames_folder = os.path.join(
-                save_folder, f"frames_{time_first}-{time_last}"
+        if self._parameters["save_format"] not in [f.value for f in SaveFormat]:
+            raise ProcessError(
+                f"Save format {self._parameters['save_format']} does not exist"
             )
-            if not os.path.exists(frames_folder):
-                os.makedirs(frames_folder, exist_ok=True)
 
-            for element in iterable:
-                size, data, time = self.get_frame_from_element(element)
-                frame = {"size": size, "frame": data, "time_stamp": time}
-                self.save_frame(frame, frames_folder)
+        job = ExportJob(
+            save_folder,
+            self._parameters["save_format"],
+            self._parameters["export_max_bandwidth"],
+            delete_folder,
+            self.get_video_options(),
+        )
+        self.add_iterable_to_job(job, iterable)
+        self._jobs.add(job)
+        self.executor.submit(self._submit_export, job)
+        return job.job_id
 
-        if (
-            save_format == SaveFormat.VIDEO.value
-            or save_format == SaveFormat.BOTH.value
-        ):
-            self.save_iterable_as_video(iterable, save_folder)
+    def _submit_export(self, job: ExportJob) -> None:
+        try:
+            job.submit(self.get_export_pool())
+        except Exception as e:
+            job.fail(e)
+            print(f"Failed to start export {job.job_id} to {job.save_folder}: {e}")
+            return
+        if job.future is not None:
+            job.future.add_done_callback(lambda f: self._export_done(job, f))
+
+    def _export_done(self, job: ExportJob, future: concurrent.futures.Future) -> None:
+        job.finish(future)
+        info = job.info()
+        message = f"Export {job.job_id} to {job.save_folder} {info['state']}"
+        if info["error"]:
+            message += f": {info['error']}"
+        print(message)
 
     def add_to_iterable(self, frame: Dict) -> None:
         pass
@@ -137,11 +197,18 @@ class VideoSaver(Vprocess):
             self.add_to_iterable(frame)
 
     # override run to correctly shutdown executor
-    def run(self, command_queue: Queue, response_queue: Queue) -> None:
+    def run(
+        self,
+        command_queue: Queue,
+        response_queue: Queue,
+        pubsub: Union[redis.client.PubSub, None] = None,
+    ) -> None:
         try:
-            super().run(command_queue, response_queue)
+            super().run(command_queue, response_queue, pubsub)
         finally:
             self.executor.shutdown(wait=True)
+            if self._export_pool is not None:
+                self._export_pool.shutdown(wait=True)
 
     def _get_all_parameters(self) -> Dict[str, Any]:
         # The "recording" parameter state, should be kept in exposed_parameters and _parameters,
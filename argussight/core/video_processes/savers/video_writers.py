@@ -0,0 +1,177 @@
+import os
+import shutil
+import subprocess
+from enum import Enum
+from typing import Any, Dict, Tuple, Type
+
+import cv2
+import numpy as np
+
+
+class VideoCodec(Enum):
+    MJPG = "mjpg"
+    FFV1 = "ffv1"
+    H264 = "h264"
+
+
+class VideoWriter:
+    """Writes BGR images of a fixed size at a fixed frame rate to a video file"""
+
+    extension = ""
+
+    def __init__(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fps: float,
+        options: Dict[str, Any],
+    ) -> None:
+        # path is given without extension, the backend chooses its container
+        self.path = path + self.extension
+        self.size = size
+        self.fps = fps
+        self.options = options
+
+    @classmethod
+    def check_available(cls, options: Dict[str, Any]) -> None:
+        """Raises a RuntimeError if the backend cannot be used"""
+
+    def write(self, image: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def bytes_written(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+
+class OpenCVVideoWriter(VideoWriter):
+    fourcc = ""
+
+    def __init__(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fps: float,
+        options: Dict[str, Any],
+    ) -> None:
+        super().__init__(path, size, fps, options)
+        self._writer = cv2.VideoWriter(
+            self.path, cv2.VideoWriter_fourcc(*self.fourcc), fps, size
+        )
+        if not self._writer.isOpened():
+            raise RuntimeError(f"OpenCV cannot write {self.fourcc} to {self.path}")
+
+    def write(self, image: np.ndarray) -> None:
+        self._writer.write(image)
+
+    def close(self) -> None:
+        self._writer.release()
+
+
+class MJPGVideoWriter(OpenCVVideoWriter):
+    extension = ".avi"
+    fourcc = "MJPG"
+
+    def __init__(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fps: float,
+        options: Dict[str, Any],
+    ) -> None:
+        super().__init__(path, size, fps, options)
+        self._writer.set(cv2.VIDEOWRITER_PROP_QUALITY, options.get("jpeg_quality", 75))
+
+
+class FFV1VideoWriter(OpenCVVideoWriter):
+    # lossless, the matroska container is the natural home of ffv1
+    extension = ".mkv"
+    fourcc = "FFV1"
+
+
+class FFmpegVideoWriter(VideoWriter):
+    """Pipes raw BGR images to a local ffmpeg encoding H.264"""
+
+    extension = ".mp4"
+
+    def __init__(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fps: float,
+        options: Dict[str, Any],
+    ) -> None:
+        super().__init__(path, size, fps, options)
+        command = [
+            options.get("ffmpeg_path", "ffmpeg"),
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "bgr24",
+            "-s",
+            f"{size[0]}x{size[1]}",
+            "-framerate",
+            f"{fps:.6f}",
+            "-i",
+            "-",
+            "-c:v",
+            "libx264",
+            "-preset",
+            options.get("preset", "veryfast"),
+            "-crf",
+            str(options.get("crf", 23)),
+            # yuv420p keeps the files playable by common players
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+faststart",
+            self.path,
+        ]
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        self._closed = False
+
+    @classmethod
+    def check_available(cls, options: Dict[str, Any]) -> None:
+        ffmpeg_path = options.get("ffmpeg_path", "ffmpeg")
+        if shutil.which(ffmpeg_path) is None:
+            raise RuntimeError(f"ffmpeg executable {ffmpeg_path} not found")
+
+    def write(self, image: np.ndarray) -> None:
+        try:
+            self._process.stdin.write(np.ascontiguousarray(image).data)
+        except BrokenPipeError:
+            # ffmpeg exited early, closing reports its error
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        # communicate closes the pipe, so that ffmpeg finishes the file
+        _, errors = self._process.communicate()
+        if self._process.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed with code {self._process.returncode}: "
+                f"{errors.decode(errors='replace').strip()}"
+            )
+
+
+VIDEO_WRITERS: Dict[str, Type[VideoWriter]] = {
+    VideoCodec.MJPG.value: MJPGVideoWriter,
+    VideoCodec.FFV1.value: FFV1VideoWriter,
+    VideoCodec.H264.value: FFmpegVideoWriter,
+}
+
+
+def get_video_writer(codec: str) -> Type[VideoWriter]:
+    if codec not in VIDEO_WRITERS:
+        raise ValueError(f"Video codec {codec} does not exist")
+    return VIDEO_WRITERS[codec]
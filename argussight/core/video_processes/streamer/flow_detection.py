@@ -5,28 +5,81 @@ from typing import Any, Dict, Tuple
 import cv2
 import numpy as np
 
+from argussight.core.video_processes.streamer.static_gate import StaticGate
 from argussight.core.video_processes.streamer.streamer import Streamer
 
 
-class Point:
-    def __init__(self, position: Tuple[int, int], creation_time: datetime) -> None:
-        self._starting_position = np.array(position).reshape(1, 2)
-        self._current_position = np.array(position).reshape(1, 2)
-        self._creation_time = creation_time
+class PointTracks:
+    """Tracked points, held as arrays with one row per point.
 
-    def update_position(self, new_position: Tuple[int, int]) -> None:
-        self._current_position = np.array(new_position).reshape(1, 2)
+    Positions are (x, y) pixels of the frame, creation times are seconds
+    since the first point was added. All filtering works on whole arrays.
+    """
 
-    # calculate the average speed it took the point to travel from starting point to current position
-    def calculate_speed(self, current_time: datetime, direction: int = 1) -> float:
-        elapsed_time = (current_time - self._creation_time).total_seconds()
-        if elapsed_time > 0:
-            traveled_distance = (
-                self._current_position[0, direction]
-                - self._starting_position[0, direction]
-            )
-            return traveled_distance / elapsed_time
-        return 0.0
+    def __init__(self) -> None:
+        self.positions = np.empty((0, 2), dtype=np.float32)
+        self.start_positions = np.empty((0, 2), dtype=np.float32)
+        self.creation_times = np.empty(0, dtype=np.float64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+        self._epoch = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _seconds(self, time_stamp: datetime) -> float:
+        if self._epoch is None:
+            self._epoch = time_stamp
+        return (time_stamp - self._epoch).total_seconds()
+
+    def add(self, positions: np.ndarray, time_stamp: datetime) -> None:
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        count = len(positions)
+        self.positions = np.concatenate([self.positions, positions])
+        self.start_positions = np.concatenate([self.start_positions, positions])
+        self.creation_times = np.concatenate(
+            [self.creation_times, np.full(count, self._seconds(time_stamp))]
+        )
+        self.ids = np.concatenate(
+            [self.ids, np.arange(self._next_id, self._next_id + count)]
+        )
+        self._next_id += count
+
+    # keeps the points where mask is true
+    def keep(self, mask: np.ndarray) -> None:
+        self.positions = self.positions[mask]
+        self.start_positions = self.start_positions[mask]
+        self.creation_times = self.creation_times[mask]
+        self.ids = self.ids[mask]
+
+    def in_roi(self, roi: Tuple[int, int, int, int]) -> np.ndarray:
+        rx, ry, rw, rh = roi
+        x, y = self.positions[:, 0], self.positions[:, 1]
+        return (rx <= x) & (x <= rx + rw) & (ry <= y) & (y <= ry + rh)
+
+    # Mask of the candidates that are further than min_distance from all
+    # points and from all candidates before them (the better ones, as sorted
+    # by goodFeaturesToTrack)
+    def far_from_points(
+        self, candidates: np.ndarray, min_distance: float
+    ) -> np.ndarray:
+        candidates = candidates.reshape(-1, 2)
+        squared = min_distance**2
+        to_points = ((candidates[:, None, :] - self.positions[None, :, :]) ** 2).sum(
+            axis=2
+        )
+        far = (to_points > squared).all(axis=1)
+        to_candidates = ((candidates[:, None, :] - candidates[None, :, :]) ** 2).sum(
+            axis=2
+        )
+        close_to_better = np.tril(to_candidates <= squared, k=-1).any(axis=1)
+        return far & ~close_to_better
+
+    # average speed of every point from its start, along axis (1 = y)
+    def speeds(self, time_stamp: datetime, axis: int = 1) -> np.ndarray:
+        elapsed = self._seconds(time_stamp) - self.creation_times
+        traveled = self.positions[:, axis] - self.start_positions[:, axis]
+        return np.divide(traveled, elapsed, out=np.zeros(len(self)), where=elapsed > 0)
 
 
 class FlowDetection(Streamer):
@@ -34,141 +87,184 @@ class FlowDetection(Streamer):
         self, collector_config, free_port, exposed_parameters: Dict[str, Any]
     ) -> None:
         super().__init__(collector_config, free_port, exposed_parameters)
-        self._previous_frame = None
+        # gray image of the tracking window of the previous frame, without drawings
+        self._previous_gray = None
+        self._previous_window = None
         self._min_distance = 50
-        self._p0 = []
+        self._tracks = PointTracks()
         self._speeds = deque(maxlen=20)
+        self._static_gate = None
 
         self._time_stamp_used = True  # this process needs the current time_stamps for calculation the flow speed
         self._command_timeout = 0.04  # this process needs to handle incoming frames consecutavely hence low waiting time
 
-    def is_point_in_roi(self, x: int, y: int) -> bool:
-        rx, ry, rw, rh = self._parameters["roi"]
-        return rx <= x <= rx + rw and ry <= y <= ry + rh
-
     def remove_outliers(self) -> None:
-        if self._p0 is not None:
-            result = [
-                point
-                for point in self._p0
-                if self.is_point_in_roi(*(point._current_position)[0])
-            ]
-            self._p0 = result if len(result) > 0 else []
+        self._tracks.keep(self._tracks.in_roi(self._parameters["roi"]))
 
-    def detect_new_features(self, gray_frame, time_stamp: datetime) -> None:
+    # gray_window is the tracking window starting at offset (x, y) in the frame
+    def detect_new_features(
+        self, gray_window, offset: np.ndarray, time_stamp: datetime
+    ) -> None:
         x, y, w, h = self._parameters["roi"]
-        roi_gray = gray_frame[y : y + h, x : x + w]
+        x -= int(offset[0])
+        y -= int(offset[1])
+        roi_gray = gray_window[y : y + h, x : x + w]
 
-        if len(self._p0) > 0:
-            # Select new points if old ones moved out of frame
-            new_points = cv2.goodFeaturesToTrack(
-                roi_gray, mask=None, **self._parameters["feature_params"]
-            )
-
-            if new_points is not None:
-                # Filter new points based on the minimum distance
-                current_points = np.array(
-                    [pt._current_position for pt in self._p0], dtype=np.float32
-                ).reshape(-1, 1, 2)
-                new_points += np.array([x, y])
-                for new_point in new_points:
-                    new_point = new_point.reshape(-1, 2)
-                    distances = np.sqrt(((current_points - new_point) ** 2).sum(axis=2))
-                    if np.min(distances) > self._min_distance:
-                        self._p0.append(
-                            Point([new_point[0][0], new_point[0][1]], time_stamp)
-                        )
-                        current_points = np.append(
-                            current_points, new_point.reshape(1, 1, 2), axis=0
-                        )
-        else:
-            points = cv2.goodFeaturesToTrack(
-                roi_gray, mask=None, **self._parameters["feature_params"]
-            )
-            if points is not None:
-                for pt in points:
-                    absolute_position = [pt[0][0] + x, pt[0][1] + y]
-                    self._p0.append(Point(absolute_position, time_stamp))
+        new_points = cv2.goodFeaturesToTrack(
+            roi_gray, mask=None, **self._parameters["feature_params"]
+        )
+        if new_points is None:
+            return
+        new_points = (
+            new_points.reshape(-1, 2) + np.array([x, y], dtype=np.float32) + offset
+        )
+        if len(self._tracks) > 0:
+            # only points that are not already tracked
+            new_points = new_points[
+                self._tracks.far_from_points(new_points, self._min_distance)
+            ]
+        self._tracks.add(new_points, time_stamp)
 
     def calculate_average_speed(self, time_stamp: datetime) -> int:
-        current_frame_average_speed = np.mean(
-            np.array(
-                [point.calculate_speed(time_stamp, direction=1) for point in self._p0]
-            )
-        )
-        self._speeds.append(current_frame_average_speed)
+        # all points may have been lost in this frame
+        if len(self._tracks) > 0:
+            self._speeds.append(np.mean(self._tracks.speeds(time_stamp, axis=1)))
+        if not self._speeds:
+            return 0
         return int(sum(self._speeds) / len(self._speeds))
 
-    def detect_and_track_features(self, frame, time_stamp: datetime) -> None:
+    # The part of the frame the points are tracked in: the ROI with a margin
+    # for the search windows on all pyramid levels. Only this part is
+    # converted to gray and only its pyramids are built by calcOpticalFlowPyrLK.
+    def tracking_window(self, frame_shape) -> Tuple[int, int, int, int]:
         x, y, w, h = self._parameters["roi"]
+        lk_params = self._parameters["lk_params"]
+        margin = max(lk_params["winSize"]) * 2 ** lk_params["maxLevel"]
+        return (
+            max(x - margin, 0),
+            max(y - margin, 0),
+            min(x + w + margin, frame_shape[1]),
+            min(y + h + margin, frame_shape[0]),
+        )
 
-        if self._previous_frame is None:
-            self._previous_frame = frame.copy()
-            gray_previous_frame = cv2.cvtColor(self._previous_frame, cv2.COLOR_BGR2GRAY)
+    def track_points(self, gray_window, offset: np.ndarray) -> bool:
+        lk_params = self._parameters["lk_params"]
+        lk_params["criteria"] = tuple(lk_params["criteria"])
+        p1, st, err = cv2.calcOpticalFlowPyrLK(
+            self._previous_gray,
+            gray_window,
+            (self._tracks.positions - offset).reshape(-1, 1, 2),
+            None,
+            **lk_params,
+        )
+        if p1 is None:
+            return False
+        # Select good points and update them
+        self._tracks.positions = p1.reshape(-1, 2) + offset
+        self._tracks.keep(st.ravel() == 1)
+        return True
 
-            self.detect_new_features(gray_previous_frame, time_stamp)
-        else:
-            gray_previous_frame = cv2.cvtColor(self._previous_frame, cv2.COLOR_BGR2GRAY)
-
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        if len(self._p0) > 0:
-            # Calculate optical flow
-            prev_points = np.array(
-                [pt._current_position for pt in self._p0], dtype=np.float32
-            ).reshape(-1, 1, 2)
-            lk_params = self._parameters["lk_params"]
-            lk_params["criteria"] = tuple(lk_params["criteria"])
-            p1, st, err = cv2.calcOpticalFlowPyrLK(
-                gray_previous_frame, gray_frame, prev_points, None, **lk_params
+    def roi_is_static(self, frame) -> bool:
+        gate_params = self._parameters["static_gate"]
+        if not gate_params["enabled"]:
+            return False
+        if self._static_gate is None:
+            self._static_gate = StaticGate(gate_params)
+        x, y, w, h = self._parameters["roi"]
+        return self._static_gate.is_static(frame[y : y + h, x : x + w])
+
+    def detect_and_track_features(self, frame, time_stamp: datetime) -> None:
+        x, y, w, h = self._parameters["roi"]
+        if self.roi_is_static(frame):
+            # nothing moves: no conversion, tracking or detection. The points
+            # are found anew once the ROI changes, their speeds would include
+            # the time standing still.
+            self._previous_gray = None
+            self._speeds.clear()
+            self.set_results(None)
+            if not self.drawing():
+                return frame
+            frame = cv2.putText(
+                frame,
+                "no flow",
+                (x + w + 50, int(y + h / 2)),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (0, 255, 0),
             )
+            return cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+
+        window = self.tracking_window(frame.shape)
+        x0, y0, x1, y1 = window
+        offset = np.array([x0, y0], dtype=np.float32)
+        # converted before anything is drawn on the frame
+        gray_window = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
 
+        # speed of the points in this frame
+        speed = None
+        if self._previous_gray is None or self._previous_window != window:
+            self._tracks = PointTracks()
+            self.detect_new_features(gray_window, offset, time_stamp)
+        elif len(self._tracks) > 0:
             # Check if points were found
-            if p1 is not None:
-                # Select good points
-                good_new = p1[st == 1]
-                good_points = [
-                    point for point, status in zip(self._p0, st) if status == 1
-                ]
-
-                # Update points and draw circles
-                for point, new_position in zip(good_points, good_new):
-                    new_position = new_position.ravel()
-                    point.update_position(new_position)
-                    frame = cv2.circle(
+            if self.track_points(gray_window, offset):
+                average_speed = self.calculate_average_speed(time_stamp)
+                if len(self._tracks) > 0:
+                    speed = self._speeds[-1]
+
+                if self.drawing():
+                    for center in self._tracks.positions.astype(np.int32):
+                        frame = cv2.circle(
+                            frame, tuple(center.tolist()), 8, (0, 255, 0), 2
+                        )
+                    frame = cv2.putText(
                         frame,
-                        (int(new_position[0]), int(new_position[1])),
-                        8,
+                        f"average speed: {int(average_speed)} pixel/s",
+                        (x + w + 50, int(y + h / 2)),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.5,
                         (0, 255, 0),
-                        2,
                     )
 
-                # Update the previous frame, p0 and the speed
-                self._previous_frame = frame.copy()
-                self._p0 = good_points
-                average_speed = self.calculate_average_speed(time_stamp)
-                frame = cv2.putText(
-                    frame,
-                    f"average speed: {int(average_speed)} pixel/s",
-                    (x + w + 50, int(y + h / 2)),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (0, 255, 0),
-                )
-
-            if len(self._p0) <= 5:
-                self.detect_new_features(gray_frame, time_stamp)
+            # replace lost points
+            if len(self._tracks) < self._parameters["feature_params"]["maxCorners"]:
+                self.detect_new_features(gray_window, offset, time_stamp)
 
+        if len(self._tracks) > 0:
+            self._previous_gray = gray_window
+            self._previous_window = window
         else:
-            self._previous_frame = None
+            # start over with the next frame
+            self._previous_gray = None
 
-        # Draw ROI
-        frame = cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+        self.set_results(speed)
+        if self.drawing():
+            # Draw ROI
+            frame = cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
         self.remove_outliers()
 
         return frame
 
+    # Results of the frame for results-only workers, in the format of
+    # OpticalFlowDetection with the ROI as only region. The confidence is the
+    # share of maxCorners that is tracked.
+    def set_results(self, speed) -> None:
+        max_corners = self._parameters["feature_params"]["maxCorners"]
+        self._results = {
+            "regions": {
+                "roi": {
+                    "speed": 0.0 if speed is None else float(speed),
+                    "confidence": (
+                        0.0
+                        if speed is None
+                        else min(len(self._tracks) / max_corners, 1.0)
+                    ),
+                    "flow": speed is not None,
+                }
+            }
+        }
+
     def process_frame(self) -> None:
         self._processed_frame = self.detect_and_track_features(
             self._current_frame, self._current_frame_time
@@ -177,9 +273,12 @@ class FlowDetection(Streamer):
     def prepare_setting_change(self, key: str) -> None:
         match key:
             case "roi":
-                self._previous_frame = None
+                self._previous_gray = None
+                self._static_gate = None
                 self._processed_frame = None
                 self._speeds = deque(maxlen=20)
-                self._p0 = []
+                self._tracks = PointTracks()
+            case "static_gate":
+                self._static_gate = None
             case _:
                 pass
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Tuple
+
+import cv2
+import numpy as np
+
+DIS_PRESETS = {
+    "dis_ultrafast": cv2.DISOpticalFlow_PRESET_ULTRAFAST,
+    "dis_fast": cv2.DISOpticalFlow_PRESET_FAST,
+    "dis_medium": cv2.DISOpticalFlow_PRESET_MEDIUM,
+}
+FLOW_ENGINES = ("farneback", *DIS_PRESETS, "lk_grid")
+
+
+class FarnebackEngine:
+    """Dense flow of every pixel with cv2.calcOpticalFlowFarneback"""
+
+    def __init__(self, flow_params: Dict[str, Any]) -> None:
+        self._flow_params = flow_params
+
+    def __call__(self, previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+        return cv2.calcOpticalFlowFarneback(
+            previous, current, None, **self._flow_params
+        )
+
+
+class DISEngine:
+    """Dense flow of every pixel with DIS, the preset trades accuracy for speed"""
+
+    def __init__(self, preset: int) -> None:
+        self._dis = cv2.DISOpticalFlow_create(preset)
+
+    def __call__(self, previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+        # DIS only takes continuous images, not views into a larger one
+        return self._dis.calc(
+            np.ascontiguousarray(previous), np.ascontiguousarray(current), None
+        )
+
+
+class LKGridEngine:
+    """Sparse Lucas-Kanade flow of points on a regular grid.
+
+    The flow of every point is spread over its grid cell, so the result has
+    the shape of a dense flow. Cells of points that were lost have no flow.
+    """
+
+    def __init__(self, grid_params: Dict[str, Any]) -> None:
+        self._step = grid_params["step"]
+        self._lk_params = {
+            "winSize": tuple(grid_params["winSize"]),
+            "maxLevel": grid_params["maxLevel"],
+            "criteria": tuple(grid_params["criteria"]),
+        }
+        self._shape = None
+        self._grid = None
+
+    # points in the centers of the cells, one row per point
+    def grid(self, shape: Tuple[int, int]) -> np.ndarray:
+        if shape != self._shape:
+            # the cells cover the whole image, the last ones may be cut off
+            ys = np.minimum(
+                np.arange(0, shape[0], self._step) + self._step // 2, shape[0] - 1
+            ).astype(np.float32)
+            xs = np.minimum(
+                np.arange(0, shape[1], self._step) + self._step // 2, shape[1] - 1
+            ).astype(np.float32)
+            self._grid = np.stack(np.meshgrid(xs, ys), axis=-1)
+            self._shape = shape
+        return self._grid
+
+    def __call__(self, previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+        grid = self.grid(previous.shape)
+        points, status, _ = cv2.calcOpticalFlowPyrLK(
+            previous, current, grid.reshape(-1, 1, 2), None, **self._lk_params
+        )
+        flow = (points.reshape(grid.shape) - grid) * status.reshape(*grid.shape[:2], 1)
+        cells = cv2.resize(
+            flow,
+            (grid.shape[1] * self._step, grid.shape[0] * self._step),
+            interpolation=cv2.INTER_NEAREST,
+        )
+        return cells[: previous.shape[0], : previous.shape[1]]
+
+
+def create_flow_engine(name: str, parameters: Dict[str, Any]):
+    """Flow engine called with the previous and the current gray image"""
+    if name == "farneback":
+        return FarnebackEngine(parameters["flow_params"])
+    if name in DIS_PRESETS:
+        return DISEngine(DIS_PRESETS[name])
+    if name == "lk_grid":
+        return LKGridEngine(parameters["lk_grid_params"])
+    raise ValueError(f"Flow engine {name} is not one of {FLOW_ENGINES}")
@@ -1,68 +1,303 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Set, Tuple
 
 import cv2
 import numpy as np
 
+from argussight.core.video_processes.streamer.flow_engines import (
+    FLOW_ENGINES,
+    create_flow_engine,
+)
+from argussight.core.video_processes.streamer.static_gate import StaticGate
 from argussight.core.video_processes.streamer.streamer import Streamer
+from argussight.core.video_processes.vprocess import ProcessError
+
+
+# the regions of the roi setting by name, either a single [x, y, w, h] named
+# "roi" or a list of {"name": ..., "roi": [x, y, w, h]}
+def parse_regions(roi: List) -> Dict[str, Tuple[int, int, int, int]]:
+    if len(roi) == 4 and all(isinstance(value, (int, float)) for value in roi):
+        roi = [{"name": "roi", "roi": roi}]
+
+    regions = {}
+    for region in roi:
+        if not isinstance(region, dict) or set(region) != {"name", "roi"}:
+            raise ValueError(
+                f"Region {region} is neither [x, y, w, h] nor a "
+                "dictionary with a name and a roi"
+            )
+        rect = region["roi"]
+        if len(rect) != 4 or not all(isinstance(value, (int, float)) for value in rect):
+            raise ValueError(f"Region {region['name']} is not given as [x, y, w, h]")
+        x, y, w, h = (int(value) for value in rect)
+        if x < 0 or y < 0 or w <= 0 or h <= 0:
+            raise ValueError(
+                f"Region {region['name']} has a negative corner or no size"
+            )
+        if region["name"] in regions:
+            raise ValueError(f"Region {region['name']} is given twice")
+        regions[region["name"]] = (x, y, w, h)
+    if not regions:
+        raise ValueError("At least one region is needed")
+    return regions
 
 
 class OpticalFlowDetection(Streamer):
+    """Vertical flow speed in one or more regions of the frame.
+
+    All regions share one pipeline: they are cut out of the frame, downscaled
+    and stacked into one mosaic, which is converted to gray once and feeds a
+    single background model. The flow and speed of every region is calculated
+    on its part of the mosaic and drawn on the same output frame. Regions
+    that are static skip the flow, and if all are, the mosaic is not built.
+    """
+
     def __init__(
         self, collector_config, free_port, exposed_parameters: Dict[str, Any]
     ) -> None:
         super().__init__(collector_config, free_port, exposed_parameters)
         self._previous_frame = None
-        self._speeds = []
-        self._current_speed = 0
+        self._layout = None
+        self._mosaic = None
+        self._speeds: Dict[str, List[float]] = {}
+        self._current_speeds: Dict[str, float] = {}
+        self._back_sub = None
+        self._flow_engines: Dict[str, Any] = {}
+        self._static_gates: Dict[str, StaticGate] = {}
+
+        self._time_stamp_used = True
+        self._command_timeout = 0.02
+
+    def update_speed_values(self) -> None:
+        for name, speeds in self._speeds.items():
+            self._current_speeds[name] = sum(speeds) / len(speeds) if speeds else 0
+            speeds.clear()
+
+    def update_speed_window(self, time_stamp: datetime) -> None:
+        if (time_stamp - self._last_speed_update).total_seconds() > 1:
+            self.update_speed_values()
+            self._last_speed_update = time_stamp
+
+    # the regions without change, checked on shrunk copies of the frame
+    def static_regions(self, frame, layout) -> Set[str]:
+        gate_params = self._parameters["static_gate"]
+        if not gate_params["enabled"]:
+            return set()
+        static = set()
+        for name, ((x, y, w, h), _) in layout.items():
+            if name not in self._static_gates:
+                self._static_gates[name] = StaticGate(gate_params)
+            if self._static_gates[name].is_static(frame[y : y + h, x : x + w]):
+                static.add(name)
+        return static
+
+    # the background model only ever sees the mosaic of the regions, it has to
+    # be trained anew whenever the regions or their size change
+    def reset_background_model(self) -> None:
         self._back_sub = cv2.createBackgroundSubtractorMOG2(
             history=50, varThreshold=10, detectShadows=True
         )
 
-        self._time_stamp_used = True
-        self._command_timeout = 0.02
+    def get_background_mask(self, mosaic):
+        if self._back_sub is None:
+            self.reset_background_model()
+        return self._back_sub.apply(mosaic)
 
-    def update_speed_value(self) -> None:
-        if not self._speeds:
-            self._current_speed = 0
-        self._current_speed = sum(self._speeds) / len(self._speeds)
-        self._speeds.clear()
-
-    def get_background_percentage(self, frame):
-        # Calculate the percentage of background in roi
-        mask = self._back_sub.apply(frame)
-        x, y, w, h = self._parameters["roi"]
-        mask_roi = mask[y : y + h, x : x + w]
+    @staticmethod
+    def background_percentage(mask_roi) -> float:
         non_background_pixels = np.count_nonzero(mask_roi)
-        total_pixels = mask_roi.size
-        background_percentage = 100 - (non_background_pixels / total_pixels * 100)
+        return 100 - (non_background_pixels / mask_roi.size * 100)
+
+    # Every region as its rectangle clipped to the frame and its rows and
+    # columns in the mosaic, where the regions are shrunk by the downscale
+    # factor and stacked on top of each other. Regions outside of the frame
+    # are left out.
+    def mosaic_layout(
+        self, regions: Dict[str, Tuple[int, int, int, int]], frame_shape
+    ) -> Dict[str, Tuple[Tuple[int, int, int, int], Tuple[slice, slice]]]:
+        downscale = self._parameters["downscale"]
+        layout = {}
+        top = 0
+        for name, (x, y, w, h) in regions.items():
+            w = min(w, frame_shape[1] - x)
+            h = min(h, frame_shape[0] - y)
+            if w <= 0 or h <= 0:
+                continue
+            height = max(round(h / downscale), 1)
+            width = max(round(w / downscale), 1)
+            layout[name] = ((x, y, w, h), (slice(top, top + height), slice(0, width)))
+            top += height
+        return layout
 
-        return background_percentage, mask_roi
+    # Only the pixels of the regions are copied, converted and modelled
+    def build_mosaic(self, frame, layout) -> np.ndarray:
+        height = max(rows.stop for _, (rows, _) in layout.values())
+        width = max(columns.stop for _, (_, columns) in layout.values())
+        if self._mosaic is None or self._mosaic.shape[:2] != (height, width):
+            self._mosaic = np.zeros((height, width, 3), dtype=frame.dtype)
+        for (x, y, w, h), (rows, columns) in layout.values():
+            frame_roi = frame[y : y + h, x : x + w]
+            size = (columns.stop - columns.start, rows.stop - rows.start)
+            if size != (w, h):
+                frame_roi = cv2.resize(frame_roi, size, interpolation=cv2.INTER_AREA)
+            self._mosaic[rows, columns] = frame_roi
+        return self._mosaic
 
     def calculate_flow(self, frame, time_stamp: datetime):
-        x, y, w, h = self._parameters["roi"]
+        regions = parse_regions(self._parameters["roi"])
+        layout = self.mosaic_layout(regions, frame.shape)
+        if not layout:
+            self.set_results(regions, {})
+            self.draw_regions(frame, regions, {})
+            return frame
 
-        if self._previous_frame is None:
-            self._previous_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            self._last_speed_update = time_stamp
+        static = self.static_regions(frame, layout)
+        if len(static) == len(layout) and layout == self._layout:
+            # nothing moves, the expensive stages are skipped. The flow starts
+            # over afterwards, or it would span the whole still stretch.
+            self._previous_frame = None
             self._last_time_stamp = time_stamp
-            return self._previous_frame
+            self.update_speed_window(time_stamp)
+            self.set_results(regions, {})
+            self.draw_regions(frame, regions, {}, static)
+            return frame
 
-        next_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        mosaic = self.build_mosaic(frame, layout)
+        next_frame = cv2.cvtColor(mosaic, cv2.COLOR_BGR2GRAY)
 
-        # Extract the ROI from the current and previous frame
-        prvs_frame_roi = self._previous_frame[y : y + h, x : x + w]
-        next_frame_roi = next_frame[y : y + h, x : x + w]
+        if layout != self._layout:
+            self._previous_frame = next_frame
+            self._layout = layout
+            self.reset_background_model()
+            self.get_background_mask(mosaic)
+            self._speeds = {name: [] for name in regions}
+            self._current_speeds = {name: 0 for name in regions}
+            self._last_speed_update = time_stamp
+            self._last_time_stamp = time_stamp
+            self._results = None
+            return frame
+        if self._previous_frame is None:
+            self._previous_frame = next_frame
+            self._last_time_stamp = time_stamp
+            self.get_background_mask(mosaic)
+            self.update_speed_window(time_stamp)
+            self.set_results(regions, {})
+            self.draw_regions(frame, regions, {}, static)
+            return frame
 
+        prvs_frame = self._previous_frame
         # Update previous_frame for next iteration
         self._previous_frame = next_frame
+        bg_mask = self.get_background_mask(mosaic)
+        elapsed = (time_stamp - self._last_time_stamp).total_seconds()
+        self._last_time_stamp = time_stamp
+
+        flows = {}
+        measured = {}
+        for name, ((_, _, _, h), (rows, columns)) in layout.items():
+            if name in static:
+                continue
+            mask_roi = bg_mask[rows, columns]
+            if 95 < self.background_percentage(mask_roi):
+                continue
+
+            # Calculate optical flow within the region
+            if name not in self._flow_engines:
+                self._flow_engines[name] = create_flow_engine(
+                    self._parameters["flow_engine"], self._parameters
+                )
+            flow = self._flow_engines[name](
+                prvs_frame[rows, columns], next_frame[rows, columns]
+            )
+            # We do not want to consider the flow of the background
+            flow = flow * (mask_roi > 0).astype(np.uint8)[..., None]
+            flows[name] = flow
+
+            # Calculate and update speed, in pixels of the full frame
+            scale = h / (rows.stop - rows.start)
+            flow_y = flow[..., 1]
+            moving = np.abs(flow_y)[flow_y != 0]
+            if moving.size and elapsed > 0:
+                speed = scale * np.mean(moving) / elapsed
+                self._speeds[name].append(speed)
+                measured[name] = (speed, moving.size / mask_roi.size)
+
+        self.update_speed_window(time_stamp)
+        self.set_results(regions, measured)
+        self.draw_regions(frame, regions, flows, static)
+        return frame
 
-        bg_percentage, bg_mask = self.get_background_percentage(frame)
-        if 95 < bg_percentage:
+    # Results of the frame for results-only workers. measured holds speed and
+    # confidence (the part of the region the speed is measured on) of the
+    # regions with flow.
+    def set_results(
+        self,
+        regions: Dict[str, Tuple[int, int, int, int]],
+        measured: Dict[str, Tuple[float, float]],
+    ) -> None:
+        results = {}
+        for name in regions:
+            speed, confidence = measured.get(name, (0.0, 0.0))
+            results[name] = {
+                "speed": float(speed),
+                "confidence": float(confidence),
+                "flow": name in measured,
+            }
+        self._results = {"regions": results}
+
+    # Overlays the flow and the speed of every region on the frame
+    def draw_regions(
+        self,
+        frame,
+        regions: Dict[str, Tuple[int, int, int, int]],
+        flows: Dict[str, Any],
+        static: Set[str] = frozenset(),
+    ) -> None:
+        if not self.drawing():
+            return
+        named = len(regions) > 1
+        for line, (name, (x, y, w, h)) in enumerate(regions.items()):
+            flow = flows.get(name)
+            if name in static:
+                text = "No flow"
+            elif flow is None:
+                text = "Could not detect flow"
+            else:
+                text = f"Y Speed: {self._current_speeds[name]:.2f} pixels/second"
+                # Visualize the optical flow within the region
+                frame_roi = frame[y : y + h, x : x + w]
+                hsv_roi = np.zeros((*flow.shape[:2], 3), dtype=np.uint8)
+                hsv_roi[..., 1] = 255
+                mag, ang = cv2.cartToPolar(flow[..., 0], flow[..., 1])
+                hsv_roi[..., 0] = ang * 180 / np.pi / 2
+                hsv_roi[..., 2] = cv2.normalize(mag, None, 0, 255, cv2.NORM_MINMAX)
+                bgr_roi = cv2.cvtColor(hsv_roi, cv2.COLOR_HSV2BGR)
+                if bgr_roi.shape != frame_roi.shape:
+                    bgr_roi = cv2.resize(
+                        bgr_roi,
+                        (frame_roi.shape[1], frame_roi.shape[0]),
+                        interpolation=cv2.INTER_LINEAR,
+                    )
+                frame[y : y + h, x : x + w] = cv2.addWeighted(
+                    frame_roi, 0.5, bgr_roi, 0.5, 0
+                )
+
+            if named:
+                text = f"{name} {text}"
+                cv2.putText(
+                    frame,
+                    name,
+                    (x, max(y - 8, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5,
+                    (255, 0, 0),
+                    1,
+                    cv2.LINE_AA,
+                )
             cv2.putText(
                 frame,
-                "Could not detect flow",
-                (10, 30),
+                text,
+                (10, 30 + 35 * line),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 1,
                 (0, 255, 0),
@@ -71,66 +306,35 @@ class OpticalFlowDetection(Streamer):
             )
             cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
-            return frame
-
-        # Calculate optical flow within the ROI
-        flow = cv2.calcOpticalFlowFarneback(
-            prvs_frame_roi, next_frame_roi, None, **self._parameters["flow_params"]
-        )
-        # We do not want to consider the flow of the background
-        binary_mask = binary_mask = (bg_mask > 0).astype(np.uint8)
-        flow = flow * binary_mask[..., None]
-
-        # Calculate and update speed
-        flow_y = flow[..., 1]
-        y_speed_per_second = (
-            np.mean(np.abs(flow_y)[flow_y != 0])
-            / (time_stamp - self._last_time_stamp).total_seconds()
-        )
-        self._last_time_stamp = time_stamp
-        self._speeds.append(y_speed_per_second)
-
-        if (time_stamp - self._last_speed_update).total_seconds() > 1:
-            self.update_speed_value()
-            self._last_speed_update = time_stamp
-
-        # Visualize the optical flow within the ROI
-        hsv_roi = np.zeros_like(frame[y : y + h, x : x + w])
-        hsv_roi[..., 1] = 255
-        mag, ang = cv2.cartToPolar(flow[..., 0], flow[..., 1])
-        hsv_roi[..., 0] = ang * 180 / np.pi / 2
-        hsv_roi[..., 2] = cv2.normalize(mag, None, 0, 255, cv2.NORM_MINMAX)
-        bgr_roi = cv2.cvtColor(hsv_roi, cv2.COLOR_HSV2BGR)
-
-        # Overlay the ROI visualization and Speed-value on the original frame
-        frame[y : y + h, x : x + w] = cv2.addWeighted(
-            frame[y : y + h, x : x + w], 0.5, bgr_roi, 0.5, 0
-        )
-        cv2.putText(
-            frame,
-            f"Y Speed: {self._current_speed:.2f} pixels/second",
-            (10, 30),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (0, 255, 0),
-            2,
-            cv2.LINE_AA,
-        )
-
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
-
-        return frame
-
     def process_frame(self) -> None:
         self._processed_frame = self.calculate_flow(
             self._current_frame, self._current_frame_time
         )
 
+    def check_conflict(self, dict: Dict) -> None:
+        try:
+            parse_regions(dict["roi"])
+        except (TypeError, ValueError) as e:
+            raise ProcessError(f"Invalid roi: {e}")
+        if dict["flow_engine"] not in FLOW_ENGINES:
+            raise ProcessError(
+                f"Flow engine {dict['flow_engine']} is not one of {FLOW_ENGINES}"
+            )
+
     def prepare_setting_change(self, key: str) -> None:
         match key:
-            case "roi":
+            case "roi" | "downscale":
                 self._previous_frame = None
+                self._layout = None
+                self._back_sub = None
+                self._flow_engines = {}
+                self._static_gates = {}
                 self._processed_frame = None
-                self._speeds.clear()
+            case "static_gate":
+                self._static_gates = {}
+            case "flow_engine" | "flow_params" | "lk_grid_params":
+                self._flow_engines = {}
+                for speeds in self._speeds.values():
+                    speeds.clear()
             case _:
                 pass
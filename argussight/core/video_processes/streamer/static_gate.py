@@ -0,0 +1,44 @@
+from typing import Any, Dict
+
+import cv2
+import numpy as np
+
+
+class StaticGate:
+    """Cheap check whether a region of the frame is static.
+
+    Every step-th pixel of the region is compared with a reference image.
+    Pixels differing by more than pixel_threshold gray levels count as
+    changed. The reference is only replaced when more than min_changed of
+    the pixels changed, so slow motion adds up until it is noticed. The
+    region is static after static_frames frames without change.
+    """
+
+    def __init__(self, params: Dict[str, Any]) -> None:
+        self._step = params["step"]
+        self._pixel_threshold = params["pixel_threshold"]
+        self._min_changed = params["min_changed"]
+        self._static_frames = params["static_frames"]
+        self._reference = None
+        self._unchanged = 0
+
+    def is_static(self, frame_roi: np.ndarray) -> bool:
+        # only every step-th pixel is read, the blur evens out the noise
+        small = np.ascontiguousarray(frame_roi[:: self._step, :: self._step])
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (3, 3), 0)
+
+        if self._reference is None or self._reference.shape != small.shape:
+            self._reference = small
+            self._unchanged = 0
+            return False
+        changed = np.count_nonzero(
+            cv2.absdiff(small, self._reference) > self._pixel_threshold
+        )
+        if changed > self._min_changed * small.size:
+            self._reference = small
+            self._unchanged = 0
+            return False
+        self._unchanged += 1
+        return self._unchanged >= self._static_frames
@@ -1,9 +1,7 @@
 import base64
 import json
-import queue
 import subprocess
 import uuid
-from multiprocessing import Queue
 from typing import Any, Dict
 
 import cv2
@@ -11,6 +9,9 @@ import redis
 
 from argussight.core.video_processes.vprocess import FrameFormat, Vprocess
 
+# results-only workers publish on this channel followed by their process name
+RESULTS_CHANNEL_PREFIX = "argussight:results:"
+
 
 class Streamer(Vprocess):
     def __init__(
@@ -19,6 +20,10 @@ class Streamer(Vprocess):
         super().__init__(collector_config, exposed_parameters)
 
         self._processed_frame = None  # this should be changed in process_frame
+        # numeric results of the current frame, set in process_frame by
+        # streamers that support the results-only mode
+        self._results = None
+        self._results_channel = None
         self._frame_format = (
             FrameFormat.CV2
         )  # streamer processes should use the cv2 (BGR) image format
@@ -31,24 +36,34 @@ class Streamer(Vprocess):
     def get_stream_id(self) -> str:
         return self._stream_id
 
-    def run(self, command_queue: Queue, response_queue: Queue) -> None:
-        pubsub = self._client.pubsub()
-        pubsub.subscribe(self._channel)
+    # Results-only workers neither draw nor stream, they publish the results of
+    # every frame on channel of the collector's redis instead
+    def publish_results_on(self, channel: str) -> None:
+        self._results_channel = channel
+
+    # whether the frame has to be annotated for the stream
+    def drawing(self) -> bool:
+        return self._results_channel is None
 
-        try:
-            for message in pubsub.listen():
-                try:
-                    order, args = command_queue.get(timeout=self._command_timeout)
-                    self.handle_command(order, response_queue, args)
-                except queue.Empty:
-                    pass
+    def handle_frame(self, frame) -> None:
+        super().handle_frame(frame)
+        if self._results_channel is None:
+            self.stream()
+        else:
+            self.publish_results(frame.get("time"))
 
-                if message and message["type"] == "message":
-                    self.read_frame(json.loads(message["data"]))
-                    self.process_frame()
-                    self.stream()
-        except redis.exceptions.ConnectionError as e:
-            print(f"Connection error {e} by {type(self)}")
+    def publish_results(self, time: str) -> None:
+        if self._results is not None:
+            self._client.publish(
+                self._results_channel,
+                json.dumps(
+                    {
+                        "frame_number": self._current_frame_number,
+                        "time": time,
+                        "results": self._results,
+                    }
+                ),
+            )
 
     def stream(self) -> None:
         if self._processed_frame is not None:
@@ -1,4 +1,6 @@
 import base64
+import copy
+import functools
 import inspect
 import json
 import os
@@ -8,7 +10,7 @@ import warnings
 from datetime import datetime
 from enum import Enum
 from multiprocessing import Queue
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple, Union
 
 import cv2
 import numpy as np
@@ -16,12 +18,29 @@ import redis
 import yaml
 from PIL import Image
 
+from argussight.core.resources import set_thread_count
+
 CONFIG_BASE_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../configurations/processes"
 )
 CONFIGS_EXTENSION = ".yaml"
 
 
+# parsed configs of the process classes
+_class_configs: Dict[type, Dict] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_config_index(base_path: str) -> Dict[str, str]:
+    """Paths of all config files in base_path and its folders, by file name"""
+    index = {}
+    # os.walk visits base_path first, so files directly in it take precedence
+    for root, dirs, files in os.walk(base_path):
+        for file_name in files:
+            index.setdefault(file_name, os.path.join(root, file_name))
+    return index
+
+
 class ProcessError(Exception):
     def __init__(self, message: str) -> None:
         super().__init__(message)
@@ -47,9 +66,8 @@ class Vprocess:
         self._time_stamp_used = (
             False  # If you need self._current_frame_time, set this to true
         )
-        self._command_timeout = (
-            1  # Time the process waits for new commands to arrive in seconds
-        )
+        # Maximal time (s) the process waits for a frame before handling new commands
+        self._command_timeout = 0.1
 
         # Dictionary of all commands that can be executed via command_queue
         self._commands = self.create_commands_dict()
@@ -62,18 +80,29 @@ class Vprocess:
         self._config = self.load_config_from_file()
         self.exposed_parameters = exposed_parameters
         self._parameters = self._get_all_parameters()
+        self._heartbeat = None
 
-    def merge_dicts(self, base_dict, new_dict):
+    @staticmethod
+    def merge_dicts(base_dict, new_dict):
         merged = base_dict.copy()
         merged["parameters"].update(new_dict["parameters"])
         return merged
 
     def load_config_from_file(self) -> Dict:
-        class_hierarchy = self.__class__.mro()[:-1]
+        # every instance gets its own copy of the parsed class config
+        return copy.deepcopy(self.__class__.load_class_config())
+
+    # configs are parsed only once per class, the spawner does so at startup
+    @classmethod
+    def load_class_config(cls) -> Dict:
+        if cls in _class_configs:
+            return _class_configs[cls]
+
+        class_hierarchy = cls.mro()[:-1]
         final_config = {"parameters": {}}
         for klass in reversed(class_hierarchy):
-            file_name = os.path.splitext(self.get_class_file(klass))[0]
-            config_path = self.__class__.find_config_file(
+            file_name = os.path.splitext(cls.get_class_file(klass))[0]
+            config_path = cls.find_config_file(
                 CONFIG_BASE_PATH, file_name + CONFIGS_EXTENSION
             )
 
@@ -82,23 +111,16 @@ class Vprocess:
 
             with open(config_path, "r") as config_file:
                 config_data = yaml.safe_load(config_file) or {}
-                final_config = self.merge_dicts(final_config, config_data)
+                final_config = cls.merge_dicts(final_config, config_data)
+        _class_configs[cls] = final_config
         return final_config
 
     @staticmethod
     def find_config_file(base_path, file_name):
-        # check if file is directly in base_path
-        direct_path = os.path.join(base_path, file_name)
-        if os.path.isfile(direct_path):
-            return direct_path
-
-        # check if file is inside a folder of base_path
-        for root, dirs, files in os.walk(base_path):
-            if file_name in files:
-                return os.path.join(root, file_name)
-        return None
+        return get_config_index(base_path).get(file_name)
 
-    def get_class_file(self, cls):
+    @staticmethod
+    def get_class_file(cls):
         module = inspect.getmodule(cls)
         if module:
             return os.path.basename(module.__file__).replace(".py", ".yaml")
@@ -109,8 +131,24 @@ class Vprocess:
         return {
             "settings": cls.change_settings,
             "default_settings": cls.set_default_settings,
+            "threads": cls.set_threads,
         }
 
+    # commands that are used by the server itself and are not offered to clients
+    @classmethod
+    def create_hidden_commands_list(cls) -> List[str]:
+        return ["settings", "default_settings", "threads"]
+
+    # workers whose run does not keep handling commands would use up the
+    # hidden commands the spawner sends on its own, e.g. "threads"
+    @classmethod
+    def handles_hidden_commands(cls) -> bool:
+        return True
+
+    # the spawner shares out the cores among the workers
+    def set_threads(self, threads: int) -> None:
+        set_thread_count(threads)
+
     def set_default_settings(self) -> None:
         self._parameters = self._get_all_parameters()
 
@@ -146,13 +184,16 @@ class Vprocess:
         }
 
         # Fill in all the exposed_params from yml
+        exposed = {}
         for param, data in self._config.get("parameters", {}).items():
             if "exposed" not in data:
                 warnings.warn(
                     f"Parameter '{param}' is missing the 'exposed' flag. Defaulting to False."
                 )
             elif data["exposed"]:
-                self.exposed_parameters[param] = data["value"]
+                exposed[param] = data["value"]
+        # published to the spawner at once
+        self.exposed_parameters.update(exposed)
         return all_params
 
     def read_frame(self, frame) -> bool:
@@ -185,57 +226,106 @@ class Vprocess:
             case _:
                 raise TypeError(f"FrameFormat has no type: {self._frame_format}")
 
-    def run(self, command_queue: Queue, response_queue: Queue) -> None:
+    # the process reports its liveness and frame rate there, see Heartbeat
+    def attach_heartbeat(self, heartbeat) -> None:
+        self._heartbeat = heartbeat
+
+    def subscribe(self) -> redis.client.PubSub:
         pubsub = self._client.pubsub()
         pubsub.subscribe(self._channel)
+        return pubsub
+
+    # pubsub can be an existing subscription to the channel, e.g. of an idle worker
+    def run(
+        self,
+        command_queue: Queue,
+        response_queue: Queue,
+        pubsub: Union[redis.client.PubSub, None] = None,
+    ) -> None:
+        if pubsub is None:
+            pubsub = self.subscribe()
 
         try:
-            for message in pubsub.listen():
-                try:
-                    order, args = command_queue.get(timeout=self._command_timeout)
-                    self.handle_command(order, response_queue, args)
-                except queue.Empty:
-                    pass
+            while True:
+                # commands are handled even if no frames arrive
+                message = pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self._command_timeout
+                )
+                self.handle_commands(command_queue, response_queue)
 
                 if message and message["type"] == "message":
-                    self.read_frame(json.loads(message["data"]))
-                    self.process_frame()
+                    frame = json.loads(message["data"])
+                    self.handle_frame(frame)
+                    if self._heartbeat is not None:
+                        self._heartbeat.frame_handled(frame)
+                elif self._heartbeat is not None:
+                    self._heartbeat.beat()
         except redis.exceptions.ConnectionError as e:
             print(f"Connection error {e} by {type(self)}")
 
+    def handle_frame(self, frame) -> None:
+        self.read_frame(frame)
+        self.process_frame()
+
     def process_frame(self) -> None:
         pass
 
-    def handle_command(self, order: str, response_queue: Queue, args) -> None:
+    # handles all commands that arrived, they can be sent without waiting
+    # for the previous ones to be answered
+    def handle_commands(self, command_queue: Queue, response_queue: Queue) -> None:
+        while True:
+            try:
+                request_id, order, args = command_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.handle_command(request_id, order, response_queue, args)
+
+    # responses carry the id of their request
+    def handle_command(
+        self, request_id: int, order: str, response_queue: Queue, args
+    ) -> None:
         if order not in self._commands:
             response_queue.put(
-                ProcessError(
-                    f"Order {order} is not known for process of type {type(self)}."
+                (
+                    request_id,
+                    ProcessError(
+                        f"Order {order} is not known for process of type {type(self)}."
+                    ),
                 )
             )
             return
         try:
-            self._commands[order](self, *args)
-            response_queue.put("Order {order} succeeded")
+            response_queue.put((request_id, self._commands[order](self, *args)))
         except Exception as e:
-            response_queue.put(e)
+            response_queue.put((request_id, e))
 
     def get_stream_id(self):
         return ""
 
 
 class Test(Vprocess):
-    def __init__(self, collector_config, exposed_parameters: Dict[str, Any]) -> None:
-        super().__init__(collector_config, exposed_parameters)
-        self._commands["print"] = self.print
+    @classmethod
+    def create_commands_dict(cls) -> Dict[str, Any]:
+        result = super().create_commands_dict()
+        result.update({"print": cls.print})
+        return result
 
-    def run(self, command_queue: Queue, response_queue: Queue) -> None:
+    # run handles a single command, which is left to the client
+    @classmethod
+    def handles_hidden_commands(cls) -> bool:
+        return False
+
+    def run(
+        self,
+        command_queue: Queue,
+        response_queue: Queue,
+        pubsub: Union[redis.client.PubSub, None] = None,
+    ) -> None:
         print("Running test process")
-        try:
-            order, args = command_queue.get(timeout=self._command_timeout)
-            self.handle_command(order, response_queue, args)
-        except queue.Empty:
-            pass
+        # the process lives until it handled its command, however long it
+        # takes the client to send it
+        request_id, order, args = command_queue.get()
+        self.handle_command(request_id, order, response_queue, args)
 
     def print(self, text: str):
         print(text)
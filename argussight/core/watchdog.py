@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Union
+
+WATCHDOG_ACTIONS = ("restart", "alert")
+
+
+class Watchdog:
+    """Watches the heartbeats of the processes of the spawner.
+
+    A process is in trouble if it ended, if its last heartbeat is older than
+    stall_time or if it handles frames slower than min_fps_ratio times the
+    camera frame rate for slow_time seconds. Then it is either restarted or
+    only an alert is raised, depending on action. Every problem is reported
+    once, until the process is healthy again.
+
+    Restarts back off: the second restart waits restart_delay seconds, every
+    further one twice as long as the one before. After max_restarts restarts
+    the process is only reported. The count starts again once the process
+    has been healthy for recovery_time seconds after its last restart.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        get_processes: Callable[[], Dict[str, Dict[str, Any]]],
+        restart: Callable[[str], None],
+        alert: Callable[[str, Union[str, None]], None],
+    ) -> None:
+        self._interval = config.get("interval", 1)
+        self._stall_time = config.get("stall_time", 10)
+        self._min_fps_ratio = config.get("min_fps_ratio", 0.5)
+        self._slow_time = config.get("slow_time", 30)
+        self._action = config.get("action", "restart")
+        self._restart_delay = config.get("restart_delay", 1)
+        self._max_restarts = config.get("max_restarts", 5)
+        self._recovery_time = config.get("recovery_time", 60)
+        if self._action not in WATCHDOG_ACTIONS:
+            raise ValueError(
+                f"Watchdog action {self._action} is not one of {WATCHDOG_ACTIONS}"
+            )
+        self._get_processes = get_processes
+        self._restart = restart
+        self._alert = alert
+
+        self._slow_since: Dict[str, float] = {}
+        self._reported: Dict[str, str] = {}
+        # number and time of the last restarts, by name
+        self._restarts: Dict[str, Dict[str, Any]] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    # waits for a check that is still running, e.g. a restart
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval):
+            processes = self._get_processes()
+            for name in list(self._slow_since):
+                if name not in processes:
+                    del self._slow_since[name]
+            for name in list(self._reported):
+                if name not in processes:
+                    del self._reported[name]
+            for name in list(self._restarts):
+                if name not in processes:
+                    del self._restarts[name]
+            for name, process in processes.items():
+                self.check(name, process)
+
+    # returns the problem of the process or None if it is healthy
+    def find_problem(self, name: str, process: Dict[str, Any]) -> Union[str, None]:
+        if not process["process_instance"].is_alive():
+            return "has ended"
+        state = process["heartbeat"].read()
+        if state["heartbeat_age"] > self._stall_time:
+            return f"did not respond for {state['heartbeat_age']:.1f}s"
+
+        # the rates are only measured while frames arrive
+        measured = 0 <= state["last_frame_age"] < self._stall_time
+        if (
+            measured
+            and state["camera_fps"] > 0
+            and state["fps"] < self._min_fps_ratio * state["camera_fps"]
+        ):
+            now = time.monotonic()
+            slow_since = self._slow_since.setdefault(name, now)
+            if now - slow_since >= self._slow_time:
+                return (
+                    f"handles {state['fps']:.1f} of {state['camera_fps']:.1f} fps "
+                    f"since {now - slow_since:.0f}s"
+                )
+        else:
+            self._slow_since.pop(name, None)
+        return None
+
+    def check(self, name: str, process: Dict[str, Any]) -> None:
+        problem = self.find_problem(name, process)
+        now = time.monotonic()
+        if problem is None:
+            if self._reported.pop(name, None) is not None:
+                self._alert(name, None)
+            restarts = self._restarts.get(name)
+            if restarts and now - restarts["time"] >= self._recovery_time:
+                del self._restarts[name]
+            return
+        if name in self._reported:
+            return
+
+        message = f"Process {name} {problem}"
+        restarts = self._restarts.get(name, {"count": 0, "time": 0.0})
+        if self._action == "restart" and restarts["count"] < self._max_restarts:
+            if restarts["count"]:
+                delay = self._restart_delay * 2 ** (restarts["count"] - 1)
+                if now - restarts["time"] < delay:
+                    # checked again in the next interval
+                    return
+            self._slow_since.pop(name, None)
+            self._restarts[name] = {"count": restarts["count"] + 1, "time": now}
+            print(f"Watchdog: {message}, restarting it")
+            try:
+                self._restart(name)
+            except Exception as e:
+                self._reported[name] = problem
+                self._alert(name, f"{message}, restarting failed: {e}")
+            return
+
+        self._reported[name] = problem
+        self._slow_since.pop(name, None)
+        if self._action == "restart":
+            message += f", not restarted again after {restarts['count']} restarts"
+        print(f"Watchdog: {message}")
+        self._alert(name, message)
@@ -0,0 +1,255 @@
+import json
+import multiprocessing
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Union
+
+import redis
+
+from argussight.core.heartbeat import Heartbeat
+from argussight.core.resources import apply_process_resources
+from argussight.core.shared_settings import SharedSettings
+from argussight.core.video_processes.streamer.streamer import Streamer
+from argussight.core.video_processes.vprocess import ProcessError, Vprocess
+
+
+# streamers given a results_channel publish their results there instead of
+# streaming, they need no port
+def create_worker_instance(
+    worker_class: type,
+    collector_config,
+    port: Union[int, None],
+    settings,
+    results_channel: Union[str, None] = None,
+) -> Vprocess:
+    if issubclass(worker_class, Streamer):
+        worker = worker_class(collector_config, port, settings)
+        if results_channel is not None:
+            worker.publish_results_on(results_channel)
+        return worker
+    return worker_class(collector_config, settings)
+
+
+# target of forked worker processes, the resources are applied before the
+# worker starts any thread
+def run_worker(
+    worker: Vprocess,
+    resources: Dict[str, Any],
+    command_queue: multiprocessing.Queue,
+    response_queue: multiprocessing.Queue,
+) -> None:
+    apply_process_resources(resources)
+    worker.run(command_queue, response_queue)
+
+
+class IdleWorker:
+    """Generic process waiting to become a worker of any type.
+
+    While idle it is subscribed to the video stream and keeps the latest frame,
+    so that an assigned worker starts with a live subscription and handles
+    that frame right away instead of waiting for the next one.
+    """
+
+    def __init__(
+        self,
+        collector_config,
+        settings: SharedSettings,
+        heartbeat: Heartbeat,
+        port: Union[int, None],
+    ) -> None:
+        self._collector_config = collector_config
+        self._settings = settings
+        self._heartbeat = heartbeat
+        self._port = port
+        self._poll_interval = 0.05
+
+    def run(self, command_queue: multiprocessing.Queue, response_queue) -> None:
+        client = redis.StrictRedis(
+            host=self._collector_config.redis.host,
+            port=self._collector_config.redis.port,
+        )
+        pubsub = client.pubsub()
+        last_message = None
+        try:
+            pubsub.subscribe(self._collector_config.redis.channel)
+            while True:
+                message = pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self._poll_interval
+                )
+                if message and message["type"] == "message":
+                    # frames are only decoded once the worker is assigned
+                    last_message = message
+                self._heartbeat.beat()
+                try:
+                    request_id, order, args = command_queue.get_nowait()
+                except queue.Empty:
+                    continue
+
+                if order != "assign":
+                    response_queue.put(
+                        (
+                            request_id,
+                            ProcessError(
+                                f"Order {order} is not known for idle workers."
+                            ),
+                        )
+                    )
+                    continue
+                try:
+                    worker_class, results_channel, resources = args
+                    # before the worker exists and handles the buffered frame
+                    apply_process_resources(resources)
+                    worker = create_worker_instance(
+                        worker_class,
+                        self._collector_config,
+                        None if results_channel else self._port,
+                        self._settings,
+                        results_channel,
+                    )
+                except Exception as e:
+                    response_queue.put((request_id, e))
+                    continue
+                worker.attach_heartbeat(self._heartbeat)
+                response_queue.put((request_id, worker.get_stream_id()))
+                break
+        except redis.exceptions.ConnectionError as e:
+            print(f"Connection error {e} by idle worker")
+            return
+
+        if last_message is not None:
+            frame = json.loads(last_message["data"])
+            worker.handle_frame(frame)
+            self._heartbeat.frame_handled(frame)
+        worker.run(command_queue, response_queue, pubsub)
+
+
+class WorkerPool:
+    """Idle worker processes of the spawner, refilled in the background"""
+
+    def __init__(
+        self,
+        size: int,
+        collector_config,
+        create_settings: Callable[[], SharedSettings],
+        reserve_port: Callable[[], int],
+        release_port: Callable[[Union[int, None]], None],
+    ) -> None:
+        self._size = size
+        self._collector_config = collector_config
+        self._create_settings = create_settings
+        self._reserve_port = reserve_port
+        self._release_port = release_port
+        self._idle: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._refill_thread: Union[threading.Thread, None] = None
+        self._closed = False
+
+    def start_idle_worker(self) -> Dict[str, Any]:
+        settings = self._create_settings()
+        heartbeat = Heartbeat()
+        # the worker may become a streamer, which needs a port
+        port = self._reserve_port()
+        command_queue = multiprocessing.Queue()
+        response_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=IdleWorker(self._collector_config, settings, heartbeat, port).run,
+            args=(command_queue, response_queue),
+        )
+        process.start()
+        return {
+            "process_instance": process,
+            "command_queue": command_queue,
+            "response_queue": response_queue,
+            "settings": settings,
+            "heartbeat": heartbeat,
+            "port": port,
+        }
+
+    def fill(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self._size:
+                    return
+            worker = self.start_idle_worker()
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(worker)
+                    continue
+            # the pool was closed while the worker started
+            self.discard(worker)
+            return
+
+    def refill(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if self._refill_thread is not None and self._refill_thread.is_alive():
+                return
+            self._refill_thread = threading.Thread(target=self.fill, daemon=True)
+            self._refill_thread.start()
+
+    def discard(self, worker: Dict[str, Any]) -> None:
+        process = worker["process_instance"]
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        worker["settings"].close()
+        worker["settings"].unlink()
+        worker["heartbeat"].close()
+        worker["heartbeat"].unlink()
+        self._release_port(worker["port"])
+
+    # returns an idle worker or None if there is none left
+    def take(self) -> Union[Dict[str, Any], None]:
+        worker = None
+        while worker is None:
+            with self._lock:
+                if not self._idle:
+                    break
+                worker = self._idle.pop(0)
+            # e.g. idle workers end if redis is not reachable
+            if not worker["process_instance"].is_alive():
+                self.discard(worker)
+                worker = None
+        self.refill()
+        return worker
+
+    # turns the idle worker into a worker of worker_class, returns its stream id
+    def assign(
+        self,
+        worker: Dict[str, Any],
+        worker_class: type,
+        timeout: float,
+        resources: Dict[str, Any],
+        results_channel: Union[str, None] = None,
+    ) -> str:
+        if not issubclass(worker_class, Streamer) or results_channel is not None:
+            self._release_port(worker["port"])
+            worker["port"] = None
+        # the dispatcher of the process numbers its commands from 1 on
+        worker["command_queue"].put(
+            (0, "assign", (worker_class, results_channel, resources))
+        )
+        try:
+            _, result = worker["response_queue"].get(timeout=timeout)
+        except queue.Empty:
+            self.discard(worker)
+            raise ProcessError("Idle worker did not respond to its assignment")
+        if isinstance(result, Exception):
+            self.discard(worker)
+            raise result
+        return result
+
+    # ends the idle workers and releases their shared memory and ports
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            refill_thread = self._refill_thread
+        if refill_thread is not None:
+            refill_thread.join()
+        for worker in idle:
+            self.discard(worker)
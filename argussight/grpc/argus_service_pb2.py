@@ -21,7 +21,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import any_pb2 as google_dot_protobuf_dot_any__pb2
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x13\x61rgus_service.proto\x12\nargussight\x1a\x19google/protobuf/any.proto"3\n\x15StartProcessesRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t"?\n\x16StartProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"*\n\x19TerminateProcessesRequest\x12\r\n\x05names\x18\x01 \x03(\t"C\n\x1aTerminateProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"7\n\x16ManageProcessesRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t"@\n\x17ManageProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"\xaf\x01\n\x15\x43hangeSettingsRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x41\n\x08settings\x18\x02 \x03(\x0b\x32/.argussight.ChangeSettingsRequest.SettingsEntry\x1a\x45\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.google.protobuf.Any:\x02\x38\x01"?\n\x16\x43hangeSettingsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"\x15\n\x13GetProcessesRequest"\xa1\x02\n\x14GetProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12Q\n\x11running_processes\x18\x02 \x03(\x0b\x32\x36.argussight.GetProcessesResponse.RunningProcessesEntry\x12\x1f\n\x17\x61vailable_process_types\x18\x03 \x03(\t\x12\x15\n\rerror_message\x18\x04 \x01(\t\x12\x0f\n\x07streams\x18\x05 \x03(\t\x1a]\n\x15RunningProcessesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x33\n\x05value\x18\x02 \x01(\x0b\x32$.argussight.RunningProcessDictionary:\x02\x38\x01"\xc7\x01\n\x18RunningProcessDictionary\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x10\n\x08\x63ommands\x18\x02 \x03(\t\x12\x44\n\x08settings\x18\x03 \x03(\x0b\x32\x32.argussight.RunningProcessDictionary.SettingsEntry\x1a\x45\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.google.protobuf.Any:\x02\x38\x01"A\n\x10\x41\x64\x64StreamRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\t\x12\x11\n\tstream_id\x18\x03 \x01(\t":\n\x11\x41\x64\x64StreamResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t2\xa0\x04\n\x0eSpawnerService\x12W\n\x0eStartProcesses\x12!.argussight.StartProcessesRequest\x1a".argussight.StartProcessesResponse\x12\x63\n\x12TerminateProcesses\x12%.argussight.TerminateProcessesRequest\x1a&.argussight.TerminateProcessesResponse\x12Z\n\x0fManageProcesses\x12".argussight.ManageProcessesRequest\x1a#.argussight.ManageProcessesResponse\x12Q\n\x0cGetProcesses\x12\x1f.argussight.GetProcessesRequest\x1a .argussight.GetProcessesResponse\x12W\n\x0e\x43hangeSettings\x12!.argussight.ChangeSettingsRequest\x1a".argussight.ChangeSettingsResponse\x12H\n\tAddStream\x12\x1c.argussight.AddStreamRequest\x1a\x1d.argussight.AddStreamResponseb\x06proto3'
+    b'\n\x13\x61rgus_service.proto\x12\nargussight\x1a\x19google/protobuf/any.proto"\xe2\x01\n\x0cSettingValue\x12\x14\n\nbool_value\x18\x01 \x01(\x08H\x00\x12\x13\n\tint_value\x18\x02 \x01(\x12H\x00\x12\x15\n\x0b\x66loat_value\x18\x03 \x01(\x01H\x00\x12\x16\n\x0cstring_value\x18\x04 \x01(\tH\x00\x12-\n\nlist_value\x18\x05 \x01(\x0b\x32\x17.argussight.SettingListH\x00\x12+\n\tmap_value\x18\x06 \x01(\x0b\x32\x16.argussight.SettingMapH\x00\x12\x14\n\nnull_value\x18\x07 \x01(\x08H\x00\x42\x06\n\x04kind"7\n\x0bSettingList\x12(\n\x06values\x18\x01 \x03(\x0b\x32\x18.argussight.SettingValue"\x89\x01\n\nSettingMap\x12\x32\n\x06values\x18\x01 \x03(\x0b\x32".argussight.SettingMap.ValuesEntry\x1aG\n\x0bValuesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.argussight.SettingValue:\x02\x38\x01",\n\x0eProcessToStart\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t"b\n\x15StartProcessesRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12-\n\tprocesses\x18\x03 \x03(\x0b\x32\x1a.argussight.ProcessToStart"T\n\rProcessResult\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x15\n\rerror_message\x18\x03 \x01(\t\x12\x0e\n\x06result\x18\x04 \x01(\t"k\n\x16StartProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12*\n\x07results\x18\x03 \x03(\x0b\x32\x19.argussight.ProcessResult"*\n\x19TerminateProcessesRequest\x12\r\n\x05names\x18\x01 \x03(\t"C\n\x1aTerminateProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"H\n\x16ManageProcessesRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\x12\x0f\n\x07timeout\x18\x03 \x01(\x01"P\n\x17ManageProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x0e\n\x06result\x18\x03 \x01(\t"\xa6\x03\n\x1b\x42\x61tchManageProcessesRequest\x12\r\n\x05names\x18\x01 \x03(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x14\n\x0cname_pattern\x18\x03 \x01(\t\x12\x0f\n\x07\x63ommand\x18\x04 \x01(\t\x12G\n\x08settings\x18\x05 \x03(\x0b\x32\x35.argussight.BatchManageProcessesRequest.SettingsEntry\x12\x0f\n\x07timeout\x18\x06 \x01(\x01\x12R\n\x0etyped_settings\x18\x07 \x03(\x0b\x32:.argussight.BatchManageProcessesRequest.TypedSettingsEntry\x1a\x45\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.google.protobuf.Any:\x02\x38\x01\x1aN\n\x12TypedSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.argussight.SettingValue:\x02\x38\x01"q\n\x1c\x42\x61tchManageProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12*\n\x07results\x18\x03 \x03(\x0b\x32\x19.argussight.ProcessResult"\xcd\x02\n\x15\x43hangeSettingsRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x41\n\x08settings\x18\x02 \x03(\x0b\x32/.argussight.ChangeSettingsRequest.SettingsEntry\x12L\n\x0etyped_settings\x18\x03 \x03(\x0b\x32\x34.argussight.ChangeSettingsRequest.TypedSettingsEntry\x1a\x45\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.google.protobuf.Any:\x02\x38\x01\x1aN\n\x12TypedSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.argussight.SettingValue:\x02\x38\x01"?\n\x16\x43hangeSettingsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"\x15\n\x13GetProcessesRequest"\xa1\x02\n\x14GetProcessesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12Q\n\x11running_processes\x18\x02 \x03(\x0b\x32\x36.argussight.GetProcessesResponse.RunningProcessesEntry\x12\x1f\n\x17\x61vailable_process_types\x18\x03 \x03(\t\x12\x15\n\rerror_message\x18\x04 \x01(\t\x12\x0f\n\x07streams\x18\x05 \x03(\t\x1a]\n\x15RunningProcessesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x33\n\x05value\x18\x02 \x01(\x0b\x32$.argussight.RunningProcessDictionary:\x02\x38\x01"\x81\x04\n\x18RunningProcessDictionary\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x10\n\x08\x63ommands\x18\x02 \x03(\t\x12\x44\n\x08settings\x18\x03 \x03(\x0b\x32\x32.argussight.RunningProcessDictionary.SettingsEntry\x12\r\n\x05\x61lert\x18\x04 \x01(\t\x12\x13\n\x0b\x63pu_percent\x18\x05 \x01(\x01\x12\x12\n\nmemory_rss\x18\x06 \x01(\x04\x12\x0f\n\x07threads\x18\x07 \x01(\r\x12\x0b\n\x03\x66ps\x18\x08 \x01(\x01\x12\x12\n\ncamera_fps\x18\t \x01(\x01\x12\x15\n\rmissed_frames\x18\n \x01(\x04\x12\x16\n\x0elast_frame_age\x18\x0b \x01(\x01\x12O\n\x0etyped_settings\x18\x0c \x03(\x0b\x32\x37.argussight.RunningProcessDictionary.TypedSettingsEntry\x1a\x45\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.google.protobuf.Any:\x02\x38\x01\x1aN\n\x12TypedSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.argussight.SettingValue:\x02\x38\x01")\n\x15WatchProcessesRequest\x12\x10\n\x08interval\x18\x01 \x01(\x01"\xcb\x02\n\x0fProcessesUpdate\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12L\n\x11\x63hanged_processes\x18\x03 \x03(\x0b\x32\x31.argussight.ProcessesUpdate.ChangedProcessesEntry\x12\x19\n\x11removed_processes\x18\x04 \x03(\t\x12\x17\n\x0fstreams_changed\x18\x05 \x01(\x08\x12\x0f\n\x07streams\x18\x06 \x03(\t\x12\x1f\n\x17\x61vailable_process_types\x18\x07 \x03(\t\x1a]\n\x15\x43hangedProcessesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x33\n\x05value\x18\x02 \x01(\x0b\x32$.argussight.RunningProcessDictionary:\x02\x38\x01"A\n\x10\x41\x64\x64StreamRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\t\x12\x11\n\tstream_id\x18\x03 \x01(\t":\n\x11\x41\x64\x64StreamResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"\xd9\x01\n\x07SaveJob\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\t\x12\x13\n\x0bsave_folder\x18\x03 \x01(\t\x12\x14\n\x0ctotal_frames\x18\x04 \x01(\x03\x12\x16\n\x0e\x66rames_written\x18\x05 \x01(\x03\x12\x15\n\rbytes_written\x18\x06 \x01(\x03\x12\x18\n\x10\x62ytes_per_second\x18\x07 \x01(\x01\x12\x10\n\x08\x64uration\x18\x08 \x01(\x01\x12\x15\n\rerror_message\x18\t \x01(\t\x12\x16\n\x0e\x66rames_skipped\x18\n \x01(\x03"#\n\x13ListSaveJobsRequest\x12\x0c\n\x04name\x18\x01 \x01(\t"`\n\x14ListSaveJobsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12!\n\x04jobs\x18\x03 \x03(\x0b\x32\x13.argussight.SaveJob"G\n\x14WatchSaveJobsRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07job_ids\x18\x02 \x03(\t\x12\x10\n\x08interval\x18\x03 \x01(\x01"4\n\x14\x43\x61ncelSaveJobRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06job_id\x18\x02 \x01(\t">\n\x15\x43\x61ncelSaveJobResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t"\xee\x02\n\x0e\x43ontrolRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\x04\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0f\n\x07\x63ommand\x18\x03 \x01(\t\x12:\n\x08settings\x18\x04 \x03(\x0b\x32(.argussight.ControlRequest.SettingsEntry\x12\x0f\n\x07timeout\x18\x05 \x01(\x01\x12\x45\n\x0etyped_settings\x18\x06 \x03(\x0b\x32-.argussight.ControlRequest.TypedSettingsEntry\x1a\x45\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.google.protobuf.Any:\x02\x38\x01\x1aN\n\x12TypedSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.argussight.SettingValue:\x02\x38\x01"\\\n\x0f\x43ontrolResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\x04\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x15\n\rerror_message\x18\x03 \x01(\t\x12\x0e\n\x06result\x18\x04 \x01(\t"#\n\x13WatchResultsRequest\x12\x0c\n\x04name\x18\x01 \x01(\t"?\n\x0cRegionResult\x12\r\n\x05speed\x18\x01 \x01(\x01\x12\x12\n\nconfidence\x18\x02 \x01(\x01\x12\x0c\n\x04\x66low\x18\x03 \x01(\x08"\xb2\x01\n\x0b\x46rameResult\x12\x14\n\x0c\x66rame_number\x18\x01 \x01(\x04\x12\x0c\n\x04time\x18\x02 \x01(\t\x12\x35\n\x07regions\x18\x03 \x03(\x0b\x32$.argussight.FrameResult.RegionsEntry\x1aH\n\x0cRegionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.argussight.RegionResult:\x02\x38\x01"f\n\x14WatchResultsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\'\n\x06result\x18\x03 \x01(\x0b\x32\x17.argussight.FrameResult2\xfc\x08\n\x0eSpawnerService\x12W\n\x0eStartProcesses\x12!.argussight.StartProcessesRequest\x1a".argussight.StartProcessesResponse\x12\x63\n\x12TerminateProcesses\x12%.argussight.TerminateProcessesRequest\x1a&.argussight.TerminateProcessesResponse\x12Z\n\x0fManageProcesses\x12".argussight.ManageProcessesRequest\x1a#.argussight.ManageProcessesResponse\x12i\n\x14\x42\x61tchManageProcesses\x12\'.argussight.BatchManageProcessesRequest\x1a(.argussight.BatchManageProcessesResponse\x12Q\n\x0cGetProcesses\x12\x1f.argussight.GetProcessesRequest\x1a .argussight.GetProcessesResponse\x12R\n\x0eWatchProcesses\x12!.argussight.WatchProcessesRequest\x1a\x1b.argussight.ProcessesUpdate0\x01\x12W\n\x0e\x43hangeSettings\x12!.argussight.ChangeSettingsRequest\x1a".argussight.ChangeSettingsResponse\x12H\n\tAddStream\x12\x1c.argussight.AddStreamRequest\x1a\x1d.argussight.AddStreamResponse\x12Q\n\x0cListSaveJobs\x12\x1f.argussight.ListSaveJobsRequest\x1a .argussight.ListSaveJobsResponse\x12U\n\rWatchSaveJobs\x12 .argussight.WatchSaveJobsRequest\x1a .argussight.ListSaveJobsResponse0\x01\x12T\n\rCancelSaveJob\x12 .argussight.CancelSaveJobRequest\x1a!.argussight.CancelSaveJobResponse\x12\x46\n\x07\x43ontrol\x12\x1a.argussight.ControlRequest\x1a\x1b.argussight.ControlResponse(\x01\x30\x01\x12S\n\x0cWatchResults\x12\x1f.argussight.WatchResultsRequest\x1a .argussight.WatchResultsResponse0\x01\x62\x06proto3'
 )
 
 _globals = globals()
@@ -29,46 +29,130 @@ _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, "argus_service_pb2", _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
     DESCRIPTOR._loaded_options = None
+    _globals["_SETTINGMAP_VALUESENTRY"]._loaded_options = None
+    _globals["_SETTINGMAP_VALUESENTRY"]._serialized_options = b"8\001"
+    _globals["_BATCHMANAGEPROCESSESREQUEST_SETTINGSENTRY"]._loaded_options = None
+    _globals["_BATCHMANAGEPROCESSESREQUEST_SETTINGSENTRY"]._serialized_options = (
+        b"8\001"
+    )
+    _globals["_BATCHMANAGEPROCESSESREQUEST_TYPEDSETTINGSENTRY"]._loaded_options = None
+    _globals["_BATCHMANAGEPROCESSESREQUEST_TYPEDSETTINGSENTRY"]._serialized_options = (
+        b"8\001"
+    )
     _globals["_CHANGESETTINGSREQUEST_SETTINGSENTRY"]._loaded_options = None
     _globals["_CHANGESETTINGSREQUEST_SETTINGSENTRY"]._serialized_options = b"8\001"
+    _globals["_CHANGESETTINGSREQUEST_TYPEDSETTINGSENTRY"]._loaded_options = None
+    _globals["_CHANGESETTINGSREQUEST_TYPEDSETTINGSENTRY"]._serialized_options = b"8\001"
     _globals["_GETPROCESSESRESPONSE_RUNNINGPROCESSESENTRY"]._loaded_options = None
     _globals["_GETPROCESSESRESPONSE_RUNNINGPROCESSESENTRY"]._serialized_options = (
         b"8\001"
     )
     _globals["_RUNNINGPROCESSDICTIONARY_SETTINGSENTRY"]._loaded_options = None
     _globals["_RUNNINGPROCESSDICTIONARY_SETTINGSENTRY"]._serialized_options = b"8\001"
-    _globals["_STARTPROCESSESREQUEST"]._serialized_start = 62
-    _globals["_STARTPROCESSESREQUEST"]._serialized_end = 113
-    _globals["_STARTPROCESSESRESPONSE"]._serialized_start = 115
-    _globals["_STARTPROCESSESRESPONSE"]._serialized_end = 178
-    _globals["_TERMINATEPROCESSESREQUEST"]._serialized_start = 180
-    _globals["_TERMINATEPROCESSESREQUEST"]._serialized_end = 222
-    _globals["_TERMINATEPROCESSESRESPONSE"]._serialized_start = 224
-    _globals["_TERMINATEPROCESSESRESPONSE"]._serialized_end = 291
-    _globals["_MANAGEPROCESSESREQUEST"]._serialized_start = 293
-    _globals["_MANAGEPROCESSESREQUEST"]._serialized_end = 348
-    _globals["_MANAGEPROCESSESRESPONSE"]._serialized_start = 350
-    _globals["_MANAGEPROCESSESRESPONSE"]._serialized_end = 414
-    _globals["_CHANGESETTINGSREQUEST"]._serialized_start = 417
-    _globals["_CHANGESETTINGSREQUEST"]._serialized_end = 592
-    _globals["_CHANGESETTINGSREQUEST_SETTINGSENTRY"]._serialized_start = 523
-    _globals["_CHANGESETTINGSREQUEST_SETTINGSENTRY"]._serialized_end = 592
-    _globals["_CHANGESETTINGSRESPONSE"]._serialized_start = 594
-    _globals["_CHANGESETTINGSRESPONSE"]._serialized_end = 657
-    _globals["_GETPROCESSESREQUEST"]._serialized_start = 659
-    _globals["_GETPROCESSESREQUEST"]._serialized_end = 680
-    _globals["_GETPROCESSESRESPONSE"]._serialized_start = 683
-    _globals["_GETPROCESSESRESPONSE"]._serialized_end = 972
-    _globals["_GETPROCESSESRESPONSE_RUNNINGPROCESSESENTRY"]._serialized_start = 879
-    _globals["_GETPROCESSESRESPONSE_RUNNINGPROCESSESENTRY"]._serialized_end = 972
-    _globals["_RUNNINGPROCESSDICTIONARY"]._serialized_start = 975
-    _globals["_RUNNINGPROCESSDICTIONARY"]._serialized_end = 1174
-    _globals["_RUNNINGPROCESSDICTIONARY_SETTINGSENTRY"]._serialized_start = 523
-    _globals["_RUNNINGPROCESSDICTIONARY_SETTINGSENTRY"]._serialized_end = 592
-    _globals["_ADDSTREAMREQUEST"]._serialized_start = 1176
-    _globals["_ADDSTREAMREQUEST"]._serialized_end = 1241
-    _globals["_ADDSTREAMRESPONSE"]._serialized_start = 1243
-    _globals["_ADDSTREAMRESPONSE"]._serialized_end = 1301
-    _globals["_SPAWNERSERVICE"]._serialized_start = 1304
-    _globals["_SPAWNERSERVICE"]._serialized_end = 1848
+    _globals["_RUNNINGPROCESSDICTIONARY_TYPEDSETTINGSENTRY"]._loaded_options = None
+    _globals["_RUNNINGPROCESSDICTIONARY_TYPEDSETTINGSENTRY"]._serialized_options = (
+        b"8\001"
+    )
+    _globals["_PROCESSESUPDATE_CHANGEDPROCESSESENTRY"]._loaded_options = None
+    _globals["_PROCESSESUPDATE_CHANGEDPROCESSESENTRY"]._serialized_options = b"8\001"
+    _globals["_CONTROLREQUEST_SETTINGSENTRY"]._loaded_options = None
+    _globals["_CONTROLREQUEST_SETTINGSENTRY"]._serialized_options = b"8\001"
+    _globals["_CONTROLREQUEST_TYPEDSETTINGSENTRY"]._loaded_options = None
+    _globals["_CONTROLREQUEST_TYPEDSETTINGSENTRY"]._serialized_options = b"8\001"
+    _globals["_FRAMERESULT_REGIONSENTRY"]._loaded_options = None
+    _globals["_FRAMERESULT_REGIONSENTRY"]._serialized_options = b"8\001"
+    _globals["_SETTINGVALUE"]._serialized_start = 63
+    _globals["_SETTINGVALUE"]._serialized_end = 289
+    _globals["_SETTINGLIST"]._serialized_start = 291
+    _globals["_SETTINGLIST"]._serialized_end = 346
+    _globals["_SETTINGMAP"]._serialized_start = 349
+    _globals["_SETTINGMAP"]._serialized_end = 486
+    _globals["_SETTINGMAP_VALUESENTRY"]._serialized_start = 415
+    _globals["_SETTINGMAP_VALUESENTRY"]._serialized_end = 486
+    _globals["_PROCESSTOSTART"]._serialized_start = 488
+    _globals["_PROCESSTOSTART"]._serialized_end = 532
+    _globals["_STARTPROCESSESREQUEST"]._serialized_start = 534
+    _globals["_STARTPROCESSESREQUEST"]._serialized_end = 632
+    _globals["_PROCESSRESULT"]._serialized_start = 634
+    _globals["_PROCESSRESULT"]._serialized_end = 718
+    _globals["_STARTPROCESSESRESPONSE"]._serialized_start = 720
+    _globals["_STARTPROCESSESRESPONSE"]._serialized_end = 827
+    _globals["_TERMINATEPROCESSESREQUEST"]._serialized_start = 829
+    _globals["_TERMINATEPROCESSESREQUEST"]._serialized_end = 871
+    _globals["_TERMINATEPROCESSESRESPONSE"]._serialized_start = 873
+    _globals["_TERMINATEPROCESSESRESPONSE"]._serialized_end = 940
+    _globals["_MANAGEPROCESSESREQUEST"]._serialized_start = 942
+    _globals["_MANAGEPROCESSESREQUEST"]._serialized_end = 1014
+    _globals["_MANAGEPROCESSESRESPONSE"]._serialized_start = 1016
+    _globals["_MANAGEPROCESSESRESPONSE"]._serialized_end = 1096
+    _globals["_BATCHMANAGEPROCESSESREQUEST"]._serialized_start = 1099
+    _globals["_BATCHMANAGEPROCESSESREQUEST"]._serialized_end = 1521
+    _globals["_BATCHMANAGEPROCESSESREQUEST_SETTINGSENTRY"]._serialized_start = 1372
+    _globals["_BATCHMANAGEPROCESSESREQUEST_SETTINGSENTRY"]._serialized_end = 1441
+    _globals["_BATCHMANAGEPROCESSESREQUEST_TYPEDSETTINGSENTRY"]._serialized_start = 1443
+    _globals["_BATCHMANAGEPROCESSESREQUEST_TYPEDSETTINGSENTRY"]._serialized_end = 1521
+    _globals["_BATCHMANAGEPROCESSESRESPONSE"]._serialized_start = 1523
+    _globals["_BATCHMANAGEPROCESSESRESPONSE"]._serialized_end = 1636
+    _globals["_CHANGESETTINGSREQUEST"]._serialized_start = 1639
+    _globals["_CHANGESETTINGSREQUEST"]._serialized_end = 1972
+    _globals["_CHANGESETTINGSREQUEST_SETTINGSENTRY"]._serialized_start = 1372
+    _globals["_CHANGESETTINGSREQUEST_SETTINGSENTRY"]._serialized_end = 1441
+    _globals["_CHANGESETTINGSREQUEST_TYPEDSETTINGSENTRY"]._serialized_start = 1443
+    _globals["_CHANGESETTINGSREQUEST_TYPEDSETTINGSENTRY"]._serialized_end = 1521
+    _globals["_CHANGESETTINGSRESPONSE"]._serialized_start = 1974
+    _globals["_CHANGESETTINGSRESPONSE"]._serialized_end = 2037
+    _globals["_GETPROCESSESREQUEST"]._serialized_start = 2039
+    _globals["_GETPROCESSESREQUEST"]._serialized_end = 2060
+    _globals["_GETPROCESSESRESPONSE"]._serialized_start = 2063
+    _globals["_GETPROCESSESRESPONSE"]._serialized_end = 2352
+    _globals["_GETPROCESSESRESPONSE_RUNNINGPROCESSESENTRY"]._serialized_start = 2259
+    _globals["_GETPROCESSESRESPONSE_RUNNINGPROCESSESENTRY"]._serialized_end = 2352
+    _globals["_RUNNINGPROCESSDICTIONARY"]._serialized_start = 2355
+    _globals["_RUNNINGPROCESSDICTIONARY"]._serialized_end = 2868
+    _globals["_RUNNINGPROCESSDICTIONARY_SETTINGSENTRY"]._serialized_start = 1372
+    _globals["_RUNNINGPROCESSDICTIONARY_SETTINGSENTRY"]._serialized_end = 1441
+    _globals["_RUNNINGPROCESSDICTIONARY_TYPEDSETTINGSENTRY"]._serialized_start = 1443
+    _globals["_RUNNINGPROCESSDICTIONARY_TYPEDSETTINGSENTRY"]._serialized_end = 1521
+    _globals["_WATCHPROCESSESREQUEST"]._serialized_start = 2870
+    _globals["_WATCHPROCESSESREQUEST"]._serialized_end = 2911
+    _globals["_PROCESSESUPDATE"]._serialized_start = 2914
+    _globals["_PROCESSESUPDATE"]._serialized_end = 3245
+    _globals["_PROCESSESUPDATE_CHANGEDPROCESSESENTRY"]._serialized_start = 3152
+    _globals["_PROCESSESUPDATE_CHANGEDPROCESSESENTRY"]._serialized_end = 3245
+    _globals["_ADDSTREAMREQUEST"]._serialized_start = 3247
+    _globals["_ADDSTREAMREQUEST"]._serialized_end = 3312
+    _globals["_ADDSTREAMRESPONSE"]._serialized_start = 3314
+    _globals["_ADDSTREAMRESPONSE"]._serialized_end = 3372
+    _globals["_SAVEJOB"]._serialized_start = 3375
+    _globals["_SAVEJOB"]._serialized_end = 3592
+    _globals["_LISTSAVEJOBSREQUEST"]._serialized_start = 3594
+    _globals["_LISTSAVEJOBSREQUEST"]._serialized_end = 3629
+    _globals["_LISTSAVEJOBSRESPONSE"]._serialized_start = 3631
+    _globals["_LISTSAVEJOBSRESPONSE"]._serialized_end = 3727
+    _globals["_WATCHSAVEJOBSREQUEST"]._serialized_start = 3729
+    _globals["_WATCHSAVEJOBSREQUEST"]._serialized_end = 3800
+    _globals["_CANCELSAVEJOBREQUEST"]._serialized_start = 3802
+    _globals["_CANCELSAVEJOBREQUEST"]._serialized_end = 3854
+    _globals["_CANCELSAVEJOBRESPONSE"]._serialized_start = 3856
+    _globals["_CANCELSAVEJOBRESPONSE"]._serialized_end = 3918
+    _globals["_CONTROLREQUEST"]._serialized_start = 3921
+    _globals["_CONTROLREQUEST"]._serialized_end = 4287
+    _globals["_CONTROLREQUEST_SETTINGSENTRY"]._serialized_start = 1372
+    _globals["_CONTROLREQUEST_SETTINGSENTRY"]._serialized_end = 1441
+    _globals["_CONTROLREQUEST_TYPEDSETTINGSENTRY"]._serialized_start = 1443
+    _globals["_CONTROLREQUEST_TYPEDSETTINGSENTRY"]._serialized_end = 1521
+    _globals["_CONTROLRESPONSE"]._serialized_start = 4289
+    _globals["_CONTROLRESPONSE"]._serialized_end = 4381
+    _globals["_WATCHRESULTSREQUEST"]._serialized_start = 4383
+    _globals["_WATCHRESULTSREQUEST"]._serialized_end = 4418
+    _globals["_REGIONRESULT"]._serialized_start = 4420
+    _globals["_REGIONRESULT"]._serialized_end = 4483
+    _globals["_FRAMERESULT"]._serialized_start = 4486
+    _globals["_FRAMERESULT"]._serialized_end = 4664
+    _globals["_FRAMERESULT_REGIONSENTRY"]._serialized_start = 4592
+    _globals["_FRAMERESULT_REGIONSENTRY"]._serialized_end = 4664
+    _globals["_WATCHRESULTSRESPONSE"]._serialized_start = 4666
+    _globals["_WATCHRESULTSRESPONSE"]._serialized_end = 4768
+    _globals["_SPAWNERSERVICE"]._serialized_start = 4771
+    _globals["_SPAWNERSERVICE"]._serialized_end = 5919
 # @@protoc_insertion_point(module_scope)
@@ -54,12 +54,24 @@ class SpawnerServiceStub(object):
             response_deserializer=argus__service__pb2.ManageProcessesResponse.FromString,
             _registered_method=True,
         )
+        self.BatchManageProcesses = channel.unary_unary(
+            "/argussight.SpawnerService/BatchManageProcesses",
+            request_serializer=argus__service__pb2.BatchManageProcessesRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.BatchManageProcessesResponse.FromString,
+            _registered_method=True,
+        )
         self.GetProcesses = channel.unary_unary(
             "/argussight.SpawnerService/GetProcesses",
             request_serializer=argus__service__pb2.GetProcessesRequest.SerializeToString,
             response_deserializer=argus__service__pb2.GetProcessesResponse.FromString,
             _registered_method=True,
         )
+        self.WatchProcesses = channel.unary_stream(
+            "/argussight.SpawnerService/WatchProcesses",
+            request_serializer=argus__service__pb2.WatchProcessesRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.ProcessesUpdate.FromString,
+            _registered_method=True,
+        )
         self.ChangeSettings = channel.unary_unary(
             "/argussight.SpawnerService/ChangeSettings",
             request_serializer=argus__service__pb2.ChangeSettingsRequest.SerializeToString,
@@ -72,6 +84,36 @@ class SpawnerServiceStub(object):
             response_deserializer=argus__service__pb2.AddStreamResponse.FromString,
             _registered_method=True,
         )
+        self.ListSaveJobs = channel.unary_unary(
+            "/argussight.SpawnerService/ListSaveJobs",
+            request_serializer=argus__service__pb2.ListSaveJobsRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.ListSaveJobsResponse.FromString,
+            _registered_method=True,
+        )
+        self.WatchSaveJobs = channel.unary_stream(
+            "/argussight.SpawnerService/WatchSaveJobs",
+            request_serializer=argus__service__pb2.WatchSaveJobsRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.ListSaveJobsResponse.FromString,
+            _registered_method=True,
+        )
+        self.CancelSaveJob = channel.unary_unary(
+            "/argussight.SpawnerService/CancelSaveJob",
+            request_serializer=argus__service__pb2.CancelSaveJobRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.CancelSaveJobResponse.FromString,
+            _registered_method=True,
+        )
+        self.Control = channel.stream_stream(
+            "/argussight.SpawnerService/Control",
+            request_serializer=argus__service__pb2.ControlRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.ControlResponse.FromString,
+            _registered_method=True,
+        )
+        self.WatchResults = channel.unary_stream(
+            "/argussight.SpawnerService/WatchResults",
+            request_serializer=argus__service__pb2.WatchResultsRequest.SerializeToString,
+            response_deserializer=argus__service__pb2.WatchResultsResponse.FromString,
+            _registered_method=True,
+        )
 
 
 class SpawnerServiceServicer(object):
@@ -95,12 +137,24 @@ class SpawnerServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def BatchManageProcesses(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def GetProcesses(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def WatchProcesses(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def ChangeSettings(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -113,6 +167,36 @@ class SpawnerServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def ListSaveJobs(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def WatchSaveJobs(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def CancelSaveJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Control(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def WatchResults(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_SpawnerServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -131,11 +215,21 @@ def add_SpawnerServiceServicer_to_server(servicer, server):
             request_deserializer=argus__service__pb2.ManageProcessesRequest.FromString,
             response_serializer=argus__service__pb2.ManageProcessesResponse.SerializeToString,
         ),
+        "BatchManageProcesses": grpc.unary_unary_rpc_method_handler(
+            servicer.BatchManageProcesses,
+            request_deserializer=argus__service__pb2.BatchManageProcessesRequest.FromString,
+            response_serializer=argus__service__pb2.BatchManageProcessesResponse.SerializeToString,
+        ),
         "GetProcesses": grpc.unary_unary_rpc_method_handler(
             servicer.GetProcesses,
             request_deserializer=argus__service__pb2.GetProcessesRequest.FromString,
             response_serializer=argus__service__pb2.GetProcessesResponse.SerializeToString,
         ),
+        "WatchProcesses": grpc.unary_stream_rpc_method_handler(
+            servicer.WatchProcesses,
+            request_deserializer=argus__service__pb2.WatchProcessesRequest.FromString,
+            response_serializer=argus__service__pb2.ProcessesUpdate.SerializeToString,
+        ),
         "ChangeSettings": grpc.unary_unary_rpc_method_handler(
             servicer.ChangeSettings,
             request_deserializer=argus__service__pb2.ChangeSettingsRequest.FromString,
@@ -146,6 +240,31 @@ def add_SpawnerServiceServicer_to_server(servicer, server):
             request_deserializer=argus__service__pb2.AddStreamRequest.FromString,
             response_serializer=argus__service__pb2.AddStreamResponse.SerializeToString,
         ),
+        "ListSaveJobs": grpc.unary_unary_rpc_method_handler(
+            servicer.ListSaveJobs,
+            request_deserializer=argus__service__pb2.ListSaveJobsRequest.FromString,
+            response_serializer=argus__service__pb2.ListSaveJobsResponse.SerializeToString,
+        ),
+        "WatchSaveJobs": grpc.unary_stream_rpc_method_handler(
+            servicer.WatchSaveJobs,
+            request_deserializer=argus__service__pb2.WatchSaveJobsRequest.FromString,
+            response_serializer=argus__service__pb2.ListSaveJobsResponse.SerializeToString,
+        ),
+        "CancelSaveJob": grpc.unary_unary_rpc_method_handler(
+            servicer.CancelSaveJob,
+            request_deserializer=argus__service__pb2.CancelSaveJobRequest.FromString,
+            response_serializer=argus__service__pb2.CancelSaveJobResponse.SerializeToString,
+        ),
+        "Control": grpc.stream_stream_rpc_method_handler(
+            servicer.Control,
+            request_deserializer=argus__service__pb2.ControlRequest.FromString,
+            response_serializer=argus__service__pb2.ControlResponse.SerializeToString,
+        ),
+        "WatchResults": grpc.unary_stream_rpc_method_handler(
+            servicer.WatchResults,
+            request_deserializer=argus__service__pb2.WatchResultsRequest.FromString,
+            response_serializer=argus__service__pb2.WatchResultsResponse.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "argussight.SpawnerService", rpc_method_handlers
@@ -250,6 +369,36 @@ class SpawnerService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def BatchManageProcesses(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/argussight.SpawnerService/BatchManageProcesses",
+            argus__service__pb2.BatchManageProcessesRequest.SerializeToString,
+            argus__service__pb2.BatchManageProcessesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def GetProcesses(
         request,
@@ -280,6 +429,36 @@ class SpawnerService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def WatchProcesses(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/argussight.SpawnerService/WatchProcesses",
+            argus__service__pb2.WatchProcessesRequest.SerializeToString,
+            argus__service__pb2.ProcessesUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def ChangeSettings(
         request,
@@ -339,3 +518,153 @@ class SpawnerService(object):
             metadata,
             _registered_method=True,
         )
+
+    @staticmethod
+    def ListSaveJobs(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/argussight.SpawnerService/ListSaveJobs",
+            argus__service__pb2.ListSaveJobsRequest.SerializeToString,
+            argus__service__pb2.ListSaveJobsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def WatchSaveJobs(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/argussight.SpawnerService/WatchSaveJobs",
+            argus__service__pb2.WatchSaveJobsRequest.SerializeToString,
+            argus__service__pb2.ListSaveJobsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def CancelSaveJob(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/argussight.SpawnerService/CancelSaveJob",
+            argus__service__pb2.CancelSaveJobRequest.SerializeToString,
+            argus__service__pb2.CancelSaveJobResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def Control(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/argussight.SpawnerService/Control",
+            argus__service__pb2.ControlRequest.SerializeToString,
+            argus__service__pb2.ControlResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def WatchResults(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/argussight.SpawnerService/WatchResults",
+            argus__service__pb2.WatchResultsRequest.SerializeToString,
+            argus__service__pb2.WatchResultsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
@@ -1,15 +1,80 @@
 import json
+from typing import Any as AnyValue
+from typing import Dict
 
 from google.protobuf.any_pb2 import Any
 
+import argussight.grpc.argus_service_pb2 as pb2
 
+
+def to_setting_value(value: AnyValue) -> pb2.SettingValue:
+    # bool first, it is a subclass of int
+    if value is None:
+        return pb2.SettingValue(null_value=True)
+    if isinstance(value, bool):
+        return pb2.SettingValue(bool_value=value)
+    if isinstance(value, int):
+        return pb2.SettingValue(int_value=value)
+    if isinstance(value, float):
+        return pb2.SettingValue(float_value=value)
+    if isinstance(value, str):
+        return pb2.SettingValue(string_value=value)
+    if isinstance(value, (list, tuple)):
+        return pb2.SettingValue(
+            list_value=pb2.SettingList(
+                values=[to_setting_value(item) for item in value]
+            )
+        )
+    if isinstance(value, dict):
+        return pb2.SettingValue(
+            map_value=pb2.SettingMap(
+                values={str(key): to_setting_value(item) for key, item in value.items()}
+            )
+        )
+    raise TypeError(f"Unsupported type: {type(value)}")
+
+
+def from_setting_value(setting: pb2.SettingValue) -> AnyValue:
+    kind = setting.WhichOneof("kind")
+    if kind == "list_value":
+        return [from_setting_value(item) for item in setting.list_value.values]
+    if kind == "map_value":
+        return {
+            key: from_setting_value(item)
+            for key, item in setting.map_value.values.items()
+        }
+    if kind == "null_value" or kind is None:
+        return None
+    return getattr(setting, kind)
+
+
+def pack_settings(settings: Dict[str, AnyValue]) -> Dict[str, pb2.SettingValue]:
+    return {key: to_setting_value(value) for key, value in settings.items()}
+
+
+def unpack_settings(request) -> Dict[str, AnyValue]:
+    """Settings of a request, given typed or in the deprecated Any format"""
+    settings = {
+        key: unpack_from_any(any_object) for key, any_object in request.settings.items()
+    }
+    settings.update(
+        {
+            key: from_setting_value(setting)
+            for key, setting in request.typed_settings.items()
+        }
+    )
+    return settings
+
+
+# deprecated, settings are sent as SettingValue
 def pack_to_any(value: any) -> Any:
     any_obj = Any()
 
     if isinstance(value, str):
         any_obj.value = value.encode("utf-8")
 
-    elif isinstance(value, (dict, list)):
+    # None as JSON null, which unpack_from_any turns back into None
+    elif value is None or isinstance(value, (dict, list)):
         json_value = json.dumps(value)
         any_obj.value = json_value.encode("utf-8")
 
@@ -23,6 +88,7 @@ def pack_to_any(value: any) -> Any:
     return any_obj
 
 
+# deprecated, the type of the value is guessed from its string
 def unpack_from_any(any_obj):
     try:
         # Attempt to decode as a UTF-8 string
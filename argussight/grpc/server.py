@@ -1,22 +1,42 @@
-import time
-from concurrent import futures
+import asyncio
+import concurrent.futures
+import json
+from typing import Any, Dict
 
 import grpc
+import redis
+import redis.asyncio
 
 import argussight.grpc.argus_service_pb2 as pb2
 import argussight.grpc.argus_service_pb2_grpc as pb2_grpc
 from argussight.core.spawner import ProcessError, Spawner
-from argussight.grpc.helper_functions import pack_to_any, unpack_from_any
+from argussight.core.video_processes.savers.export import FINISHED_STATES
+from argussight.grpc.helper_functions import pack_settings, pack_to_any, unpack_settings
 
 
 class SpawnerService(pb2_grpc.SpawnerServiceServicer):
     def __init__(self, collector_config):
         self.spawner = Spawner(collector_config)
         self._min_waiting_time = 1
+        self._finished_job_states = [state.value for state in FINISHED_STATES]
 
-    def StartProcesses(self, request, context):
+    # Commands are queued to the processes and awaited, so that waiting on slow
+    # processes does not hold a thread. Their dispatchers make sure that they
+    # finish before their deadline. Other blocking calls of the spawner
+    # (starting and terminating processes, ...) run in the default executor.
+    async def _run_command(
+        self, name: str, command: str, args, timeout: float = 0
+    ) -> Any:
+        future = self.spawner.submit_command(name, command, args, timeout or None)
+        return await asyncio.wrap_future(future)
+
+    async def StartProcesses(self, request, context):
+        if request.processes:
+            return await self._start_processes(request.processes)
         try:
-            self.spawner.start_process(request.name, request.type)
+            await asyncio.to_thread(
+                self.spawner.start_process, request.name, request.type
+            )
             return pb2.StartProcessesResponse(status="success")
         except ProcessError as e:
             return pb2.StartProcessesResponse(status="failure", error_message=str(e))
@@ -25,9 +45,36 @@ class SpawnerService(pb2_grpc.SpawnerServiceServicer):
                 status="failure", error_message=f"Unexpected error: {str(e)}"
             )
 
-    def TerminateProcesses(self, request, context):
+    async def _start_processes(self, processes):
+        try:
+            started = await asyncio.to_thread(
+                self.spawner.start_processes,
+                [(process.name, process.type) for process in processes],
+            )
+        except Exception as e:
+            return pb2.StartProcessesResponse(
+                status="failure", error_message=f"Unexpected error: {str(e)}"
+            )
+        results = [
+            pb2.ProcessResult(
+                name=name,
+                status="success" if error is None else "failure",
+                error_message="" if error is None else str(error),
+            )
+            for name, error in started
+        ]
+        failed = [result.name for result in results if result.status == "failure"]
+        if failed:
+            return pb2.StartProcessesResponse(
+                status="failure",
+                error_message=f"Failed to start {failed}",
+                results=results,
+            )
+        return pb2.StartProcessesResponse(status="success", results=results)
+
+    async def TerminateProcesses(self, request, context):
         try:
-            self.spawner.terminate_processes(request.names)
+            await asyncio.to_thread(self.spawner.terminate_processes, request.names)
             return pb2.TerminateProcessesResponse(status="success")
         except ProcessError as e:
             return pb2.TerminateProcessesResponse(
@@ -38,14 +85,14 @@ class SpawnerService(pb2_grpc.SpawnerServiceServicer):
                 status="failure", error_message=f"Unexpected error: {str(e)}"
             )
 
-    def ManageProcesses(self, request, context):
+    async def ManageProcesses(self, request, context):
         try:
-            self.spawner.manage_process(
-                request.name,
-                request.command,
-                {},
+            result = await self._run_command(
+                request.name, request.command, {}, request.timeout
+            )
+            return pb2.ManageProcessesResponse(
+                status="success", result="" if result is None else str(result)
             )
-            return pb2.ManageProcessesResponse(status="success")
         except ProcessError as e:
             return pb2.ManageProcessesResponse(status="failure", error_message=str(e))
         except Exception as e:
@@ -53,19 +100,94 @@ class SpawnerService(pb2_grpc.SpawnerServiceServicer):
                 status="failure", error_message=f"Unexpected error: {str(e)}"
             )
 
-    def GetProcesses(self, request, context):
+    async def BatchManageProcesses(self, request, context):
         try:
-            running_processes, available_types, streams = self.spawner.get_processes()
-            running_dict = {}
-            for name, process in running_processes.items():
-                settings = {}
-                for key, setting in process["settings"].items():
-                    settings[key] = pack_to_any(setting)
-                running_dict[name] = pb2.RunningProcessDictionary(
-                    type=process["type"],
-                    commands=process["commands"],
-                    settings=settings,
+            names = self.spawner.select_processes(
+                list(request.names), request.type, request.name_pattern
+            )
+            if request.settings or request.typed_settings:
+                command, args = "settings", [unpack_settings(request)]
+            else:
+                command, args = request.command, []
+        except ProcessError as e:
+            return pb2.BatchManageProcessesResponse(
+                status="failure", error_message=str(e)
+            )
+        except Exception as e:
+            return pb2.BatchManageProcessesResponse(
+                status="failure", error_message=f"Unexpected error: {str(e)}"
+            )
+
+        # all processes work on the command at the same time
+        outcomes = await asyncio.gather(
+            *[
+                self._run_command(name, command, args, request.timeout)
+                for name in names
+            ],
+            return_exceptions=True,
+        )
+        results = []
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, ProcessError):
+                result = pb2.ProcessResult(
+                    name=name, status="failure", error_message=str(outcome)
+                )
+            elif isinstance(outcome, Exception):
+                result = pb2.ProcessResult(
+                    name=name,
+                    status="failure",
+                    error_message=f"Unexpected error: {str(outcome)}",
+                )
+            else:
+                result = pb2.ProcessResult(
+                    name=name,
+                    status="success",
+                    result="" if outcome is None else str(outcome),
                 )
+            results.append(result)
+
+        failed = [result.name for result in results if result.status == "failure"]
+        if failed:
+            return pb2.BatchManageProcessesResponse(
+                status="failure",
+                error_message=f"Command {command} failed for {failed}",
+                results=results,
+            )
+        return pb2.BatchManageProcessesResponse(status="success", results=results)
+
+    @staticmethod
+    def _process_dictionary(process) -> pb2.RunningProcessDictionary:
+        # the Any map is still filled for clients of the last release
+        settings = {}
+        for key, setting in process["settings"].items():
+            settings[key] = pack_to_any(setting)
+        usage = process["usage"]
+        heartbeat = process["heartbeat"]
+        # rounded, so that watchers are not sent every little fluctuation
+        return pb2.RunningProcessDictionary(
+            type=process["type"],
+            commands=process["commands"],
+            settings=settings,
+            typed_settings=pack_settings(process["settings"]),
+            alert=process["alert"],
+            cpu_percent=round(usage["cpu_percent"], 1),
+            memory_rss=usage["memory_rss"],
+            threads=usage["threads"],
+            fps=round(heartbeat["fps"], 1),
+            camera_fps=round(heartbeat["camera_fps"], 1),
+            missed_frames=heartbeat["missed_frames"],
+            last_frame_age=round(heartbeat["last_frame_age"], 1),
+        )
+
+    async def GetProcesses(self, request, context):
+        try:
+            running_processes, available_types, streams = await asyncio.to_thread(
+                self.spawner.get_processes
+            )
+            running_dict = {
+                name: self._process_dictionary(process)
+                for name, process in running_processes.items()
+            }
             return pb2.GetProcessesResponse(
                 status="success",
                 running_processes=running_dict,
@@ -77,36 +199,278 @@ class SpawnerService(pb2_grpc.SpawnerServiceServicer):
                 status="failure", error_message=f"Unexpected error: {str(e)}"
             )
 
-    def ChangeSettings(self, request, context):
+    async def WatchProcesses(self, request, context):
+        interval = max(request.interval, self._min_waiting_time)
+        sent = {}
+        sent_streams = None
+        sent_types = None
+        # the loop ends when the client cancels the call
+        while True:
+            try:
+                running_processes, available_types, streams = await asyncio.to_thread(
+                    self.spawner.get_processes
+                )
+            except Exception as e:
+                yield pb2.ProcessesUpdate(
+                    status="failure", error_message=f"Unexpected error: {str(e)}"
+                )
+                return
+
+            update = pb2.ProcessesUpdate(status="success")
+            current = {}
+            for name, process in running_processes.items():
+                dictionary = self._process_dictionary(process)
+                current[name] = dictionary.SerializeToString(deterministic=True)
+                if sent.get(name) != current[name]:
+                    update.changed_processes[name].CopyFrom(dictionary)
+            update.removed_processes.extend(
+                name for name in sent if name not in current
+            )
+            streams = sorted(streams)
+            if streams != sent_streams:
+                update.streams_changed = True
+                update.streams.extend(streams)
+            if available_types != sent_types:
+                update.available_process_types.extend(available_types)
+
+            changed = (
+                update.changed_processes
+                or update.removed_processes
+                or update.streams_changed
+                or update.available_process_types
+            )
+            if sent_types is None or changed:
+                yield update
+            sent, sent_streams, sent_types = current, streams, available_types
+            await asyncio.sleep(interval)
+
+    async def ChangeSettings(self, request, context):
         try:
-            settings = {}
-            for key, any_object in request.settings.items():
-                settings[key] = unpack_from_any(any_object)
-            self.spawner.manage_process(request.name, "settings", [settings])
+            await self._run_command(
+                request.name, "settings", [unpack_settings(request)]
+            )
             return pb2.ChangeSettingsResponse(status="success")
         except ProcessError as e:
             return pb2.ChangeSettingsResponse(status="failure", error_message=str(e))
         except Exception as e:
             return pb2.ChangeSettingsResponse(status="failure", error_message=str(e))
 
-    def AddStream(self, request, context):
+    async def AddStream(self, request, context):
         try:
-            self.spawner.add_stream(request.name, request.port, request.stream_id)
+            await asyncio.to_thread(
+                self.spawner.add_stream, request.name, request.port, request.stream_id
+            )
             return pb2.AddStreamResponse(status="success")
         except Exception as e:
             return pb2.AddStreamResponse(status="failure", error_message=str(e))
 
+    async def _get_save_jobs(self, name: str):
+        return [
+            pb2.SaveJob(
+                id=job["id"],
+                state=job["state"],
+                save_folder=job["save_folder"],
+                total_frames=job["total_frames"],
+                frames_written=job["frames_written"],
+                frames_skipped=job["frames_skipped"],
+                bytes_written=job["bytes_written"],
+                bytes_per_second=job["bytes_per_second"],
+                duration=job["duration"],
+                error_message=job["error"],
+            )
+            for job in await self._run_command(name, "jobs", [])
+        ]
+
+    async def ListSaveJobs(self, request, context):
+        try:
+            jobs = await self._get_save_jobs(request.name)
+            return pb2.ListSaveJobsResponse(status="success", jobs=jobs)
+        except ProcessError as e:
+            return pb2.ListSaveJobsResponse(status="failure", error_message=str(e))
+        except Exception as e:
+            return pb2.ListSaveJobsResponse(
+                status="failure", error_message=f"Unexpected error: {str(e)}"
+            )
 
-def serve(collector_config):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    pb2_grpc.add_SpawnerServiceServicer_to_server(
-        SpawnerService(collector_config), server
-    )
+    async def WatchSaveJobs(self, request, context):
+        interval = max(request.interval, self._min_waiting_time)
+        watched = set(request.job_ids)
+        # the loop ends with the jobs or when the client cancels the call
+        while True:
+            try:
+                jobs = await self._get_save_jobs(request.name)
+            except Exception as e:
+                yield pb2.ListSaveJobsResponse(status="failure", error_message=str(e))
+                return
+            if watched:
+                jobs = [job for job in jobs if job.id in watched]
+                unknown = watched - {job.id for job in jobs}
+                if unknown:
+                    yield pb2.ListSaveJobsResponse(
+                        status="failure",
+                        error_message=f"Jobs {sorted(unknown)} do not exist",
+                        jobs=jobs,
+                    )
+                    return
+            yield pb2.ListSaveJobsResponse(status="success", jobs=jobs)
+            if all(job.state in self._finished_job_states for job in jobs):
+                return
+            await asyncio.sleep(interval)
+
+    async def CancelSaveJob(self, request, context):
+        try:
+            await self._run_command(request.name, "cancel_job", [request.job_id])
+            return pb2.CancelSaveJobResponse(status="success")
+        except ProcessError as e:
+            return pb2.CancelSaveJobResponse(status="failure", error_message=str(e))
+        except Exception as e:
+            return pb2.CancelSaveJobResponse(
+                status="failure", error_message=f"Unexpected error: {str(e)}"
+            )
+
+    async def _acknowledge(
+        self,
+        request_id: int,
+        future: concurrent.futures.Future,
+        responses: asyncio.Queue,
+    ) -> None:
+        try:
+            result = await asyncio.wrap_future(future)
+            response = pb2.ControlResponse(
+                request_id=request_id,
+                status="success",
+                result="" if result is None else str(result),
+            )
+        except ProcessError as e:
+            response = pb2.ControlResponse(
+                request_id=request_id, status="failure", error_message=str(e)
+            )
+        except Exception as e:
+            response = pb2.ControlResponse(
+                request_id=request_id,
+                status="failure",
+                error_message=f"Unexpected error: {str(e)}",
+            )
+        await responses.put(response)
+
+    async def _read_control_requests(
+        self, request_iterator, responses: asyncio.Queue
+    ) -> None:
+        acknowledgements = set()
+        try:
+            async for request in request_iterator:
+                if request.settings or request.typed_settings:
+                    command, args = "settings", [unpack_settings(request)]
+                else:
+                    command, args = request.command, []
+                # queued right away, so that the process gets the requests in
+                # order and waiting settings changes are merged
+                try:
+                    future = self.spawner.submit_command(
+                        request.name, command, args, request.timeout or None
+                    )
+                except Exception as e:
+                    await responses.put(
+                        pb2.ControlResponse(
+                            request_id=request.request_id,
+                            status="failure",
+                            error_message=str(e),
+                        )
+                    )
+                    continue
+                acknowledgement = asyncio.create_task(
+                    self._acknowledge(request.request_id, future, responses)
+                )
+                acknowledgements.add(acknowledgement)
+                acknowledgement.add_done_callback(acknowledgements.discard)
+            await asyncio.gather(*acknowledgements)
+        finally:
+            await responses.put(None)
+
+    async def Control(self, request_iterator, context):
+        responses = asyncio.Queue()
+        reader = asyncio.create_task(
+            self._read_control_requests(request_iterator, responses)
+        )
+        try:
+            while True:
+                response = await responses.get()
+                if response is None:
+                    return
+                yield response
+        finally:
+            reader.cancel()
+
+    @staticmethod
+    def _frame_result(message: Dict[str, Any]) -> pb2.FrameResult:
+        result = pb2.FrameResult(
+            frame_number=message["frame_number"], time=message["time"] or ""
+        )
+        for name, region in message["results"]["regions"].items():
+            result.regions[name].CopyFrom(pb2.RegionResult(**region))
+        return result
+
+    async def WatchResults(self, request, context):
+        try:
+            channel = self.spawner.get_results_channel(request.name)
+        except ProcessError as e:
+            yield pb2.WatchResultsResponse(status="failure", error_message=str(e))
+            return
+
+        # the results are relayed from the collector's redis, where they are
+        # published by the process
+        redis_config = self.spawner.collector_config.redis
+        client = redis.asyncio.StrictRedis(
+            host=redis_config.host, port=redis_config.port
+        )
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            # the loop ends with the process or when the client cancels the call
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self._min_waiting_time
+                )
+                if message is None:
+                    try:
+                        self.spawner.get_results_channel(request.name)
+                    except ProcessError as e:
+                        yield pb2.WatchResultsResponse(
+                            status="failure", error_message=str(e)
+                        )
+                        return
+                    continue
+                yield pb2.WatchResultsResponse(
+                    status="success",
+                    result=self._frame_result(json.loads(message["data"])),
+                )
+        except redis.exceptions.ConnectionError as e:
+            yield pb2.WatchResultsResponse(
+                status="failure", error_message=f"Redis is not reachable: {e}"
+            )
+        finally:
+            await pubsub.close()
+            await client.close()
+
+
+async def serve_async(service: SpawnerService) -> None:
+    server = grpc.aio.server()
+    pb2_grpc.add_SpawnerServiceServicer_to_server(service, server)
     server.add_insecure_port("[::]:50051")
-    server.start()
+    await server.start()
     print("Server started on port 50051")
     try:
-        while True:
-            time.sleep(86400)  # Keep server running
+        await server.wait_for_termination()
+    finally:
+        await server.stop(0)
+
+
+def serve(collector_config):
+    # the spawner forks its first processes before the event loop is running
+    service = SpawnerService(collector_config)
+    try:
+        asyncio.run(serve_async(service))
     except KeyboardInterrupt:
-        server.stop(0)
+        pass
+    finally:
+        service.spawner.close()
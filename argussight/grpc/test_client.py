@@ -5,7 +5,7 @@ import grpc
 import argussight.grpc.argus_service_pb2 as pb2
 import argussight.grpc.argus_service_pb2_grpc as pb2_grpc
 from argussight.core.video_processes.savers.video_saver import SaveFormat
-from argussight.grpc.helper_functions import pack_to_any
+from argussight.grpc.helper_functions import pack_settings
 
 
 def run():
@@ -28,7 +28,8 @@ def run():
     try:
         response = stub.ChangeSettings(
             pb2.ChangeSettingsRequest(
-                name="Saver", settings={"personnal_folder": pack_to_any("test2")}
+                name="Saver",
+                typed_settings=pack_settings({"personnal_folder": "test2"}),
             )
         )
     except Exception as e:
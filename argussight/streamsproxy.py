@@ -1,5 +1,7 @@
+from typing import List
+
 import websockets
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 
 app = FastAPI()
 
@@ -23,6 +25,12 @@ async def remove_stream(path: str):
     return {"message": f"Stream removed at path /{path}"}
 
 
+@app.post("/remove-streams")
+async def remove_streams(paths: List[str] = Query()):
+    removed = [path for path in paths if active_streams.pop(path, None) is not None]
+    return {"message": f"Streams removed at paths {removed}"}
+
+
 @app.websocket("/ws/{path}")
 async def websocket_proxy(websocket: WebSocket, path: str):
     # Accept the connection from the JSMpeg client
@@ -0,0 +1,37 @@
+from argussight.core.video_processes.savers.frame_buffers import (
+    MmapFrameBuffer,
+    MmapFrameReader,
+)
+
+
+def frame(number: int, size: int) -> dict:
+    return {
+        "frame": bytes([number % 256]) * size,
+        "size": (size // 3, 1),
+        "time_stamp": f"12:00:00.{number:06d}",
+        "frame_number": number,
+    }
+
+
+def test_records_of_recreated_buffer_do_not_match(tmp_path):
+    buffer = MmapFrameBuffer(str(tmp_path), 4)
+    for number in range(6):
+        buffer.append(frame(number, 30))
+    old_records = buffer.copy().records
+
+    # a larger frame re-creates the files with larger slots, further frames
+    # fill them up to as many frames as before
+    buffer.append(frame(6, 60))
+    assert len(buffer) == 1
+    for number in range(7, 12):
+        buffer.append(frame(number, 60))
+    assert [record[1] for record in buffer.copy().records] == [8, 9, 10, 11]
+
+    reader = MmapFrameReader(str(tmp_path))
+    try:
+        for record in old_records:
+            assert buffer.read(record) is None
+            assert reader.read(record) is None
+    finally:
+        reader.close()
+        buffer.close()
@@ -0,0 +1,48 @@
+import types
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from argussight.core.video_processes.streamer.optical_flow_detection import (
+    OpticalFlowDetection,
+)
+
+FPS = 15
+
+
+def create_worker() -> OpticalFlowDetection:
+    collector_config = types.SimpleNamespace(
+        redis=types.SimpleNamespace(host="localhost", port=6379, channel="")
+    )
+    worker = OpticalFlowDetection(collector_config, None, {})
+    worker._parameters["roi"] = [40, 40, 160, 160]
+    return worker
+
+
+def make_texture(height: int, width: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    texture = (rng.random((height, width)) * 255).astype(np.uint8)
+    texture = cv2.GaussianBlur(texture, (0, 0), 4)
+    return cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)
+
+
+def test_speed_after_still_stretch():
+    # a still scene long enough for the static gate, then motion of one pixel
+    # every second frame, slow enough to pass the gate now and then
+    texture = make_texture(300, 240)
+    frames = [texture[:240]] * 30 + [texture[i // 2 : i // 2 + 240] for i in range(60)]
+    worker = create_worker()
+    start = datetime(1900, 1, 1, 12)
+
+    speeds = []
+    for i, frame in enumerate(frames):
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        worker.calculate_flow(frame, start + timedelta(seconds=i / FPS))
+        if worker._speeds.get("roi"):
+            speeds.extend(worker._speeds["roi"])
+            worker._speeds["roi"].clear()
+
+    assert speeds
+    # a frame moves by at most one pixel, i.e. FPS pixels/s
+    assert max(speeds) < 1.3 * FPS
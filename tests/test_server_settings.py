@@ -0,0 +1,60 @@
+import asyncio
+import concurrent.futures
+
+import argussight.grpc.argus_service_pb2 as pb2
+from argussight.grpc.helper_functions import unpack_from_any
+from argussight.grpc.server import SpawnerService
+
+
+class FakeSpawner:
+    """Applies settings commands to the settings of a single process"""
+
+    def __init__(self) -> None:
+        self.settings = {"roi": [0, 0, 10, 10], "downscale": 1}
+
+    def submit_command(self, name, command, args, timeout=None):
+        assert command == "settings"
+        self.settings.update(args[0])
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        return future
+
+    def get_processes(self):
+        process = {
+            "type": "flow_detection",
+            "commands": [],
+            "settings": dict(self.settings),
+            "alert": "",
+            "usage": {"cpu_percent": 0.0, "memory_rss": 0, "threads": 1},
+            "heartbeat": {
+                "fps": 0.0,
+                "camera_fps": 0.0,
+                "missed_frames": 0,
+                "last_frame_age": -1.0,
+            },
+        }
+        return {"flow": process}, ["flow_detection"], set()
+
+
+def create_service() -> SpawnerService:
+    service = object.__new__(SpawnerService)
+    service.spawner = FakeSpawner()
+    service._min_waiting_time = 1
+    return service
+
+
+def test_get_processes_with_setting_set_to_none():
+    service = create_service()
+    request = pb2.ChangeSettingsRequest(
+        name="flow", typed_settings={"roi": pb2.SettingValue(null_value=True)}
+    )
+    response = asyncio.run(service.ChangeSettings(request, None))
+    assert response.status == "success"
+    assert service.spawner.settings["roi"] is None
+
+    response = asyncio.run(service.GetProcesses(pb2.GetProcessesRequest(), None))
+    assert response.status == "success", response.error_message
+    process = response.running_processes["flow"]
+    assert process.typed_settings["roi"].WhichOneof("kind") == "null_value"
+    # clients of the deprecated map get None back as well
+    assert unpack_from_any(process.settings["roi"]) is None
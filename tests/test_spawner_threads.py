@@ -0,0 +1,58 @@
+import concurrent.futures
+import threading
+
+from argussight.core.spawner import Spawner
+from argussight.core.video_processes.vprocess import Vprocess
+
+
+def create_spawner(commands: list) -> Spawner:
+    spawner = object.__new__(Spawner)
+    spawner.config = {"startup_workers": 4}
+    spawner._processes = {}
+    spawner._processes_lock = threading.Lock()
+    spawner._start_lock = threading.Lock()
+    spawner._starting = set()
+    spawner._threads_lock = threading.Lock()
+    spawner._balance_deferred = 0
+    spawner._balance_pending = False
+    spawner._restricted_classes = []
+    spawner._worker_classes = {"worker": Vprocess}
+    spawner._resources = {"worker": {"cpus": None, "nice": None, "threads": None}}
+
+    # processes are added like add_process does, without starting them
+    def launch_process(name, worker_type):
+        with spawner._processes_lock:
+            spawner._processes[name] = {"type": worker_type, "threads": None}
+        spawner.balance_threads()
+
+    def submit_command(name, command, args, timeout=None):
+        commands.append((name, command, args))
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        return future
+
+    spawner.launch_process = launch_process
+    spawner.submit_command = submit_command
+    return spawner
+
+
+def test_batch_start_balances_threads_once(monkeypatch):
+    # 16 cores shared out among the workers
+    monkeypatch.setattr(
+        "argussight.core.spawner.default_thread_count",
+        lambda workers: max(1, 16 // max(workers, 1)),
+    )
+    commands = []
+    spawner = create_spawner(commands)
+    names = [f"worker_{i}" for i in range(8)]
+
+    results = spawner.start_processes([(name, "worker") for name in names])
+
+    assert all(error is None for _, error in results)
+    assert sorted(name for name, _, _ in commands) == names
+    assert {(command, args[0]) for _, command, args in commands} == {("threads", 2)}
+
+    # counts that did not change are not sent again
+    commands.clear()
+    spawner.balance_threads()
+    assert commands == []
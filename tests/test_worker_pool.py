@@ -0,0 +1,42 @@
+import types
+from multiprocessing import shared_memory
+
+import pytest
+
+from argussight.core.port_allocator import PortAllocator
+from argussight.core.shared_settings import SharedSettings
+from argussight.core.spawner import Spawner
+from argussight.core.watchdog import Watchdog
+from argussight.core.worker_pool import WorkerPool
+
+
+def test_spawner_close_ends_idle_workers_and_watchdog():
+    collector_config = types.SimpleNamespace(
+        redis=types.SimpleNamespace(host="localhost", port=6379, channel="")
+    )
+    ports = PortAllocator(9600)
+    pool = WorkerPool(
+        2, collector_config, SharedSettings, ports.allocate, ports.release
+    )
+    pool.fill()
+    workers = list(pool._idle)
+    assert len(workers) == 2
+
+    watchdog = Watchdog({"interval": 0.01}, dict, print, print)
+    watchdog.start()
+    spawner = object.__new__(Spawner)
+    spawner._worker_pool = pool
+    spawner._watchdog = watchdog
+
+    spawner.close()
+    assert not watchdog._thread.is_alive()
+    for worker in workers:
+        assert not worker["process_instance"].is_alive()
+        assert worker["process_instance"].exitcode is not None
+        for block in (worker["settings"], worker["heartbeat"]):
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=block._shm.name)
+    assert ports.allocated == set()
+    # a closed pool does not start new workers
+    assert pool.take() is None
+    assert pool._refill_thread is None